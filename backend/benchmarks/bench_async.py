@@ -0,0 +1,145 @@
+"""Compare sync and async request modes at saturation.
+
+Starts ``uvicorn main:app`` once per mode and drives a mixed /predict,
+/stats and /logs workload from concurrent clients. Run from ``backend/``::
+
+    python benchmarks/bench_async.py --concurrency 64 --duration 15
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SAMPLE_PAYLOAD = {
+    "avg_monthly_inflow": 100000,
+    "inflow_volatility": 0.2,
+    "avg_monthly_outflow": 60000,
+    "min_balance_30d": 15000,
+    "neg_balance_days_30d": 0,
+    "purchase_to_inflow_ratio": 0.3,
+    "total_burden_ratio": 0.45,
+    "buffer_ratio": 0.25,
+    "stress_index": 0.2,
+}
+WORKLOAD = (("predict", 0.8), ("stats", 0.1), ("logs", 0.1))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _request(client: httpx.AsyncClient, kind: str, rng: random.Random) -> int:
+    if kind == "predict":
+        body = {**SAMPLE_PAYLOAD, "buffer_ratio": rng.uniform(-0.5, 1.0)}
+        response = await client.post("/predict", json=body)
+    elif kind == "stats":
+        response = await client.get("/stats")
+    else:
+        response = await client.get("/logs", params={"cursor": "true", "limit": 20})
+    return response.status_code
+
+
+async def _drive(base_url: str, concurrency: int, duration: float, seed: int) -> dict:
+    kinds = [kind for kind, _ in WORKLOAD]
+    weights = [weight for _, weight in WORKLOAD]
+    latencies: dict[str, list[float]] = {kind: [] for kind in kinds}
+    errors: dict[int, int] = {}
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+
+        async def worker(slot: int) -> None:
+            rng = random.Random(seed + slot)
+            while time.perf_counter() < deadline:
+                kind = rng.choices(kinds, weights)[0]
+                started = time.perf_counter()
+                status = await _request(client, kind, rng)
+                if status == 200:
+                    latencies[kind].append((time.perf_counter() - started) * 1000)
+                else:
+                    errors[status] = errors.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(slot) for slot in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {"elapsed": elapsed, "latencies": latencies, "errors": errors}
+
+
+def _wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/ready", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError("Server did not become ready in time")
+
+
+def _run_mode(mode: str, args: argparse.Namespace, workdir: str) -> dict:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{workdir}/bench_{mode}.db",
+        "REQUEST_MODE": mode,
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)]
+        + ["--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        _wait_ready(base_url, process)
+        asyncio.run(_drive(base_url, args.concurrency, args.warmup, args.seed))
+        return asyncio.run(_drive(base_url, args.concurrency, args.duration, args.seed))
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in args.modes:
+            result = _run_mode(mode, args, workdir)
+            total = sum(len(values) for values in result["latencies"].values())
+            print(
+                f"{mode:<6} {total / result['elapsed']:8.0f} req/s   "
+                f"errors {result['errors'] or 0}   concurrency {args.concurrency}"
+            )
+            for kind, values in result["latencies"].items():
+                if not values:
+                    continue
+                p50, p99 = np.percentile(values, [50, 99])
+                print(f"  {kind:<8} n={len(values):<7} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,97 @@
+"""Compare a calibrated classifier pickle with its collapsed booster plus isotonic table.
+
+``--collapsed`` is the output directory of ``calibrate_model.py``. The collapsed
+model is timed on the xgboost path and, compiled, on the native engine. Rows
+are drawn from the synthetic applicant generator. Run from ``backend/``::
+
+    python benchmarks/bench_calibration.py --calibrated model/bnpl_cashflow_model.pkl \\
+        --collapsed model/registry/v3
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import (  # noqa: E402
+    DEFAULT_JSON_MODEL_NAME,
+    _compile_native_model,
+    _load_metadata,
+    _predict_risk_probabilities,
+)
+from model_registry import METADATA_FILE_NAME, load_model_file  # noqa: E402
+from synthetic_data import generate_chunk  # noqa: E402
+
+
+def _time_call(function, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list[float]) -> None:
+    ordered = sorted(timings)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<32} median {statistics.median(ordered):9.3f} ms   p99 {p99:9.3f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calibrated", type=Path, required=True)
+    parser.add_argument("--collapsed", type=Path, required=True)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--batch-rows", type=int, default=100)
+    parser.add_argument("--single-repeat", type=int, default=500)
+    parser.add_argument("--batch-repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    metadata = _load_metadata(args.collapsed / METADATA_FILE_NAME)
+    feature_columns = list(metadata["feature_columns"])
+    threshold = float(metadata["threshold"])
+    models = {
+        "calibrated pickle": joblib.load(args.calibrated),
+        "collapsed xgboost": load_model_file(args.collapsed / DEFAULT_JSON_MODEL_NAME),
+    }
+    models["collapsed native"] = _compile_native_model(models["collapsed xgboost"])
+
+    chunk = generate_chunk(np.random.default_rng(args.seed), args.rows)
+    rows = np.column_stack([chunk[column] for column in feature_columns])
+    expected = _predict_risk_probabilities(models["calibrated pickle"], rows, feature_columns)
+    for label in ("collapsed xgboost", "collapsed native"):
+        actual = _predict_risk_probabilities(models[label], rows, feature_columns)
+        difference = np.abs(actual - expected)
+        agreement = np.mean((actual >= threshold) == (expected >= threshold))
+        print(
+            f"{label} vs pickle over {args.rows} rows: mean |diff| {difference.mean():.4f}, "
+            f"max {difference.max():.4f}, decision agreement {agreement:.2%}"
+        )
+
+    single = rows[:1]
+    batch = rows[: args.batch_rows]
+    for label, model in models.items():
+        timings = _time_call(
+            lambda: _predict_risk_probabilities(model, single, feature_columns),
+            args.single_repeat,
+        )
+        _report(f"{label} single row", timings)
+    for label, model in models.items():
+        timings = _time_call(
+            lambda: _predict_risk_probabilities(model, batch, feature_columns),
+            args.batch_repeat,
+        )
+        _report(f"{label} {len(batch)} rows", timings)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+"""Measure backend cold start: process spawn until /ready, then the first /predict.
+
+Run from ``backend/``. Each ``--config`` is a comma-separated list of
+environment overrides; every configuration is started ``--runs`` times::
+
+    python compile_model.py
+    python benchmarks/bench_cold_start.py \\
+        --config "" \\
+        --config "INFERENCE_ENGINE=native,DB_AUTO_CREATE_SCHEMA=false"
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SAMPLE_PAYLOAD = {
+    "avg_monthly_inflow": 100000,
+    "inflow_volatility": 0.2,
+    "avg_monthly_outflow": 60000,
+    "min_balance_30d": 15000,
+    "neg_balance_days_30d": 0,
+    "purchase_to_inflow_ratio": 0.3,
+    "total_burden_ratio": 0.45,
+    "buffer_ratio": 0.25,
+    "stress_index": 0.2,
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _parse_config(raw: str) -> dict[str, str]:
+    pairs = [item.split("=", 1) for item in raw.split(",") if item.strip()]
+    return {key.strip(): value.strip() for key, value in pairs}
+
+
+def _request(url: str, payload: dict | None = None) -> int:
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+def _cold_start(
+    overrides: dict[str, str], database_url: str, timeout: float
+) -> tuple[float, float]:
+    port = _free_port()
+    env = {**os.environ, "DATABASE_URL": database_url, **overrides}
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)]
+        + ["--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError("Server did not become ready in time")
+            try:
+                if _request(f"{base_url}/ready") == 200:
+                    break
+            except OSError:
+                pass
+            time.sleep(0.01)
+        ready_s = time.perf_counter() - started
+
+        request_started = time.perf_counter()
+        status = _request(f"{base_url}/predict", SAMPLE_PAYLOAD)
+        first_predict_ms = (time.perf_counter() - request_started) * 1000
+        if status != 200:
+            raise RuntimeError(f"First /predict returned {status}")
+        return ready_s, first_predict_ms
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", action="append", default=None)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    from schema import prepare_database  # noqa: E402
+    from sqlalchemy import create_engine  # noqa: E402
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database_url = f"sqlite:///{workdir}/cold_start.db"
+        # Prepare the schema once, outside the timed runs, as a deploy step would.
+        engine = create_engine(database_url)
+        prepare_database(engine)
+        engine.dispose()
+
+        for raw_config in args.config or [""]:
+            overrides = _parse_config(raw_config)
+            results = [_cold_start(overrides, database_url, args.timeout) for _ in range(args.runs)]
+            ready = [ready_s for ready_s, _ in results]
+            first = [first_ms for _, first_ms in results]
+            label = raw_config or "defaults"
+            print(
+                f"{label:<55} ready median {statistics.median(ready):6.2f} s "
+                f"(min {min(ready):.2f}, max {max(ready):.2f})   "
+                f"first /predict median {statistics.median(first):7.1f} ms"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+"""Measure the streaming drift monitor against recomputing PSI from the raw window.
+
+A reference is frozen from synthetic applicants, then ``--rows`` scored rows are
+streamed through ``DriftMonitor.observe`` in request-sized batches. The
+report is compared with binning the same rows from scratch, which is the least
+work a table scan would have to do after reading them. Run from ``backend/``::
+
+    python benchmarks/bench_drift.py --rows 1000000
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from drift import (  # noqa: E402
+    RISK_COLUMN,
+    DriftMonitor,
+    DriftReference,
+    population_stability_index,
+)
+from synthetic_data import FEATURE_COLUMNS, generate_chunk  # noqa: E402
+
+
+class _Version:
+    name = "bench"
+    feature_columns = FEATURE_COLUMNS
+
+    def __init__(self, reference: DriftReference) -> None:
+        self.drift_reference = reference
+
+
+def _samples(rng: np.random.Generator, rows: int) -> np.ndarray:
+    chunk = generate_chunk(rng, rows)
+    features = np.column_stack([chunk[column] for column in FEATURE_COLUMNS])
+    return np.column_stack([features, chunk["default_probability"]])
+
+
+def _time_call(function, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list[float]) -> None:
+    ordered = sorted(timings)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<36} median {statistics.median(ordered):9.3f} ms   p99 {p99:9.3f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reference-rows", type=int, default=50_000)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    columns = FEATURE_COLUMNS + [RISK_COLUMN]
+    reference = DriftReference.from_samples(columns, _samples(rng, args.reference_rows))
+    version = _Version(reference)
+    monitor = DriftMonitor()
+    traffic = _samples(rng, args.rows)
+
+    single = traffic[:1]
+    batch = traffic[: args.batch_rows]
+    _report(
+        "observe 1 row",
+        _time_call(lambda: monitor.observe(version, single[:, :-1], single[:, -1]), args.repeat),
+    )
+    _report(
+        f"observe {len(batch)} rows",
+        _time_call(lambda: monitor.observe(version, batch[:, :-1], batch[:, -1]), args.repeat),
+    )
+
+    monitor = DriftMonitor()
+    started = time.perf_counter()
+    for start in range(0, len(traffic), args.batch_rows):
+        rows = traffic[start : start + args.batch_rows]
+        monitor.observe(version, rows[:, :-1], rows[:, -1])
+    seconds = time.perf_counter() - started
+    print(f"streamed {len(traffic):,} rows at {len(traffic) / seconds:,.0f} rows/s")
+
+    _report("report from the ring", _time_call(monitor.report, 200))
+
+    def recompute() -> list[float]:
+        bins = reference.bin_indices(traffic)
+        return [
+            population_stability_index(
+                np.bincount(bins[:, index], minlength=reference.expected[index].size),
+                reference.expected[index],
+            )
+            for index in range(len(columns))
+        ]
+
+    _report(f"recompute over {len(traffic):,} rows", _time_call(recompute, 5))
+    streamed = [item["psi_score"] for item in monitor.report()["reports"]]
+    difference = max(abs(a - round(b, 4)) for a, b in zip(streamed, recompute()))
+    print(f"PSI from the ring vs recomputed: max |diff| {difference:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
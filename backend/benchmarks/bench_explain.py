@@ -0,0 +1,125 @@
+"""Compare /predict latency with and without per-feature explanations.
+
+Requests go through the full app in-process against a throwaway SQLite
+database. Run from ``backend/``::
+
+    python benchmarks/bench_explain.py --method exact --budget-ms 25
+    python benchmarks/bench_explain.py --method approx --batch-rows 100
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+FEATURE_RANGES = {
+    "avg_monthly_inflow": (20000, 200000),
+    "inflow_volatility": (0.0, 1.0),
+    "avg_monthly_outflow": (10000, 180000),
+    "min_balance_30d": (-20000, 80000),
+    "neg_balance_days_30d": (0, 15),
+    "purchase_to_inflow_ratio": (0.0, 1.5),
+    "total_burden_ratio": (0.0, 1.5),
+    "buffer_ratio": (-0.5, 1.0),
+    "stress_index": (0.0, 1.0),
+}
+
+
+def _payloads(count: int, seed: int) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    columns = {
+        name: rng.uniform(low, high, size=count) for name, (low, high) in FEATURE_RANGES.items()
+    }
+    columns["neg_balance_days_30d"] = np.floor(columns["neg_balance_days_30d"])
+    return [
+        {
+            name: int(values[index]) if name == "neg_balance_days_30d" else float(values[index])
+            for name, values in columns.items()
+        }
+        for index in range(count)
+    ]
+
+
+def _time_requests(client, path: str, bodies: list[dict]) -> list[float]:
+    timings = []
+    for body in bodies:
+        started = time.perf_counter()
+        response = client.post(path, json=body)
+        timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}: {response.text}")
+    return timings
+
+
+def _percentile(timings: list[float], quantile: float) -> float:
+    return float(np.percentile(timings, quantile))
+
+
+def _report(label: str, timings: list[float]) -> None:
+    print(
+        f"{label:<40} median {statistics.median(timings):8.3f} ms   "
+        f"p99 {_percentile(timings, 99):8.3f} ms"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--method", choices=("exact", "approx"), default="exact")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--batch-rows", type=int, default=100)
+    parser.add_argument("--batch-repeat", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench_explain.db"
+    os.environ["EXPLAIN_METHOD"] = args.method
+    os.environ["EXPLAIN_PRELOAD"] = "true"
+
+    from fastapi.testclient import TestClient
+
+    import main as app_module
+
+    budget_ms = args.budget_ms if args.budget_ms is not None else app_module.EXPLAIN_P99_BUDGET_MS
+    bodies = _payloads(args.requests, args.seed)
+    batch = {"rows": _payloads(args.batch_rows, args.seed + 1)}
+
+    with TestClient(app_module.app) as client:
+        _time_requests(client, "/predict?explain=true", bodies[:20])
+
+        plain = _time_requests(client, "/predict", bodies)
+        explained = _time_requests(client, "/predict?explain=true", bodies)
+        top_k = _time_requests(client, f"/predict?explain=true&top_k={args.top_k}", bodies)
+        _report("/predict", plain)
+        _report(f"/predict?explain=true ({args.method})", explained)
+        _report(f"/predict?explain=true&top_k={args.top_k}", top_k)
+
+        batch_plain = _time_requests(client, "/predict/batch", [batch] * args.batch_repeat)
+        batch_explained = _time_requests(
+            client, "/predict/batch?explain=true", [batch] * args.batch_repeat
+        )
+        _report(f"/predict/batch {args.batch_rows} rows", batch_plain)
+        _report(f"/predict/batch {args.batch_rows} rows explain", batch_explained)
+
+        server_p99 = client.get("/explain/stats").json()["p99_ms"]
+
+    overhead_ms = _percentile(explained, 99) - _percentile(plain, 99)
+    print(f"explain p99 overhead over /predict: {overhead_ms:.3f} ms")
+    print(f"server-side explain p99 {server_p99:.3f} ms, budget {budget_ms:.1f} ms")
+    if _percentile(explained, 99) > budget_ms:
+        print("FAIL: /predict?explain=true p99 exceeds the latency budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,208 @@
+"""Measure incremental feature windows against re-aggregating raw history per checkout.
+
+Simulates gig workers' bank feeds (irregular payouts, daily spending, some debt
+repayments) and streams them into ``FeatureEngine`` in daily batches. Each
+checkout lookup is compared with recomputing the same nine features from the
+buyer's full stored history with NumPy, after checking that both paths agree
+for every buyer. Run from ``backend/``::
+
+    python benchmarks/bench_feature_engine.py --buyers 2000 --days 180
+"""
+
+import argparse
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from feature_engine import (  # noqa: E402
+    BNPL_INSTALLMENTS,
+    BUFFER_RATIO_RANGE,
+    MONTHS_IN_WINDOW,
+    RECENT_DAYS,
+    SECONDS_PER_DAY,
+    WINDOW_DAYS,
+    BankTransactionEvent,
+    FeatureEngine,
+    _stress_index,
+)
+
+START_DAY = 20_000
+PARITY_PURCHASES = (250.0, 4000.0)
+
+
+def _simulate(
+    buyer_count: int, days: int, seed: int
+) -> list[list[tuple[str, BankTransactionEvent]]]:
+    """One list of (buyer, event) pairs per day, in timestamp order within a buyer."""
+    rng = np.random.default_rng(seed)
+    per_day: list[list[tuple[str, BankTransactionEvent]]] = [[] for _ in range(days)]
+    for buyer in range(buyer_count):
+        buyer_id = f"buyer-{buyer}"
+        balance = float(rng.uniform(-200, 2000))
+        payout = float(rng.lognormal(4.5, 0.5))
+        for day in range(days):
+            count = rng.poisson(0.6) + rng.poisson(2.5)
+            seconds = np.sort(rng.uniform(0, SECONDS_PER_DAY, count))
+            for second in seconds:
+                if rng.random() < 0.2:
+                    amount = payout * float(rng.lognormal(0.0, 0.4))
+                else:
+                    amount = -float(rng.lognormal(2.8, 0.9))
+                balance += amount
+                event = BankTransactionEvent(
+                    timestamp=(START_DAY + day) * SECONDS_PER_DAY + float(second),
+                    amount=round(amount, 2),
+                    balance=round(balance, 2),
+                    debt_repayment=amount < 0 and rng.random() < 0.05,
+                )
+                per_day[day].append((buyer_id, event))
+    return per_day
+
+
+def _reaggregate(history: np.ndarray, today: int, purchase_amount: float) -> dict:
+    """The naive path: the nine features straight from the buyer's raw rows.
+
+    ``history`` holds (timestamp, amount, balance, debt_repayment) rows in
+    timestamp order. The definitions mirror ``BuyerWindow.features``.
+    """
+    timestamps, amounts, balances = history[:, 0], history[:, 1], history[:, 2]
+    days = (timestamps // SECONDS_PER_DAY).astype(np.int64)
+    cents = np.round(amounts * 100).astype(np.int64)
+    window = days > today - WINDOW_DAYS
+    history_days = today - int(days[0]) + 1
+    months = max(min(history_days, WINDOW_DAYS), RECENT_DAYS) / RECENT_DAYS
+
+    inflow = np.where(window & (cents >= 0), cents, 0)
+    outflow = np.where(window & (cents < 0), -cents, 0)
+    debt = np.where(history[:, 3] > 0, outflow, 0)
+    avg_inflow = int(inflow.sum()) / 100 / months
+    avg_outflow = int(outflow.sum()) / 100 / months
+    monthly_totals = np.bincount(
+        (today - days[window]) // RECENT_DAYS, weights=inflow[window], minlength=3
+    )
+    full_months = min(history_days // RECENT_DAYS, MONTHS_IN_WINDOW)
+    monthly = [int(value) for value in monthly_totals[:full_months]]
+    volatility = 0.0
+    if full_months >= 2 and sum(monthly) > 0:
+        mean = sum(monthly) / full_months
+        variance = sum((value - mean) ** 2 for value in monthly) / full_months
+        volatility = math.sqrt(variance) / mean
+
+    # A day's low includes the balance it opened with, the previous closing balance.
+    recent_days = np.arange(max(int(days[0]), today - RECENT_DAYS + 1), today + 1)
+    starts = np.searchsorted(days, recent_days)
+    opening = np.where(starts > 0, balances[starts - 1], np.inf)
+    recent = days > today - RECENT_DAYS
+    event_lows = np.full(len(recent_days), np.inf)
+    np.minimum.at(event_lows, days[recent] - recent_days[0], balances[recent])
+    lows = np.minimum(opening, event_lows)
+    lows = lows[np.isfinite(lows)]
+    min_balance = float(lows.min()) if lows.size else float(balances[-1])
+    negative_days = int((lows < 0).sum())
+
+    purchase_ratio = purchase_amount / avg_inflow
+    total_burden = int(debt.sum()) / 100 / months / avg_inflow + purchase_ratio / BNPL_INSTALLMENTS
+    buffer_ratio = min_balance / avg_outflow if avg_outflow > 0 else BUFFER_RATIO_RANGE[1]
+    buffer_ratio = min(max(buffer_ratio, BUFFER_RATIO_RANGE[0]), BUFFER_RATIO_RANGE[1])
+    stress = _stress_index(
+        volatility, negative_days, total_burden, buffer_ratio, avg_outflow / avg_inflow
+    )
+    return {
+        "avg_monthly_inflow": round(avg_inflow, 2),
+        "inflow_volatility": round(volatility, 4),
+        "avg_monthly_outflow": round(avg_outflow, 2),
+        "min_balance_30d": round(min_balance, 2),
+        "neg_balance_days_30d": negative_days,
+        "purchase_to_inflow_ratio": round(purchase_ratio, 4),
+        "total_burden_ratio": round(total_burden, 4),
+        "buffer_ratio": round(buffer_ratio, 4),
+        "stress_index": round(stress, 4),
+    }
+
+
+def _parity_failures(
+    engine: FeatureEngine,
+    arrays: dict[str, np.ndarray],
+    as_of: float,
+    today: int,
+) -> list[str]:
+    failures = []
+    for buyer_id, history in arrays.items():
+        for purchase_amount in PARITY_PURCHASES:
+            expected = _reaggregate(history, today, purchase_amount)
+            actual, _, _ = engine.features(buyer_id, purchase_amount, as_of)
+            for name, value in expected.items():
+                if not math.isclose(actual[name], value, rel_tol=1e-9, abs_tol=1e-9):
+                    failures.append(f"{buyer_id} {name}: ring {actual[name]}, raw {value}")
+    return failures
+
+
+def _report(label: str, timings: list[float]) -> None:
+    ordered = sorted(timings)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    median_us = statistics.median(ordered) * 1000
+    print(f"{label:<36} median {median_us:8.1f} us   p99 {p99 * 1000:8.1f} us")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--buyers", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    per_day = _simulate(args.buyers, args.days, args.seed)
+    total = sum(len(events) for events in per_day)
+    print(f"simulated {total:,} transactions for {args.buyers:,} buyers over {args.days} days")
+
+    engine = FeatureEngine(max_buyers=args.buyers)
+    history: dict[str, list[tuple[float, float, float]]] = {}
+    started = time.perf_counter()
+    for events in per_day:
+        batches: dict[str, list[BankTransactionEvent]] = {}
+        for buyer_id, event in events:
+            batches.setdefault(buyer_id, []).append(event)
+        for buyer_id, batch in batches.items():
+            engine.ingest(buyer_id, batch)
+    ingest_seconds = time.perf_counter() - started
+    print(f"ingest: {total / ingest_seconds:,.0f} transactions/s in daily per-buyer batches")
+
+    for events in per_day:
+        for buyer_id, event in events:
+            history.setdefault(buyer_id, []).append(event)
+    arrays = {buyer_id: np.array(rows, dtype=float) for buyer_id, rows in history.items()}
+
+    as_of = (START_DAY + args.days - 1) * SECONDS_PER_DAY
+    today = START_DAY + args.days - 1
+    # Both paths must agree on every buyer before either is timed.
+    failures = _parity_failures(engine, arrays, as_of, today)
+    print(f"parity over {len(arrays):,} buyers: {len(failures)} mismatched features")
+    if failures:
+        print("\n".join(failures[:10]), file=sys.stderr)
+        return 1
+
+    rng = np.random.default_rng(args.seed)
+    buyers = [f"buyer-{index}" for index in rng.integers(0, args.buyers, args.lookups)]
+    incremental, reaggregated = [], []
+    for buyer_id in buyers:
+        started = time.perf_counter()
+        engine.features(buyer_id, 250.0, as_of)
+        incremental.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        _reaggregate(arrays[buyer_id], today, 250.0)
+        reaggregated.append((time.perf_counter() - started) * 1000)
+    rows_per_buyer = total / args.buyers
+    _report("feature lookup, incremental", incremental)
+    _report(f"re-aggregate ~{rows_per_buyer:,.0f} rows per buyer", reaggregated)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,109 @@
+"""Measure the per-request cost of METRICS_ENABLED on the /predict hot path.
+
+Each mode runs in its own interpreter (the switch is read at import) and sends
+sequential in-process requests through the full ASGI stack, with write-behind
+decision logging so commit latency does not drown out the difference. Run
+from ``backend/``::
+
+    python benchmarks/bench_metrics.py --requests 3000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+PAYLOAD = {
+    "avg_monthly_inflow": 3200.0,
+    "inflow_volatility": 0.35,
+    "avg_monthly_outflow": 2700.0,
+    "min_balance_30d": 150.0,
+    "neg_balance_days_30d": 3,
+    "purchase_to_inflow_ratio": 0.12,
+    "total_burden_ratio": 0.45,
+    "buffer_ratio": 0.18,
+    "stress_index": 0.4,
+}
+
+
+def _measure(requests: int, warmup: int) -> dict:
+    import numpy as np
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    latencies = []
+    with TestClient(app) as client:
+        for _ in range(warmup):
+            client.post("/predict", json=PAYLOAD)
+        for _ in range(requests):
+            started = time.perf_counter()
+            client.post("/predict", json=PAYLOAD)
+            latencies.append((time.perf_counter() - started) * 1000)
+        stages: dict[str, float] = {}
+        metrics = client.get("/metrics")
+        if metrics.status_code == 200:
+            sums: dict[str, float] = {}
+            for line in metrics.text.splitlines():
+                name, _, value = line.rpartition(" ")
+                if name.startswith("fairlens_stage_duration_seconds_sum"):
+                    sums[name.split('"')[1]] = float(value)
+                elif name.startswith("fairlens_stage_duration_seconds_count"):
+                    stage = name.split('"')[1]
+                    if float(value):
+                        stages[stage] = sums[stage] / float(value) * 1000
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return {"p50": p50, "p99": p99, "mean": float(np.mean(latencies)), "stages": stages}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_measure(args.requests, args.warmup)))
+        return 0
+
+    results = {}
+    for label, enabled in (("off", "false"), ("on", "true")):
+        with tempfile.TemporaryDirectory() as workdir:
+            env = dict(
+                os.environ,
+                METRICS_ENABLED=enabled,
+                DECISION_LOG_MODE="write_behind",
+                DATABASE_URL=f"sqlite:///{Path(workdir) / 'bench.db'}",
+            )
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", "--requests", str(args.requests),
+                 "--warmup", str(args.warmup)],
+                cwd=BACKEND_DIR,
+                env=env,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+        results[label] = json.loads(output.strip().splitlines()[-1])
+        result = results[label]
+        print(
+            f"metrics {label:<4} mean {result['mean']:7.3f} ms   "
+            f"p50 {result['p50']:7.3f} ms   p99 {result['p99']:7.3f} ms"
+        )
+
+    overhead = results["on"]["mean"] - results["off"]["mean"]
+    print(f"overhead   {overhead * 1000:+.0f} us per request (mean)")
+    for stage, mean_ms in sorted(results["on"]["stages"].items()):
+        print(f"  stage {stage:<22} mean {mean_ms:7.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
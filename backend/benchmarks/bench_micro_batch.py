@@ -0,0 +1,108 @@
+"""Compare concurrent single-row scoring with and without the micro-batcher.
+
+Each client thread scores one row at a time, like a /predict handler running
+in FastAPI's threadpool. Run from ``backend/``::
+
+    python benchmarks/bench_micro_batch.py --threads 64 --max-batch 64 --max-wait-ms 2
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import (  # noqa: E402
+    MODEL_VERSION,
+    _build_model_version,
+    _load_default_model,
+    _score_version_rows,
+)
+from micro_batcher import MicroBatcher  # noqa: E402
+
+
+def _run_clients(score, rows: np.ndarray, threads: int, requests_per_thread: int):
+    latencies: list[list[float]] = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def client(slot: int) -> None:
+        barrier.wait()
+        for request in range(requests_per_thread):
+            row = rows[(slot * requests_per_thread + request) % len(rows)][None, :]
+            started = time.perf_counter()
+            score(row)
+            latencies[slot].append((time.perf_counter() - started) * 1000)
+
+    workers = [threading.Thread(target=client, args=(slot,)) for slot in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    return elapsed, np.concatenate([np.asarray(values) for values in latencies])
+
+
+def _report(label: str, elapsed: float, latencies: np.ndarray) -> None:
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(
+        f"{label:<10} {len(latencies) / elapsed:9.0f} rows/s   "
+        f"p50 {p50:8.3f} ms   p99 {p99:8.3f} ms"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=50, help="Requests per thread")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    model, model_path, metadata_path = _load_default_model()
+    version = _build_model_version(MODEL_VERSION, model, metadata_path, model_path)
+    print(f"model {model_path.name} ({os.getenv('INFERENCE_ENGINE', 'xgboost')} engine)")
+    rows = np.random.default_rng(args.seed).uniform(
+        0.0, 1.0, size=(4096, len(version.feature_columns))
+    )
+    _score_version_rows(version, rows[:64])
+
+    elapsed, latencies = _run_clients(
+        lambda row: _score_version_rows(version, row), rows, args.threads, args.requests
+    )
+    _report("direct", elapsed, latencies)
+
+    batcher = MicroBatcher(
+        score_fn=_score_version_rows,
+        max_batch_size=args.max_batch,
+        max_wait=args.max_wait_ms / 1000,
+    )
+    batcher.start()
+    try:
+        elapsed, latencies = _run_clients(
+            lambda row: batcher.submit(version, row), rows, args.threads, args.requests
+        )
+    finally:
+        batcher.stop()
+    _report("batched", elapsed, latencies)
+
+    snapshot = batcher.snapshot()
+    mean_batch = snapshot["batched_rows"] / max(snapshot["batches"], 1)
+    mean_wait = snapshot["queue_wait_ms"]["sum"] / max(snapshot["queue_wait_ms"]["count"], 1)
+    print(
+        f"{snapshot['batches']} batches, mean size {mean_batch:.1f}, "
+        f"mean wait {mean_wait:.3f} ms"
+    )
+    print(f"batch size buckets: {snapshot['batch_size']['buckets']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
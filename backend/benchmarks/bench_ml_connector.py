@@ -0,0 +1,309 @@
+"""Measure the pooled ML service connector against opening a client per call.
+
+Starts a local stand-in for the ML service (this script's ``serve`` command
+under uvicorn). It answers ``/predict`` after ``--latency-ms``. A
+``--slow-share`` of answers take ``--slow-ms`` instead, and the error scenarios
+turn a share of answers into 503s. The stand-in counts the TCP connections it
+accepts, so every scenario reports new connections per second next to
+throughput and p50/p99 latency. Scenarios:
+
+- ``per_call``: a new ``httpx.AsyncClient`` per prediction, as before pooling
+  (``--per-call-requests`` calls).
+- ``pooled``: ``MLServiceConnector.predict`` without retries or hedging.
+- ``hedged``: the same, with a second copy sent after ``--hedge-ms``.
+- ``retries``: 10% of answers are 503s, with no retries and then with 2.
+- ``breaker``: every answer is a 503, and the breaker opens after 5 failures.
+
+Every response is parsed into ``MLModelResponse``, so the run doubles as a
+check of the connector against a real HTTP server. Run from ``backend/``::
+
+    python benchmarks/bench_ml_connector.py --requests 5000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.ml_connector import (  # noqa: E402
+    CircuitBreaker,
+    MLServiceConnector,
+    MLServiceError,
+)
+from models.schemas import MLModelRequest, MLModelResponse  # noqa: E402
+
+SAMPLE_REQUEST = MLModelRequest(
+    monthly_income=60000,
+    dti_ratio=0.35,
+    foir=0.42,
+    savings_months=3.5,
+    emi_tenure_months=12,
+    purchase_amount=50000,
+    existing_emi=5000,
+)
+
+
+def create_stand_in() -> Any:
+    """A FastAPI app that answers like the ML service, with adjustable latency and errors."""
+    from fastapi import FastAPI, Request, Response
+    from fastapi.responses import JSONResponse
+    from starlette.requests import ClientDisconnect
+
+    app = FastAPI()
+    state = {"latency": 0.002, "slow_share": 0.0, "slow": 0.0, "error_share": 0.0}
+    connections: set[tuple] = set()
+    rng = random.Random(7)
+
+    @app.post("/predict")
+    async def predict(request: Request) -> Any:
+        connections.add(request.client)
+        try:
+            payload = await request.json()
+        except ClientDisconnect:
+            # The losing copy of a hedged call.
+            return Response(status_code=499)
+        slow = rng.random() < state["slow_share"]
+        await asyncio.sleep(state["slow"] if slow else state["latency"])
+        if rng.random() < state["error_share"]:
+            return JSONResponse({"detail": "overloaded"}, status_code=503)
+        risk = min(payload["dti_ratio"] * 0.6 + payload["foir"] * 0.4, 1.0)
+        return {
+            "risk_score": risk,
+            "risk_category": "Moderate",
+            "feature_importance": {"dti_ratio": 0.6, "foir": 0.4},
+            "model_version": "stand-in",
+        }
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"status": "ok"}
+
+    @app.post("/_control")
+    async def control(request: Request) -> dict:
+        """Apply new settings; returns and resets the connections seen so far."""
+        state.update(await request.json())
+        seen = len(connections)
+        connections.clear()
+        return {"connections": seen}
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_stand_in(port: int) -> subprocess.Popen:
+    process = subprocess.Popen([sys.executable, __file__, "serve", "--port", str(port)])
+    deadline = time.perf_counter() + 30
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Stand-in exited with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError("Stand-in did not start in time")
+
+
+def _control(base_url: str, **settings: float) -> int:
+    # A throwaway connection, so it never counts towards the next scenario.
+    return httpx.post(f"{base_url}/_control", json=settings, timeout=5).json()["connections"]
+
+
+async def _drive(
+    call: Callable[[], Awaitable[MLModelResponse]],
+    requests: int,
+    concurrency: int,
+) -> tuple[list[float], dict[str, int], float]:
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                result = await call()
+            except MLServiceError as exc:
+                name = type(exc).__name__
+                errors[name] = errors.get(name, 0) + 1
+                continue
+            if not isinstance(result, MLModelResponse):
+                raise AssertionError(f"Unexpected result {result!r}")
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def _report(
+    label: str,
+    latencies: list[float],
+    errors: dict[str, int],
+    elapsed: float,
+    connections: int,
+) -> None:
+    if latencies:
+        p50, p99 = np.percentile(latencies, [50, 99])
+        timing = f"p50 {p50:7.2f} ms   p99 {p99:7.2f} ms"
+    else:
+        timing = "no successful calls"
+    print(
+        f"{label:<20} {len(latencies) / elapsed:6,.0f} calls/s   {timing}   "
+        f"{connections:5} conns ({connections / elapsed:6,.1f}/s)   errors {errors or 0}"
+    )
+
+
+async def _per_call(base_url: str) -> MLModelResponse:
+    async with httpx.AsyncClient() as client:
+        response = await client.post(f"{base_url}/predict", json=SAMPLE_REQUEST.model_dump())
+        response.raise_for_status()
+        return MLModelResponse(**response.json())
+
+
+async def _scenario(
+    args: argparse.Namespace,
+    base_url: str,
+    label: str,
+    call: Callable[[], Awaitable[MLModelResponse]],
+    connector: MLServiceConnector | None = None,
+    requests: int | None = None,
+    **settings: float,
+) -> tuple[list[float], dict[str, int]]:
+    _control(base_url, **settings)
+    latencies, errors, elapsed = await _drive(call, requests or args.requests, args.concurrency)
+    if connector is not None:
+        await connector.aclose()
+    _report(label, latencies, errors, elapsed, _control(base_url))
+    return latencies, errors
+
+
+async def run(args: argparse.Namespace, base_url: str) -> int:
+    def connector(**options: Any) -> MLServiceConnector:
+        options.setdefault("max_retries", 0)
+        return MLServiceConnector(
+            base_url=base_url,
+            timeout=10,
+            max_connections=args.concurrency,
+            max_keepalive_connections=args.concurrency,
+            hedge_after=options.pop("hedge_after", 0),
+            **options,
+        )
+
+    steady = {"latency": args.latency_ms / 1000, "slow_share": 0.0, "error_share": 0.0}
+    tail = {**steady, "slow_share": args.slow_share, "slow": args.slow_ms / 1000}
+    print(
+        f"{args.requests} calls from {args.concurrency} callers; stand-in answers in "
+        f"{args.latency_ms:g} ms, or {args.slow_ms:g} ms for {args.slow_share:.0%} of calls"
+    )
+
+    per_call = {"requests": args.per_call_requests}
+    await _scenario(
+        args, base_url, "per_call", lambda: _per_call(base_url), **per_call, **steady
+    )
+    pooled = connector()
+    await _scenario(
+        args, base_url, "pooled", lambda: pooled.predict(SAMPLE_REQUEST), pooled, **steady
+    )
+    await _scenario(
+        args, base_url, "per_call, slow tail", lambda: _per_call(base_url), **per_call, **tail
+    )
+    pooled = connector()
+    await _scenario(
+        args, base_url, "pooled, slow tail", lambda: pooled.predict(SAMPLE_REQUEST), pooled, **tail
+    )
+    hedged = connector(hedge_after=args.hedge_ms / 1000)
+    await _scenario(
+        args, base_url, "hedged, slow tail", lambda: hedged.predict(SAMPLE_REQUEST), hedged, **tail
+    )
+    print(f"  hedged {hedged.hedged} calls, the second copy won {hedged.hedge_wins}")
+
+    flaky = {**steady, "error_share": 0.1}
+    plain = connector()
+    _, no_retry_errors = await _scenario(
+        args, base_url, "503s, no retries", lambda: plain.predict(SAMPLE_REQUEST), plain, **flaky
+    )
+    # A breaker that never opens, so the retry numbers show retries alone.
+    retrying = connector(max_retries=2, breaker=CircuitBreaker(failure_threshold=10**9))
+    _, retry_errors = await _scenario(
+        args,
+        base_url,
+        "503s, 2 retries",
+        lambda: retrying.predict(SAMPLE_REQUEST),
+        retrying,
+        **flaky,
+    )
+    print(f"  retried {retrying.retries} calls")
+
+    breaking = connector(max_retries=2, breaker=CircuitBreaker(5, reset_timeout=60))
+    down = {**steady, "error_share": 1.0}
+    await _scenario(
+        args, base_url, "service down", lambda: breaking.predict(SAMPLE_REQUEST), breaking, **down
+    )
+    print(
+        f"  {breaking.requests} calls reached the service, "
+        f"{breaking.short_circuited} failed fast on the open breaker"
+    )
+    _control(base_url, **steady)
+
+    if sum(retry_errors.values()) >= sum(no_retry_errors.values()):
+        print("retries did not reduce failures", file=sys.stderr)
+        return 1
+    if breaking.short_circuited == 0 or breaking.breaker.state != "open":
+        print("the breaker never opened", file=sys.stderr)
+        return 1
+    if not await connector().health_check():
+        print("health check failed", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subcommands = parser.add_subparsers(dest="command")
+    serve = subcommands.add_parser("serve", help="run the stand-in ML service")
+    serve.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=5000)
+    # Building a client per call is slow enough that fewer calls give the same picture.
+    parser.add_argument("--per-call-requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--slow-share", type=float, default=0.02)
+    parser.add_argument("--slow-ms", type=float, default=100.0)
+    parser.add_argument("--hedge-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        import uvicorn
+
+        uvicorn.run(create_stand_in(), host="127.0.0.1", port=args.port, log_level="warning")
+        return 0
+
+    port = _free_port()
+    process = _start_stand_in(port)
+    try:
+        return asyncio.run(run(args, f"http://127.0.0.1:{port}"))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
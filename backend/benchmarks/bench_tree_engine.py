@@ -0,0 +1,98 @@
+"""Compare the native tree engine with the xgboost scoring path.
+
+Run from ``backend/``::
+
+    python benchmarks/bench_tree_engine.py --rows 10000
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import DEFAULT_JSON_MODEL_NAME, PROJECT_ROOT, _predict_risk_probabilities  # noqa: E402
+from tree_engine import CompiledTreeEnsemble  # noqa: E402
+
+PARITY_TOLERANCE = 1e-6
+
+
+def _sample_rows(engine: CompiledTreeEnsemble, row_count: int, seed: int) -> np.ndarray:
+    # Draw each feature across the span of split thresholds the trees actually use.
+    rng = np.random.default_rng(seed)
+    feature_count = len(engine.feature_names or []) or int(engine.feature_index.max()) + 1
+    rows = np.empty((row_count, feature_count), dtype=np.float32)
+    finite = np.isfinite(engine.threshold)
+    for feature in range(feature_count):
+        used = engine.threshold[finite & (engine.feature_index == feature)]
+        low, high = (float(used.min()), float(used.max())) if used.size else (0.0, 1.0)
+        margin = (high - low) * 0.1 or 1.0
+        rows[:, feature] = rng.uniform(low - margin, high + margin, size=row_count)
+    return rows
+
+
+def _time_call(function, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list[float]) -> None:
+    ordered = sorted(timings)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<28} median {statistics.median(ordered):9.3f} ms   p99 {p99:9.3f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--model",
+        type=Path,
+        default=PROJECT_ROOT.parent / "ml-service" / DEFAULT_JSON_MODEL_NAME,
+    )
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--single-repeat", type=int, default=500)
+    parser.add_argument("--batch-repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    booster = xgb.Booster()
+    booster.load_model(str(args.model))
+    started = time.perf_counter()
+    engine = CompiledTreeEnsemble.from_booster(booster)
+    compile_ms = (time.perf_counter() - started) * 1000
+    print(f"compiled {engine.num_trees} trees, depth {engine.max_depth}, in {compile_ms:.1f} ms")
+
+    matrix = _sample_rows(engine, args.rows, args.seed)
+    frame = pd.DataFrame(matrix, columns=engine.feature_names)
+
+    expected = _predict_risk_probabilities(booster, frame)
+    actual = _predict_risk_probabilities(engine, frame)
+    max_error = float(np.max(np.abs(expected - actual)))
+    print(f"parity over {args.rows} rows: max |diff| = {max_error:.3e}")
+
+    single = frame.iloc[:1]
+    for label, model in (("xgboost", booster), ("native", engine)):
+        timings = _time_call(lambda: _predict_risk_probabilities(model, single), args.single_repeat)
+        _report(f"{label} single row", timings)
+    for label, model in (("xgboost", booster), ("native", engine)):
+        timings = _time_call(lambda: _predict_risk_probabilities(model, frame), args.batch_repeat)
+        _report(f"{label} {args.rows} rows", timings)
+
+    if max_error > PARITY_TOLERANCE:
+        print(f"FAIL: parity error exceeds {PARITY_TOLERANCE}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,108 @@
+"""Measure per-worker memory of serve.py with and without a preloaded, shared model.
+
+Starts the launcher, lets every worker score some requests, then reads RSS,
+PSS and private memory per worker from ``/workers``. PSS splits shared pages
+across the processes that map them, so its sum is the real footprint. Run from
+``backend/``::
+
+    python benchmarks/bench_worker_memory.py --workers 4
+    INFERENCE_ENGINE=native python benchmarks/bench_worker_memory.py --workers 4
+"""
+
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SAMPLE_PAYLOAD = {
+    "avg_monthly_inflow": 100000,
+    "inflow_volatility": 0.2,
+    "avg_monthly_outflow": 60000,
+    "min_balance_30d": 15000,
+    "neg_balance_days_30d": 0,
+    "purchase_to_inflow_ratio": 0.3,
+    "total_burden_ratio": 0.45,
+    "buffer_ratio": 0.25,
+    "stress_index": 0.2,
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _measure(workers: int, preload: bool, requests: int, workdir: str) -> dict:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{workdir}/memory_{int(preload)}.db",
+        "WORKER_METRICS_INTERVAL_SECONDS": "0.5",
+    }
+    command = [sys.executable, "serve.py", "--workers", str(workers), "--port", str(port)]
+    command += ["--log-level", "warning"] + ([] if preload else ["--no-preload"])
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.perf_counter() + 120
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Launcher exited with code {process.returncode}")
+            try:
+                report = httpx.get(f"{base_url}/workers", timeout=2).json()
+                if report["workers"] == workers:
+                    break
+            except (httpx.HTTPError, ValueError, KeyError):
+                pass
+            if time.perf_counter() > deadline:
+                raise RuntimeError("Workers did not come up in time")
+            time.sleep(0.2)
+
+        # New connections are spread across workers by the kernel.
+        for _ in range(requests):
+            httpx.post(f"{base_url}/predict", json=SAMPLE_PAYLOAD, timeout=10)
+        time.sleep(1.5)
+        return httpx.get(f"{base_url}/workers", timeout=5).json()
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for preload in (False, True):
+            report = _measure(args.workers, preload, args.requests, workdir)
+            label = "preloaded" if preload else "per-worker load"
+            print(f"{label} ({report['workers']} workers, {report['scored_rows']} rows scored)")
+            for item in report["items"]:
+                memory = item["memory"]
+                print(
+                    f"  pid {item['pid']:<7} rss {memory.get('rss_mb', 0):7.1f} MiB   "
+                    f"pss {memory.get('pss_mb', 0):7.1f} MiB   "
+                    f"private {memory.get('private_mb', 0):7.1f} MiB   "
+                    f"rows {item['scored_rows']}"
+                )
+            totals = report["memory"]
+            print(
+                f"  total   rss {totals['rss_mb']:7.1f} MiB   pss {totals['pss_mb']:7.1f} MiB   "
+                f"private {totals['private_mb']:7.1f} MiB"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
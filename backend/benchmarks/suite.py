@@ -0,0 +1,509 @@
+"""Reproducible benchmark suite for the /predict, /stats and /logs hot paths.
+
+``run`` seeds a SQLite database of ``--seed-rows`` decisions. The seeded file is
+cached under ``--data-dir`` and copied for every run, so each run starts from
+the same table. The suite then times in-process microbenchmarks of the model
+call and the CRUD functions. It starts ``uvicorn main:app`` against the copy
+and drives three HTTP scenarios:
+
+- ``checkout``: steady /predict traffic with varied applicants.
+- ``dashboard``: a polling storm of /stats and first /logs pages.
+- ``deep_paging``: /logs far into the table, by page offset and by cursor.
+
+Every benchmark reports p50/p95/p99 latency in ms and throughput per second,
+written as JSON. ``compare`` checks results against a baseline and exits with
+status 1 when a shared benchmark regressed by more than ``--tolerance``. Run
+from ``backend/``::
+
+    python benchmarks/suite.py run --output baseline.json
+    python benchmarks/suite.py run --output current.json --compare baseline.json
+    python benchmarks/suite.py compare baseline.json current.json --tolerance 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+SEED_SPAN_DAYS = 180
+LATENCY_METRICS = ("p50", "p95", "p99")
+DEFAULT_COMPARE_METRICS = ("p50", "p95", "throughput")
+
+
+def _payloads(seed: int, count: int) -> list[dict]:
+    from synthetic_data import FEATURE_COLUMNS, iter_chunks
+
+    chunk = next(iter_chunks(count, seed, chunk_rows=count))
+    columns = [chunk[name].tolist() for name in FEATURE_COLUMNS]
+    return [dict(zip(FEATURE_COLUMNS, row)) for row in zip(*columns)]
+
+
+def _seed_database(path: Path, rows: int, seed: int) -> None:
+    from sqlalchemy import create_engine
+
+    from synthetic_data import seed_transactions
+
+    bind = create_engine(f"sqlite:///{path}")
+    started = time.perf_counter()
+    seed_transactions(bind, rows, seed=seed, days=SEED_SPAN_DAYS, model_version="seed")
+    bind.dispose()
+    print(f"seeded {rows} rows in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+
+
+def _prepare_database_copy(args: argparse.Namespace, working_copy: Path) -> None:
+    data_dir = Path(args.data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    cached = data_dir / f"transactions-{args.seed_rows}-{args.seed}.db"
+    if not cached.exists():
+        partial = cached.with_suffix(".partial")
+        partial.unlink(missing_ok=True)
+        _seed_database(partial, args.seed_rows, args.seed)
+        os.replace(partial, cached)
+    shutil.copyfile(cached, working_copy)
+
+
+def _summarize(latencies_ms: list[float], elapsed: float, errors: int = 0) -> dict:
+    if not latencies_ms:
+        return {"n": 0, "errors": errors, "throughput": 0.0}
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "n": len(latencies_ms),
+        "errors": errors,
+        "throughput": round(len(latencies_ms) / elapsed, 2),
+        "mean": round(float(np.mean(latencies_ms)), 4),
+        "p50": round(float(p50), 4),
+        "p95": round(float(p95), 4),
+        "p99": round(float(p99), 4),
+    }
+
+
+def _time_calls(function: Callable[[], Any], iterations: int, budget: float) -> dict:
+    for _ in range(min(5, iterations)):
+        function()
+    latencies = []
+    deadline = time.perf_counter() + budget
+    while len(latencies) < iterations and time.perf_counter() < deadline:
+        started = time.perf_counter()
+        function()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return _summarize(latencies, sum(latencies) / 1000)
+
+
+def _deep_cursors(session_factory: Any, total: int, count: int, seed: int) -> list[str]:
+    import crud
+    from models import Transaction
+
+    rng = random.Random(seed)
+    cursors = []
+    with session_factory() as db:
+        for _ in range(count):
+            offset = rng.randint(total // 2, max(total // 2, total - 1000))
+            row = (
+                db.query(Transaction)
+                .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+                .offset(offset)
+                .limit(1)
+                .one()
+            )
+            cursors.append(crud.encode_log_cursor(row))
+    return cursors
+
+
+def _run_micro(args: argparse.Namespace, workdir: Path) -> dict:
+    from sqlalchemy import create_engine
+
+    import crud
+    from database import SessionLocal
+    from main import MODEL_VERSION, _build_model_version, _load_default_model
+    from main import _predict_risk_probability, _predict_risk_probabilities
+    from schema import prepare_database
+
+    model, model_path, metadata_path = _load_default_model()
+    version = _build_model_version(MODEL_VERSION, model, metadata_path, model_path)
+    columns = version.feature_columns
+    rows = np.array(
+        [[payload[name] for name in columns] for payload in _payloads(args.seed, 4096)],
+        dtype=float,
+    )
+    iterations, budget = args.micro_iterations, args.micro_budget
+    results = {}
+    state = {"row": 0}
+
+    def next_row() -> np.ndarray:
+        state["row"] = (state["row"] + 1) % len(rows)
+        return rows[state["row"]][None, :]
+
+    results["micro.predict_risk_probability"] = _time_calls(
+        lambda: _predict_risk_probability(version.model, next_row(), columns), iterations, budget
+    )
+    results["micro.predict_risk_probabilities_100"] = _time_calls(
+        lambda: _predict_risk_probabilities(version.model, rows[:100], columns),
+        iterations,
+        budget,
+    )
+
+    # Writes go to a scratch database so the seeded table stays identical.
+    scratch = create_engine(f"sqlite:///{workdir / 'scratch.db'}")
+    prepare_database(scratch)
+    decision_rows = [
+        {**payload, "risk_probability": 0.4, "decision": "Approve", "model_version": "bench"}
+        for payload in _payloads(args.seed + 1, 100)
+    ]
+    with SessionLocal(bind=scratch) as db:
+        results["micro.create_transactions_1"] = _time_calls(
+            lambda: crud.create_transactions(db, decision_rows[:1]), iterations, budget
+        )
+        results["micro.create_transactions_100"] = _time_calls(
+            lambda: crud.create_transactions(db, decision_rows), iterations, budget
+        )
+    scratch.dispose()
+
+    with SessionLocal() as db:
+        total = crud.count_transactions(db)
+        deep_page = max(1, total // 20 // 2)
+        results["micro.get_decision_counts"] = _time_calls(
+            lambda: crud.get_decision_counts(db), iterations, budget
+        )
+        results["micro.get_logs_first_page"] = _time_calls(
+            lambda: crud.get_logs(db, page=1, limit=20), iterations, budget
+        )
+        results["micro.get_logs_deep_offset"] = _time_calls(
+            lambda: crud.get_logs(db, page=deep_page, limit=20),
+            max(1, iterations // 10),
+            budget,
+        )
+        cursor = crud.decode_log_cursor(_deep_cursors(SessionLocal, total, 1, args.seed)[0])
+        results["micro.get_logs_after_deep_cursor"] = _time_calls(
+            lambda: crud.get_logs_after(db, limit=20, after=cursor), iterations, budget
+        )
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 120.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/ready", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError("Server did not become ready in time")
+
+
+async def _drive(
+    base_url: str,
+    concurrency: int,
+    duration: float,
+    request_fn: Callable[[httpx.AsyncClient, random.Random, int], Any],
+    seed: int,
+) -> dict[str, dict]:
+    """Run ``concurrency`` closed-loop clients; ``request_fn`` returns ``(name, response)``."""
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+
+        async def worker(slot: int) -> None:
+            rng = random.Random(seed * 1000 + slot)
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                name, response = await request_fn(client, rng, slot)
+                if response.status_code < 400:
+                    latencies.setdefault(name, []).append((time.perf_counter() - started) * 1000)
+                else:
+                    errors[name] = errors.get(name, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(slot) for slot in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    names = set(latencies) | set(errors)
+    return {
+        name: _summarize(latencies.get(name, []), elapsed, errors.get(name, 0)) for name in names
+    }
+
+
+def _checkout_requests(seed: int) -> Callable:
+    payloads = _payloads(seed + 2, 2048)
+
+    async def request(client: httpx.AsyncClient, rng: random.Random, slot: int) -> tuple:
+        return "checkout.predict", await client.post("/predict", json=rng.choice(payloads))
+
+    return request
+
+
+async def _dashboard_request(client: httpx.AsyncClient, rng: random.Random, slot: int) -> tuple:
+    if rng.random() < 0.5:
+        return "dashboard.stats", await client.get("/stats")
+    return "dashboard.logs_first_page", await client.get("/logs", params={"page": 1, "limit": 20})
+
+
+def _deep_paging_requests(total: int, cursors: list[str]) -> Callable:
+    total_pages = max(1, total // 20)
+    positions: dict[int, str | None] = {}
+
+    async def request(client: httpx.AsyncClient, rng: random.Random, slot: int) -> tuple:
+        if slot % 2 == 0:
+            page = rng.randint(total_pages // 2, total_pages)
+            return "deep_paging.offset", await client.get(
+                "/logs", params={"page": page, "limit": 20}
+            )
+        # Keyset clients walk forward from a deep cursor, restarting at the end.
+        after = positions.get(slot) or rng.choice(cursors)
+        response = await client.get("/logs", params={"after": after, "limit": 20})
+        if response.status_code == 200:
+            positions[slot] = response.json().get("next_cursor")
+        return "deep_paging.keyset", response
+
+    return request
+
+
+def _run_http(args: argparse.Namespace, database_path: Path, cursors: list[str], total: int):
+    port = _free_port()
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{database_path}"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)]
+        + ["--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    scenarios = {
+        "dashboard": (args.dashboard_concurrency, _dashboard_request),
+        "deep_paging": (args.paging_concurrency, _deep_paging_requests(total, cursors)),
+        # Checkout writes to the table, so it runs after the read-only scenarios.
+        "checkout": (args.checkout_concurrency, _checkout_requests(args.seed)),
+    }
+    results = {}
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        _wait_ready(base_url, process)
+        for name, (concurrency, request_fn) in scenarios.items():
+            if name not in args.scenarios:
+                continue
+            asyncio.run(_drive(base_url, concurrency, args.warmup, request_fn, args.seed))
+            results.update(
+                asyncio.run(_drive(base_url, concurrency, args.duration, request_fn, args.seed))
+            )
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return results
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_results(results: dict[str, dict]) -> None:
+    print(f"{'benchmark':<40} {'n':>7} {'per s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name in sorted(results):
+        result = results[name]
+        if not result["n"]:
+            print(f"{name:<40} {0:>7} {'-':>9}   errors {result['errors']}")
+            continue
+        errors = f"   errors {result['errors']}" if result["errors"] else ""
+        print(
+            f"{name:<40} {result['n']:>7} {result['throughput']:>9.1f} {result['p50']:>9.3f} "
+            f"{result['p95']:>9.3f} {result['p99']:>9.3f}{errors}"
+        )
+
+
+def compare_results(
+    baseline: dict,
+    current: dict,
+    tolerance: float,
+    metrics: tuple[str, ...] = DEFAULT_COMPARE_METRICS,
+    min_delta_ms: float = 0.0,
+) -> list[str]:
+    """Regressions of ``current`` against ``baseline`` beyond ``tolerance`` (a fraction)."""
+    regressions = []
+    baseline_results, current_results = baseline["results"], current["results"]
+    print(f"{'benchmark':<40} {'metric':<10} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name in sorted(set(baseline_results) & set(current_results)):
+        for metric in metrics:
+            before = baseline_results[name].get(metric)
+            after = current_results[name].get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if metric in LATENCY_METRICS:
+                regressed = change > tolerance and after - before > min_delta_ms
+            else:
+                regressed = change < -tolerance
+            status = "REGRESSED" if regressed else ""
+            print(
+                f"{name:<40} {metric:<10} {before:>10.3f} {after:>10.3f} {change:>+8.1%} {status}"
+            )
+            if regressed:
+                regressions.append(f"{name} {metric}: {before:.3f} -> {after:.3f} ({change:+.1%})")
+        errors_before = baseline_results[name].get("errors", 0)
+        errors_after = current_results[name].get("errors", 0)
+        if errors_after > errors_before:
+            regressions.append(f"{name} errors: {errors_before} -> {errors_after}")
+    return regressions
+
+
+def _report_regressions(regressions: list[str], tolerance: float) -> int:
+    if not regressions:
+        print(f"no regressions beyond {tolerance:.0%}")
+        return 0
+    print(f"{len(regressions)} regressions beyond {tolerance:.0%}:")
+    for regression in regressions:
+        print(f"  {regression}")
+    return 1
+
+
+def run(args: argparse.Namespace) -> int:
+    if args.quick:
+        args.seed_rows = min(args.seed_rows, 50_000)
+        args.duration = min(args.duration, 3.0)
+        args.warmup = min(args.warmup, 1.0)
+        args.micro_iterations = min(args.micro_iterations, 200)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # database.py reads DATABASE_URL at import, so set it before any app module loads.
+        database_path = Path(workdir) / "suite.db"
+        os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+        _prepare_database_copy(args, database_path)
+        import crud
+        from database import SessionLocal, engine
+
+        results: dict[str, dict] = {}
+        if "micro" in args.scenarios:
+            results.update(_run_micro(args, Path(workdir)))
+        with SessionLocal() as db:
+            total = crud.count_transactions(db)
+        cursors = _deep_cursors(SessionLocal, total, 16, args.seed)
+        engine.dispose()
+        if set(args.scenarios) - {"micro"}:
+            results.update(_run_http(args, database_path, cursors, total))
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "inference_engine": os.getenv("INFERENCE_ENGINE", "xgboost"),
+            "seed_rows": args.seed_rows,
+            "duration": args.duration,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    _print_results(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"wrote {args.output}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare_results(
+            baseline, report, args.tolerance, tuple(args.metrics), args.min_delta_ms
+        )
+        return _report_regressions(regressions, args.tolerance)
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    regressions = compare_results(
+        baseline, current, args.tolerance, tuple(args.metrics), args.min_delta_ms
+    )
+    return _report_regressions(regressions, args.tolerance)
+
+
+def _add_compare_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--tolerance", type=float, default=0.15, help="Allowed fractional slowdown"
+    )
+    parser.add_argument(
+        "--metrics",
+        nargs="+",
+        default=list(DEFAULT_COMPARE_METRICS),
+        choices=[*LATENCY_METRICS, "throughput"],
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=0.02,
+        help="Ignore latency changes smaller than this, however large in relative terms",
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the suite and optionally compare")
+    run_parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        default=["micro", "dashboard", "deep_paging", "checkout"],
+        choices=["micro", "dashboard", "deep_paging", "checkout"],
+    )
+    run_parser.add_argument("--seed-rows", type=int, default=2_000_000)
+    run_parser.add_argument("--seed", type=int, default=7)
+    run_parser.add_argument("--data-dir", default=str(BACKEND_DIR / "benchmarks" / ".data"))
+    run_parser.add_argument("--duration", type=float, default=15.0, help="Seconds per scenario")
+    run_parser.add_argument("--warmup", type=float, default=2.0)
+    run_parser.add_argument("--checkout-concurrency", type=int, default=16)
+    run_parser.add_argument("--dashboard-concurrency", type=int, default=32)
+    run_parser.add_argument("--paging-concurrency", type=int, default=8)
+    run_parser.add_argument("--micro-iterations", type=int, default=2000)
+    run_parser.add_argument("--micro-budget", type=float, default=5.0, help="Seconds per micro")
+    run_parser.add_argument("--quick", action="store_true", help="Small table, short scenarios")
+    run_parser.add_argument("--output", help="Write results as JSON")
+    run_parser.add_argument("--compare", help="Baseline JSON to check the results against")
+    _add_compare_options(run_parser)
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    _add_compare_options(compare_parser)
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+"""Collapse a calibrated classifier pickle into one booster plus an isotonic lookup table.
+
+The notebook's ``CalibratedClassifierCV(method="isotonic", cv=3)`` pickle
+scores every row with three fold boosters and averages their calibrated
+outputs. This script keeps a single booster: ``--booster`` if given, else the
+pickle's top-level ``estimator`` if it is fitted (the notebook fits it on the
+full training data before wrapping it), else the booster of fold ``--fold``
+(default 0). A fold booster saw two thirds of the data, or all of it in a
+pickle fitted with ``ensemble=False``. The script fits one isotonic table that
+maps the kept booster's margin onto the pickle's averaged probability over
+reference rows from ``--data``. It then writes the booster,
+``calibration.json``, ``drift_reference.json`` (the held-out rows and their
+scores) and ``model_metadata.json`` to ``--out-dir``, which is the layout
+``MODEL_REGISTRY_DIR`` versions and ``model/`` use::
+
+    python calibrate_model.py --calibrated model/bnpl_cashflow_model.pkl \\
+        --data ../data/synthetic_training_data.csv --out-dir model/registry/v3
+
+A held-out share of the reference rows is scored both ways. The script fails
+if the mean difference or the decision agreement at the threshold is worse
+than the given limits.
+"""
+
+import argparse
+import json
+import shutil
+from pathlib import Path
+
+import joblib
+import numpy as np
+import xgboost as xgb
+
+from calibration import CALIBRATION_FILE_NAME, CalibratedBooster, IsotonicCalibrator
+from drift import DRIFT_REFERENCE_FILE_NAME, RISK_COLUMN, DriftReference
+from main import (
+    DEFAULT_JSON_MODEL_NAME,
+    _load_metadata,
+    _predict_risk_probabilities,
+    _resolve_model_paths,
+)
+from model_registry import METADATA_FILE_NAME, load_model_file
+from train_model import _data_files, _read_batches
+
+
+def _fitted_booster(estimator: object) -> xgb.Booster | None:
+    from sklearn.exceptions import NotFittedError
+    from sklearn.utils.validation import check_is_fitted
+
+    if not isinstance(estimator, xgb.XGBClassifier):
+        return None
+    try:
+        check_is_fitted(estimator)
+    except NotFittedError:
+        return None
+    return estimator.get_booster()
+
+
+def _kept_booster(calibrated: object, fold: int | None) -> tuple[xgb.Booster, str]:
+    """The booster to keep from a calibrated pickle, and which one it is."""
+    if fold is None:
+        booster = _fitted_booster(getattr(calibrated, "estimator", None))
+        if booster is not None:
+            return booster, "estimator"
+        fold = 0
+    folds = getattr(calibrated, "calibrated_classifiers_", None)
+    if not folds:
+        raise SystemExit("the pickle is not a fitted CalibratedClassifierCV; pass --booster")
+    if not 0 <= fold < len(folds):
+        raise SystemExit(f"--fold {fold} is out of range; the pickle has {len(folds)} folds")
+    booster = _fitted_booster(folds[fold].estimator)
+    if booster is None:
+        raise SystemExit(f"fold {fold} holds no fitted XGBoost booster; pass --booster")
+    return booster, f"fold {fold}"
+
+
+def _reference_rows(files: list[Path], columns: list[str], rows: int) -> np.ndarray:
+    parts: list[np.ndarray] = []
+    remaining = rows
+    for path in files:
+        for batch in _read_batches(path, columns, min(remaining, 250_000)):
+            parts.append(batch[:remaining])
+            remaining -= len(parts[-1])
+            if not remaining:
+                return np.vstack(parts)
+    if not parts:
+        raise SystemExit("--data has no rows")
+    return np.vstack(parts)
+
+
+def main() -> int:
+    default_model_path, default_metadata_path = _resolve_model_paths()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calibrated", type=Path, default=default_model_path)
+    parser.add_argument("--metadata", type=Path, default=default_metadata_path)
+    parser.add_argument("--booster", type=Path, help="Booster to keep instead of a fold's")
+    parser.add_argument(
+        "--fold", type=int, help="Keep this fold's booster instead of the fitted estimator"
+    )
+    parser.add_argument("--data", type=Path, nargs="+", required=True)
+    parser.add_argument("--out-dir", type=Path, required=True)
+    parser.add_argument("--rows", type=int, default=200_000, help="Reference rows to read")
+    parser.add_argument("--holdout-fraction", type=float, default=0.25)
+    parser.add_argument("--max-mean-diff", type=float, default=0.02)
+    parser.add_argument("--min-agreement", type=float, default=0.99)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    metadata = _load_metadata(args.metadata)
+    feature_columns = list(metadata["feature_columns"])
+    threshold = float(metadata["threshold"])
+    calibrated = joblib.load(args.calibrated)
+    if args.booster is not None:
+        booster = xgb.Booster()
+        booster.load_model(str(args.booster))
+        kept = str(args.booster)
+    else:
+        booster, kept = _kept_booster(calibrated, args.fold)
+    fold_count = len(getattr(calibrated, "calibrated_classifiers_", [])) or 1
+
+    rows = _reference_rows(_data_files(args.data), feature_columns, args.rows)
+    held_out = np.random.default_rng(args.seed).random(len(rows)) < args.holdout_fraction
+    if held_out.all() or not held_out.any():
+        raise SystemExit("--holdout-fraction leaves no rows to fit or to check")
+    targets = _predict_risk_probabilities(calibrated, rows, feature_columns)
+    margins = booster.predict(xgb.DMatrix(rows, feature_names=feature_columns), output_margin=True)
+    calibrator = IsotonicCalibrator.fit(margins[~held_out], targets[~held_out])
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    model_path = args.out_dir / DEFAULT_JSON_MODEL_NAME
+    booster.save_model(str(model_path))
+    calibrator.save(args.out_dir / CALIBRATION_FILE_NAME)
+    if args.metadata.resolve() != (args.out_dir / METADATA_FILE_NAME).resolve():
+        shutil.copyfile(args.metadata, args.out_dir / METADATA_FILE_NAME)
+
+    # Score the held-out rows through the saved artifacts, the way the API loads them.
+    collapsed = load_model_file(model_path)
+    if not isinstance(collapsed, CalibratedBooster):
+        raise SystemExit(f"{model_path} did not load with its calibration table")
+    expected = targets[held_out]
+    served = _predict_risk_probabilities(collapsed, rows[held_out], feature_columns)
+    DriftReference.from_samples(
+        feature_columns + [RISK_COLUMN], np.column_stack([rows[held_out], served])
+    ).save(args.out_dir / DRIFT_REFERENCE_FILE_NAME)
+    difference = np.abs(served - expected)
+    agreement = float(np.mean((served >= threshold) == (expected >= threshold)))
+    summary = {
+        "booster_kept": kept,
+        "folds_replaced": fold_count,
+        "breakpoints": calibrator.size,
+        "fit_rows": int((~held_out).sum()),
+        "check_rows": int(held_out.sum()),
+        "mean_abs_diff": round(float(difference.mean()), 6),
+        "p99_abs_diff": round(float(np.percentile(difference, 99)), 6),
+        "max_abs_diff": round(float(difference.max()), 6),
+        "decision_agreement": round(agreement, 6),
+    }
+    print(
+        f"wrote {model_path}, {CALIBRATION_FILE_NAME} and {DRIFT_REFERENCE_FILE_NAME} "
+        f"to {args.out_dir}"
+    )
+    print(json.dumps(summary, indent=2))
+    passed = summary["mean_abs_diff"] <= args.max_mean_diff and agreement >= args.min_agreement
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from tree_engine import CompiledTreeEnsemble
+
+CALIBRATION_FILE_NAME = "calibration.json"
+
+
+class IsotonicCalibrator:
+    """Monotone piecewise-linear map from booster margin to probability.
+
+    The map is stored as sorted breakpoints and evaluated with ``np.interp``
+    (a binary search per row). Margins outside the fitted range are clipped
+    to the end values, like ``IsotonicRegression(out_of_bounds="clip")``.
+    """
+
+    def __init__(self, margins: Any, probabilities: Any) -> None:
+        self.margins = np.ascontiguousarray(margins, dtype=np.float64)
+        self.probabilities = np.ascontiguousarray(probabilities, dtype=np.float64)
+        if self.margins.ndim != 1 or self.margins.shape != self.probabilities.shape:
+            raise ValueError("Calibration breakpoints must be two 1-D arrays of equal length.")
+        if self.margins.size == 0:
+            raise ValueError("Calibration needs at least one breakpoint.")
+        if np.any(np.diff(self.margins) < 0) or np.any(np.diff(self.probabilities) < 0):
+            raise ValueError("Calibration breakpoints must be non-decreasing.")
+
+    @property
+    def size(self) -> int:
+        return int(self.margins.size)
+
+    @classmethod
+    def fit(
+        cls,
+        margins: np.ndarray,
+        targets: np.ndarray,
+        sample_weight: np.ndarray | None = None,
+    ) -> "IsotonicCalibrator":
+        # scikit-learn is only needed to fit the table, never to serve it.
+        from sklearn.isotonic import IsotonicRegression
+
+        regression = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds="clip")
+        regression.fit(np.asarray(margins, dtype=np.float64), targets, sample_weight)
+        return cls(regression.X_thresholds_, regression.y_thresholds_)
+
+    def transform(self, margins: np.ndarray) -> np.ndarray:
+        return np.interp(np.asarray(margins, dtype=np.float64), self.margins, self.probabilities)
+
+    def save(self, path: Path) -> None:
+        payload = {
+            "method": "isotonic",
+            "input": "margin",
+            "margins": self.margins.tolist(),
+            "probabilities": self.probabilities.tolist(),
+        }
+        Path(path).write_text(json.dumps(payload), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "IsotonicCalibrator":
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        if payload.get("method") != "isotonic" or payload.get("input") != "margin":
+            raise ValueError(f"Unsupported calibration artifact {path}.")
+        return cls(payload["margins"], payload["probabilities"])
+
+
+class CalibratedBooster:
+    """One booster whose raw margin is mapped to a risk probability by a calibrator.
+
+    Replaces a ``CalibratedClassifierCV`` pickle, which scores every row with
+    each of its fold models and averages their calibrated outputs.
+    """
+
+    def __init__(self, model: Any, calibrator: IsotonicCalibrator) -> None:
+        self.model = model
+        self.calibrator = calibrator
+
+    def predict_margin(self, rows: Any, feature_columns: list[str] | None = None) -> np.ndarray:
+        if isinstance(self.model, CompiledTreeEnsemble):
+            return self.model.predict_margin(rows)
+
+        import xgboost as xgb
+
+        if isinstance(rows, np.ndarray):
+            matrix = xgb.DMatrix(rows, feature_names=feature_columns)
+        else:
+            matrix = xgb.DMatrix(rows)
+        return np.asarray(self.model.predict(matrix, output_margin=True), dtype=float)
+
+    def predict(self, rows: Any, feature_columns: list[str] | None = None) -> np.ndarray:
+        return self.calibrator.transform(self.predict_margin(rows, feature_columns))
+
+
+def attach_calibration(model: Any, model_path: Path) -> Any:
+    """Wrap a booster in ``CalibratedBooster`` when a calibration file sits next to it."""
+    calibration_path = Path(model_path).parent / CALIBRATION_FILE_NAME
+    if not calibration_path.exists():
+        return model
+    return CalibratedBooster(model, IsotonicCalibrator.load(calibration_path))
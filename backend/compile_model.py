@@ -0,0 +1,76 @@
+"""Precompile an XGBoost booster into fast-loading serving artifacts.
+
+Writes a UBJSON copy of the booster next to ``--out`` and the flat NumPy arrays
+used by ``INFERENCE_ENGINE=native``, which the backend memory-maps at startup.
+Each artifact gets a ``.source-sha256`` stamp of the JSON model it came from::
+
+    python compile_model.py --model ../ml-service/gig_bnpl_xgb_model.json --out model/compiled
+"""
+
+import argparse
+import shutil
+from pathlib import Path
+
+import numpy as np
+import xgboost as xgb
+
+from calibration import CALIBRATION_FILE_NAME
+from drift import DRIFT_REFERENCE_FILE_NAME
+from main import DEFAULT_JSON_MODEL_NAME, DEFAULT_UBJ_MODEL_NAME, PROJECT_ROOT
+from model_registry import file_digest, source_stamp_path
+from tree_engine import CompiledTreeEnsemble
+
+PARITY_ROWS = 4096
+PARITY_TOLERANCE = 1e-6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--model",
+        type=Path,
+        default=PROJECT_ROOT.parent / "ml-service" / DEFAULT_JSON_MODEL_NAME,
+    )
+    parser.add_argument("--out", type=Path, default=PROJECT_ROOT / "model" / "compiled")
+    args = parser.parse_args()
+
+    booster = xgb.Booster()
+    booster.load_model(str(args.model))
+    ubj_path = args.out.parent / DEFAULT_UBJ_MODEL_NAME
+    ubj_path.parent.mkdir(parents=True, exist_ok=True)
+    booster.save_model(str(ubj_path))
+
+    ensemble = CompiledTreeEnsemble.from_booster(booster)
+    ensemble.save(args.out)
+    # The calibration table applies to the booster margin and the drift
+    # reference to its inputs and scores, so both travel with it.
+    for file_name in (CALIBRATION_FILE_NAME, DRIFT_REFERENCE_FILE_NAME):
+        artifact_path = args.model.parent / file_name
+        if artifact_path.exists() and artifact_path.resolve() != (
+            ubj_path.parent / file_name
+        ).resolve():
+            shutil.copyfile(artifact_path, ubj_path.parent / file_name)
+
+    # Check the saved artifact, not the in-memory copy, against xgboost.
+    loaded = CompiledTreeEnsemble.load(args.out)
+    rows = np.random.default_rng(0).normal(size=(PARITY_ROWS, booster.num_features()))
+    rows = rows.astype(np.float32) * 10.0
+    expected = booster.predict(xgb.DMatrix(rows, feature_names=booster.feature_names))
+    max_error = float(np.max(np.abs(loaded.predict(rows) - expected)))
+
+    if max_error > PARITY_TOLERANCE:
+        print(f"parity over {PARITY_ROWS} rows: max |diff| = {max_error:.3e}")
+        return 1
+    # The backend only uses these artifacts in place of a JSON model they were built from.
+    digest = file_digest(args.model)
+    for artifact_path in (ubj_path, args.out):
+        source_stamp_path(artifact_path).write_text(digest + "\n", encoding="utf-8")
+
+    print(f"wrote {ubj_path} and {args.out}")
+    print(f"{ensemble.num_trees} trees, depth {ensemble.max_depth}")
+    print(f"parity over {PARITY_ROWS} rows: max |diff| = {max_error:.3e}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -24,7 +24,18 @@ class Settings(BaseSettings):
     
     # Timeouts
     ML_REQUEST_TIMEOUT: int = 30  # seconds
-    
+
+    # Pooled ML service client (models/ml_connector.py)
+    ML_MAX_CONNECTIONS: int = 100
+    ML_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    ML_HTTP2: bool = False  # needs the h2 package: pip install "httpx[http2]"
+    ML_MAX_RETRIES: int = 2
+    ML_RETRY_BACKOFF_MS: float = 50  # doubles per retry, with full jitter
+    ML_RETRY_BACKOFF_MAX_MS: float = 1000
+    ML_BREAKER_FAILURES: int = 5  # consecutive failures that open the breaker
+    ML_BREAKER_RESET_SECONDS: float = 30
+    ML_HEDGE_AFTER_MS: float = 0  # send a second copy after this long; 0 = off
+
     class Config:
         env_file = ".env"
 
@@ -1,10 +1,56 @@
+import base64
+import json
 import math
+import random
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
 
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import Date, and_, case, delete, func, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Query, Session
 
-from models import Transaction
+from fairness import income_group_expression
+from middleware.validators import classify_income_group
+from models import BuyerExposure, DecisionCounter, DecisionRollup, FairnessRollup, Transaction
 from schemas import PredictRequest
+from timeseries import GRANULARITIES, RollupRetention, as_utc, bucket_floor
+
+DECISION_COUNTER_SLOTS = 8
+BUYER_EXPOSURE_PERIOD_DAYS = 30
+LOW_RISK_UPPER = 0.33
+HIGH_RISK_LOWER = 0.66
+# Postgres batches at least this large go through COPY instead of a multi-row INSERT.
+COPY_MIN_ROWS = 10
+COPY_COLUMNS = [column.name for column in Transaction.__table__.columns if column.name != "id"]
+SQLITE_BUCKET_FORMATS = {
+    "minute": "%Y-%m-%d %H:%M:00",
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+}
+
+
+def transaction_values(
+    payload: PredictRequest,
+    risk_probability: float,
+    decision: str,
+    model_version: str | None = None,
+) -> dict:
+    return {
+        "avg_monthly_inflow": payload.avg_monthly_inflow,
+        "inflow_volatility": payload.inflow_volatility,
+        "avg_monthly_outflow": payload.avg_monthly_outflow,
+        "min_balance_30d": payload.min_balance_30d,
+        "neg_balance_days_30d": payload.neg_balance_days_30d,
+        "purchase_to_inflow_ratio": payload.purchase_to_inflow_ratio,
+        "total_burden_ratio": payload.total_burden_ratio,
+        "buffer_ratio": payload.buffer_ratio,
+        "stress_index": payload.stress_index,
+        "risk_probability": risk_probability,
+        "decision": decision,
+        "model_version": model_version,
+        "buyer_id": payload.buyer_id,
+    }
 
 
 def create_transaction(
@@ -12,28 +58,647 @@ def create_transaction(
     payload: PredictRequest,
     risk_probability: float,
     decision: str,
+    model_version: str | None = None,
 ) -> Transaction:
-    transaction = Transaction(
-        avg_monthly_inflow=payload.avg_monthly_inflow,
-        inflow_volatility=payload.inflow_volatility,
-        avg_monthly_outflow=payload.avg_monthly_outflow,
-        min_balance_30d=payload.min_balance_30d,
-        neg_balance_days_30d=payload.neg_balance_days_30d,
-        purchase_to_inflow_ratio=payload.purchase_to_inflow_ratio,
-        total_burden_ratio=payload.total_burden_ratio,
-        buffer_ratio=payload.buffer_ratio,
-        stress_index=payload.stress_index,
-        risk_probability=risk_probability,
-        decision=decision,
-    )
+    values = transaction_values(payload, risk_probability, decision, model_version)
+    transaction = Transaction(**values)
     db.add(transaction)
+    _increment_decision_counters(db, [(risk_probability, decision)])
+    _increment_fairness_rollups(db, [values])
+    _increment_decision_rollups(db, [values])
+    _update_buyer_exposures(db, [values])
     db.commit()
     db.refresh(transaction)
     return transaction
 
 
-def get_stats(db: Session) -> dict:
-    total_predictions = db.query(func.count(Transaction.id)).scalar() or 0
+def create_transactions(db: Session, rows: list[dict]) -> int:
+    if not rows:
+        return 0
+    # One timestamp for the batch, shared by the row and every aggregate it feeds.
+    now = datetime.now(timezone.utc)
+    rows = [row if row.get("created_at") else {**row, "created_at": now} for row in rows]
+    if len(rows) >= COPY_MIN_ROWS and db.get_bind().dialect.name == "postgresql":
+        copy_transactions(db.connection(), rows)
+    else:
+        db.execute(insert(Transaction), rows)
+    _increment_decision_counters(db, [(row["risk_probability"], row["decision"]) for row in rows])
+    _increment_fairness_rollups(db, rows)
+    _increment_decision_rollups(db, rows)
+    _update_buyer_exposures(db, rows)
+    db.commit()
+    return len(rows)
+
+
+def copy_transactions(connection: Connection, rows: list[dict]) -> None:
+    """Stream rows into ``transactions`` with Postgres ``COPY``, in the caller's transaction."""
+    columns = ", ".join(COPY_COLUMNS)
+    with connection.connection.driver_connection.cursor() as cursor:
+        with cursor.copy(f"COPY transactions ({columns}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row([row.get(name) for name in COPY_COLUMNS])
+
+
+def _risk_band(risk_probability: float) -> str:
+    if risk_probability < LOW_RISK_UPPER:
+        return "low_risk"
+    if risk_probability < HIGH_RISK_LOWER:
+        return "medium_risk"
+    return "high_risk"
+
+
+def _increment_decision_counters(db: Session, decisions: list[tuple[float, str]]) -> None:
+    # Spread writers over several counter rows so concurrent commits rarely share a row lock.
+    deltas = {"total": 0, "approvals": 0, "low_risk": 0, "medium_risk": 0, "high_risk": 0}
+    for risk_probability, decision in decisions:
+        deltas["total"] += 1
+        deltas["approvals"] += decision == "Approve"
+        deltas[_risk_band(risk_probability)] += 1
+
+    db.execute(
+        update(DecisionCounter)
+        .where(DecisionCounter.slot == random.randrange(DECISION_COUNTER_SLOTS))
+        .values(
+            {
+                getattr(DecisionCounter, name): getattr(DecisionCounter, name) + delta
+                for name, delta in deltas.items()
+                if delta
+            }
+        )
+    )
+
+
+def _dialect_insert(db: Session):
+    return postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+
+def _insert_missing(db: Session, model: Any, rows: list[dict]) -> None:
+    """Insert ``rows``, skipping any whose primary key another worker already wrote."""
+    if not rows:
+        return
+    primary_key = [column.name for column in model.__table__.primary_key]
+    statement = _dialect_insert(db)(model).on_conflict_do_nothing(index_elements=primary_key)
+    db.execute(statement, rows)
+
+
+def _utc_day(moment: datetime) -> date:
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.date()
+
+
+def _increment_fairness_rollups(db: Session, rows: list[dict]) -> None:
+    today = datetime.now(timezone.utc).date()
+    deltas: dict[tuple[date, str], dict] = {}
+    for row in rows:
+        day = _utc_day(row["created_at"]) if row.get("created_at") else today
+        group = classify_income_group(row["avg_monthly_inflow"])
+        delta = deltas.setdefault((day, group), {"decisions": 0, "approvals": 0, "risk_sum": 0.0})
+        delta["decisions"] += 1
+        delta["approvals"] += row["decision"] == "Approve"
+        delta["risk_sum"] += row["risk_probability"]
+
+    statement = _dialect_insert(db)(FairnessRollup)
+    incoming = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[FairnessRollup.day, FairnessRollup.income_group, FairnessRollup.slot],
+        set_={
+            "decisions": FairnessRollup.decisions + incoming.decisions,
+            "approvals": FairnessRollup.approvals + incoming.approvals,
+            "risk_sum": FairnessRollup.risk_sum + incoming.risk_sum,
+        },
+    )
+    # Same slot spreading as the decision counters, one slot per batch.
+    slot = random.randrange(DECISION_COUNTER_SLOTS)
+    db.execute(
+        statement,
+        [
+            {"day": day, "income_group": group, "slot": slot, **delta}
+            for (day, group), delta in sorted(deltas.items())
+        ],
+    )
+
+
+def _add_rollup_delta(
+    deltas: dict[datetime, dict],
+    bucket_start: datetime,
+    decisions: int,
+    approvals: int,
+    risk_sum: float,
+) -> None:
+    delta = deltas.setdefault(bucket_start, {"decisions": 0, "approvals": 0, "risk_sum": 0.0})
+    delta["decisions"] += decisions
+    delta["approvals"] += approvals
+    delta["risk_sum"] += risk_sum
+
+
+def _upsert_decision_rollups(
+    db: Session, granularity: str, deltas: dict[datetime, dict], slot: int
+) -> None:
+    statement = _dialect_insert(db)(DecisionRollup)
+    incoming = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[
+            DecisionRollup.granularity,
+            DecisionRollup.bucket_start,
+            DecisionRollup.slot,
+        ],
+        set_={
+            "decisions": DecisionRollup.decisions + incoming.decisions,
+            "approvals": DecisionRollup.approvals + incoming.approvals,
+            "risk_sum": DecisionRollup.risk_sum + incoming.risk_sum,
+        },
+    )
+    db.execute(
+        statement,
+        [
+            {"granularity": granularity, "bucket_start": bucket_start, "slot": slot, **delta}
+            for bucket_start, delta in sorted(deltas.items())
+        ],
+    )
+
+
+def _increment_decision_rollups(db: Session, rows: list[dict]) -> None:
+    # Only minute buckets are written here; compaction builds the hour and day buckets.
+    now = datetime.now(timezone.utc)
+    deltas: dict[datetime, dict] = {}
+    for row in rows:
+        _add_rollup_delta(
+            deltas,
+            bucket_floor(row.get("created_at") or now, "minute"),
+            1,
+            row["decision"] == "Approve",
+            row["risk_probability"],
+        )
+    _upsert_decision_rollups(db, "minute", deltas, random.randrange(DECISION_COUNTER_SLOTS))
+
+
+def _update_buyer_exposures(db: Session, rows: list[dict]) -> None:
+    # One upsert row per buyer in the batch; rows arrive oldest first.
+    now = datetime.now(timezone.utc)
+    batches: dict[str, dict] = {}
+    for row in rows:
+        buyer_id = row.get("buyer_id")
+        if buyer_id is None:
+            continue
+        approved = row["decision"] == "Approve"
+        decided_at = row.get("created_at") or now
+        batch = batches.setdefault(
+            buyer_id,
+            {
+                "buyer_id": buyer_id,
+                "decisions": 0,
+                "approvals": 0,
+                "approved_purchase_ratio": 0.0,
+                "recent_approvals": 0,
+                "recent_period_start": None,
+            },
+        )
+        batch["decisions"] += 1
+        batch["approvals"] += approved
+        batch["recent_approvals"] += approved
+        if approved:
+            batch["approved_purchase_ratio"] += row["purchase_to_inflow_ratio"]
+            batch["recent_period_start"] = batch["recent_period_start"] or decided_at
+        batch["last_decision"] = row["decision"]
+        batch["last_risk_probability"] = row["risk_probability"]
+        batch["last_decision_at"] = decided_at
+    if not batches:
+        return
+
+    statement = _dialect_insert(db)(BuyerExposure)
+    incoming = statement.excluded
+    period_open = BuyerExposure.recent_period_start > now - timedelta(
+        days=BUYER_EXPOSURE_PERIOD_DAYS
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[BuyerExposure.buyer_id],
+        set_={
+            "decisions": BuyerExposure.decisions + incoming.decisions,
+            "approvals": BuyerExposure.approvals + incoming.approvals,
+            "approved_purchase_ratio": (
+                BuyerExposure.approved_purchase_ratio + incoming.approved_purchase_ratio
+            ),
+            "recent_approvals": case(
+                (incoming.recent_approvals == 0, BuyerExposure.recent_approvals),
+                (period_open, BuyerExposure.recent_approvals + incoming.recent_approvals),
+                else_=incoming.recent_approvals,
+            ),
+            "recent_period_start": case(
+                (incoming.recent_approvals == 0, BuyerExposure.recent_period_start),
+                (period_open, BuyerExposure.recent_period_start),
+                else_=incoming.recent_period_start,
+            ),
+            "last_decision": incoming.last_decision,
+            "last_risk_probability": incoming.last_risk_probability,
+            "last_decision_at": incoming.last_decision_at,
+        },
+    )
+    # Sorted keys give concurrent batches the same row lock order.
+    db.execute(statement, [batches[buyer_id] for buyer_id in sorted(batches)])
+
+
+def _counts_from_row(row) -> dict:
+    names = ("total", "approvals", "low_risk", "medium_risk", "high_risk")
+    return {name: int(value or 0) for name, value in zip(names, row)}
+
+
+def count_decisions_from_transactions(
+    db: Session | Connection,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> dict:
+    """Counter totals recounted from ``transactions``, optionally within ``[start, end)``."""
+    statement = (
+        select(
+            func.count(Transaction.id),
+            func.sum(case((Transaction.decision == "Approve", 1), else_=0)),
+            func.sum(case((Transaction.risk_probability < LOW_RISK_UPPER, 1), else_=0)),
+            func.sum(
+                case(
+                    (
+                        (Transaction.risk_probability >= LOW_RISK_UPPER)
+                        & (Transaction.risk_probability < HIGH_RISK_LOWER),
+                        1,
+                    ),
+                    else_=0,
+                )
+            ),
+            func.sum(case((Transaction.risk_probability >= HIGH_RISK_LOWER, 1), else_=0)),
+        )
+    )
+    if start is not None:
+        statement = statement.where(Transaction.created_at >= start)
+    if end is not None:
+        statement = statement.where(Transaction.created_at < end)
+    return _counts_from_row(db.execute(statement).one())
+
+
+def subtract_decision_counts(db: Session | Connection, counts: dict) -> None:
+    """Take rows that left ``transactions`` (an archived month) out of the counters."""
+    if not counts["total"]:
+        return
+    db.execute(
+        update(DecisionCounter)
+        .where(DecisionCounter.slot == 0)
+        .values(
+            {
+                getattr(DecisionCounter, name): getattr(DecisionCounter, name) - delta
+                for name, delta in counts.items()
+                if delta
+            }
+        )
+    )
+
+
+def ensure_decision_counters(db: Session, rebuild: bool = False) -> None:
+    # Every worker runs this at startup. The seed rows are inserted with ON CONFLICT
+    # DO NOTHING, so workers that race to seed an empty table cannot fail on the slot
+    # key, and only the first recount lands in slot 0.
+    if rebuild:
+        db.query(DecisionCounter).delete()
+    zeros = {"total": 0, "approvals": 0, "low_risk": 0, "medium_risk": 0, "high_risk": 0}
+    seed_rows = [{"slot": slot, **zeros} for slot in range(DECISION_COUNTER_SLOTS)]
+    if db.scalar(select(DecisionCounter.slot).limit(1)) is None:
+        seed_rows[0].update(count_decisions_from_transactions(db))
+    db.execute(
+        _dialect_insert(db)(DecisionCounter)
+        .values(seed_rows)
+        .on_conflict_do_nothing(index_elements=[DecisionCounter.slot])
+    )
+    db.commit()
+
+
+def _utc_day_expression(db: Session, column: Any) -> Any:
+    if db.get_bind().dialect.name == "postgresql":
+        column = func.timezone("UTC", column)
+    return func.date(column, type_=Date)
+
+
+def rebuild_fairness_rollups(db: Session) -> int:
+    day = _utc_day_expression(db, Transaction.created_at).label("day")
+    group = income_group_expression(Transaction.avg_monthly_inflow).label("income_group")
+    rows = db.execute(
+        select(
+            day,
+            group,
+            func.count(Transaction.id),
+            func.sum(case((Transaction.decision == "Approve", 1), else_=0)),
+            func.sum(Transaction.risk_probability),
+        ).group_by(day, group)
+    ).all()
+
+    db.query(FairnessRollup).delete()
+    _insert_missing(
+        db,
+        FairnessRollup,
+        [
+            {
+                "day": row_day,
+                "income_group": row_group,
+                "slot": 0,
+                "decisions": int(decisions),
+                "approvals": int(approvals or 0),
+                "risk_sum": float(risk_sum or 0.0),
+            }
+            for row_day, row_group, decisions, approvals, risk_sum in rows
+        ],
+    )
+    db.commit()
+    return len(rows)
+
+
+def ensure_fairness_rollups(db: Session, rebuild: bool = False) -> None:
+    # Workers racing to seed an empty table each recount; only the first insert lands.
+    if rebuild or db.scalar(select(FairnessRollup.day).limit(1)) is None:
+        rebuild_fairness_rollups(db)
+
+
+def get_income_group_totals(db: Session, start: date) -> dict[str, dict]:
+    rows = db.execute(
+        select(
+            FairnessRollup.income_group,
+            func.sum(FairnessRollup.decisions),
+            func.sum(FairnessRollup.approvals),
+            func.sum(FairnessRollup.risk_sum),
+        )
+        .where(FairnessRollup.day >= start)
+        .group_by(FairnessRollup.income_group)
+    ).all()
+    return {
+        group: {
+            "decisions": int(decisions),
+            "approvals": int(approvals),
+            "risk_sum": float(risk_sum),
+            "decision_mix": {"Approve": int(approvals), "Decline": int(decisions - approvals)},
+        }
+        for group, decisions, approvals, risk_sum in rows
+    }
+
+
+def compact_decision_rollups(
+    db: Session,
+    retention: RollupRetention,
+    now: datetime | None = None,
+) -> dict[str, int]:
+    """Fold expired minute and hour buckets into the next granularity and drop old days.
+
+    Expired buckets are deleted with RETURNING and their totals added to the
+    coarser bucket in the same transaction. A concurrent pass in another
+    worker blocks on the deleted rows and then finds nothing to move, so
+    nothing is counted twice. Returns the number of buckets removed per
+    granularity.
+    """
+    cutoffs = retention.cutoffs(now or datetime.now(timezone.utc))
+    removed = {}
+    for granularity, coarser in (("minute", "hour"), ("hour", "day")):
+        expired = db.execute(
+            delete(DecisionRollup)
+            .where(
+                DecisionRollup.granularity == granularity,
+                DecisionRollup.bucket_start < cutoffs[granularity],
+            )
+            .returning(
+                DecisionRollup.bucket_start,
+                DecisionRollup.decisions,
+                DecisionRollup.approvals,
+                DecisionRollup.risk_sum,
+            )
+            .execution_options(synchronize_session=False)
+        ).all()
+        deltas: dict[datetime, dict] = {}
+        for bucket_start, decisions, approvals, risk_sum in expired:
+            _add_rollup_delta(
+                deltas, bucket_floor(bucket_start, coarser), decisions, approvals, risk_sum
+            )
+        if deltas:
+            _upsert_decision_rollups(db, coarser, deltas, slot=0)
+        removed[granularity] = len(expired)
+
+    removed["day"] = 0
+    if cutoffs["day"] is not None:
+        removed["day"] = db.execute(
+            delete(DecisionRollup)
+            .where(
+                DecisionRollup.granularity == "day",
+                DecisionRollup.bucket_start < cutoffs["day"],
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    db.commit()
+    return removed
+
+
+def _bucket_expression(db: Session, column: Any, granularity: str) -> Any:
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date_trunc(granularity, func.timezone("UTC", column))
+    return func.strftime(SQLITE_BUCKET_FORMATS[granularity], column)
+
+
+def _bucket_start(value: Any) -> datetime:
+    # SQLite's strftime returns text; Postgres returns a naive UTC timestamp.
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return as_utc(value)
+
+
+def rebuild_decision_rollups(
+    db: Session,
+    retention: RollupRetention,
+    now: datetime | None = None,
+) -> int:
+    """Recount every bucket from transactions, each at the granularity retention keeps it."""
+    cutoffs = retention.cutoffs(now or datetime.now(timezone.utc))
+    ranges = {
+        "minute": (cutoffs["minute"], None),
+        "hour": (cutoffs["hour"], cutoffs["minute"]),
+        "day": (cutoffs["day"], cutoffs["hour"]),
+    }
+    buckets = []
+    for granularity, (start, end) in ranges.items():
+        bucket = _bucket_expression(db, Transaction.created_at, granularity).label("bucket")
+        query = select(
+            bucket,
+            func.count(Transaction.id),
+            func.sum(case((Transaction.decision == "Approve", 1), else_=0)),
+            func.sum(Transaction.risk_probability),
+        ).group_by(bucket)
+        if start is not None:
+            query = query.where(Transaction.created_at >= start)
+        if end is not None:
+            query = query.where(Transaction.created_at < end)
+        for bucket_start, decisions, approvals, risk_sum in db.execute(query):
+            buckets.append(
+                {
+                    "granularity": granularity,
+                    "bucket_start": _bucket_start(bucket_start),
+                    "slot": 0,
+                    "decisions": int(decisions),
+                    "approvals": int(approvals or 0),
+                    "risk_sum": float(risk_sum or 0.0),
+                }
+            )
+
+    db.query(DecisionRollup).delete()
+    _insert_missing(db, DecisionRollup, buckets)
+    db.commit()
+    return len(buckets)
+
+
+def ensure_decision_rollups(
+    db: Session,
+    rebuild: bool = False,
+    retention: RollupRetention = RollupRetention(),
+) -> None:
+    # Workers racing to seed an empty table each recount; only the first insert lands.
+    if rebuild or db.scalar(select(DecisionRollup.slot).limit(1)) is None:
+        rebuild_decision_rollups(db, retention)
+
+
+def get_rollup_totals(
+    db: Session, granularity: str, start: datetime, end: datetime
+) -> dict[datetime, dict]:
+    """Decision totals per ``granularity`` bucket in ``[start, end)``.
+
+    Recent data may not have been compacted yet, so finer buckets in the
+    range are read too and truncated into the bucket that contains them.
+    """
+    finer = list(GRANULARITIES)[: list(GRANULARITIES).index(granularity) + 1]
+    bucket = DecisionRollup.bucket_start
+    if len(finer) > 1:
+        bucket = _bucket_expression(db, bucket, granularity)
+    bucket = bucket.label("bucket")
+    rows = db.execute(
+        select(
+            bucket,
+            func.sum(DecisionRollup.decisions),
+            func.sum(DecisionRollup.approvals),
+            func.sum(DecisionRollup.risk_sum),
+        )
+        .where(
+            DecisionRollup.granularity.in_(finer),
+            DecisionRollup.bucket_start >= bucket_floor(start, granularity),
+            DecisionRollup.bucket_start < end,
+        )
+        .group_by(bucket)
+    ).all()
+    return {
+        _bucket_start(bucket_start): {
+            "decisions": int(decisions),
+            "approvals": int(approvals),
+            "risk_sum": float(risk_sum),
+        }
+        for bucket_start, decisions, approvals, risk_sum in rows
+    }
+
+
+def rebuild_buyer_exposures(db: Session) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=BUYER_EXPOSURE_PERIOD_DAYS)
+    approved = Transaction.decision == "Approve"
+    recent = approved & (Transaction.created_at > cutoff)
+    totals = (
+        select(
+            Transaction.buyer_id,
+            func.count(Transaction.id).label("decisions"),
+            func.sum(case((approved, 1), else_=0)).label("approvals"),
+            func.sum(
+                case((approved, Transaction.purchase_to_inflow_ratio), else_=0.0)
+            ).label("approved_purchase_ratio"),
+            func.sum(case((recent, 1), else_=0)).label("recent_approvals"),
+            func.min(case((recent, Transaction.created_at))).label("recent_period_start"),
+        )
+        .where(Transaction.buyer_id.is_not(None))
+        .group_by(Transaction.buyer_id)
+        .subquery()
+    )
+    ranked = (
+        select(
+            Transaction.buyer_id,
+            Transaction.decision,
+            Transaction.risk_probability,
+            Transaction.created_at,
+            func.row_number()
+            .over(
+                partition_by=Transaction.buyer_id,
+                order_by=(Transaction.created_at.desc(), Transaction.id.desc()),
+            )
+            .label("position"),
+        )
+        .where(Transaction.buyer_id.is_not(None))
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            totals,
+            ranked.c.decision,
+            ranked.c.risk_probability,
+            ranked.c.created_at,
+        ).join(
+            ranked, and_(ranked.c.buyer_id == totals.c.buyer_id, ranked.c.position == 1)
+        )
+    ).all()
+
+    db.query(BuyerExposure).delete()
+    _insert_missing(
+        db,
+        BuyerExposure,
+        [
+            {
+                "buyer_id": row.buyer_id,
+                "decisions": int(row.decisions),
+                "approvals": int(row.approvals or 0),
+                "approved_purchase_ratio": float(row.approved_purchase_ratio or 0.0),
+                "recent_approvals": int(row.recent_approvals or 0),
+                "recent_period_start": row.recent_period_start,
+                "last_decision": row.decision,
+                "last_risk_probability": row.risk_probability,
+                "last_decision_at": row.created_at,
+            }
+            for row in rows
+        ],
+    )
+    db.commit()
+    return len(rows)
+
+
+def ensure_buyer_exposures(db: Session, rebuild: bool = False) -> None:
+    # Workers racing to seed an empty table each recount; only the first insert lands.
+    if rebuild or db.scalar(select(BuyerExposure.buyer_id).limit(1)) is None:
+        rebuild_buyer_exposures(db)
+
+
+def get_buyer_exposure(db: Session, buyer_id: str) -> BuyerExposure | None:
+    return db.get(BuyerExposure, buyer_id)
+
+
+def current_recent_approvals(exposure: BuyerExposure, now: datetime | None = None) -> int:
+    """Approvals in the buyer's open exposure period, or 0 once it has lapsed."""
+    start = exposure.recent_period_start
+    if start is None:
+        return 0
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    if now - start >= timedelta(days=BUYER_EXPOSURE_PERIOD_DAYS):
+        return 0
+    return exposure.recent_approvals
+
+
+def get_decision_counts(db: Session) -> dict:
+    row = db.execute(
+        select(
+            func.sum(DecisionCounter.total),
+            func.sum(DecisionCounter.approvals),
+            func.sum(DecisionCounter.low_risk),
+            func.sum(DecisionCounter.medium_risk),
+            func.sum(DecisionCounter.high_risk),
+        )
+    ).one()
+    return _counts_from_row(row)
+
+
+def stats_from_counts(counts: dict) -> dict:
+    total_predictions = counts["total"]
     if total_predictions == 0:
         return {
             "total_predictions": 0,
@@ -42,48 +707,56 @@ def get_stats(db: Session) -> dict:
             "risk_score_distribution": {"low": 0, "medium": 0, "high": 0},
         }
 
-    approval_count = (
-        db.query(func.count(Transaction.id))
-        .filter(Transaction.decision == "Approve")
-        .scalar()
-        or 0
-    )
+    approval_count = counts["approvals"]
     decline_count = total_predictions - approval_count
-
-    low_count = (
-        db.query(func.count(Transaction.id))
-        .filter(Transaction.risk_probability < 0.33)
-        .scalar()
-        or 0
-    )
-    medium_count = (
-        db.query(func.count(Transaction.id))
-        .filter(Transaction.risk_probability >= 0.33, Transaction.risk_probability < 0.66)
-        .scalar()
-        or 0
-    )
-    high_count = (
-        db.query(func.count(Transaction.id))
-        .filter(Transaction.risk_probability >= 0.66)
-        .scalar()
-        or 0
-    )
-
     return {
         "total_predictions": int(total_predictions),
         "approval_rate": round(approval_count / total_predictions, 4),
         "decline_rate": round(decline_count / total_predictions, 4),
         "risk_score_distribution": {
-            "low": int(low_count),
-            "medium": int(medium_count),
-            "high": int(high_count),
+            "low": int(counts["low_risk"]),
+            "medium": int(counts["medium_risk"]),
+            "high": int(counts["high_risk"]),
         },
     }
 
 
-def get_logs(db: Session, page: int, limit: int) -> tuple[list[Transaction], int, int]:
-    total = db.query(func.count(Transaction.id)).scalar() or 0
-    total_pages = max(1, math.ceil(total / limit)) if total else 1
+def get_stats(db: Session) -> dict:
+    return stats_from_counts(get_decision_counts(db))
+
+
+def count_transactions(db: Session, exact: bool = False) -> int:
+    if exact:
+        return int(db.query(func.count(Transaction.id)).scalar() or 0)
+    return get_decision_counts(db)["total"]
+
+
+def page_count(total: int, limit: int) -> int:
+    return max(1, math.ceil(total / limit)) if total else 1
+
+
+def encode_log_cursor(transaction: Transaction) -> str:
+    raw = json.dumps([transaction.created_at.isoformat(), transaction.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_log_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, transaction_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(transaction_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def get_logs(
+    db: Session,
+    page: int,
+    limit: int,
+    exact_total: bool = False,
+) -> tuple[list[Transaction], int, int]:
+    total = count_transactions(db, exact=exact_total)
+    total_pages = page_count(total, limit)
     offset = (page - 1) * limit
 
     items = (
@@ -94,3 +767,42 @@ def get_logs(db: Session, page: int, limit: int) -> tuple[list[Transaction], int
         .all()
     )
     return items, int(total), total_pages
+
+
+def _keyset_page(
+    query: Query,
+    limit: int,
+    after: tuple[datetime, int] | None,
+) -> tuple[list[Transaction], str | None]:
+    if after is not None:
+        # A row-value comparison lets SQLite seek the index instead of scanning an OR.
+        query = query.filter(tuple_(Transaction.created_at, Transaction.id) < tuple_(*after))
+
+    items = (
+        query.order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_log_cursor(items[-1])
+
+
+def get_logs_after(
+    db: Session,
+    limit: int,
+    after: tuple[datetime, int] | None = None,
+) -> tuple[list[Transaction], str | None]:
+    return _keyset_page(db.query(Transaction), limit, after)
+
+
+def get_buyer_history(
+    db: Session,
+    buyer_id: str,
+    limit: int,
+    after: tuple[datetime, int] | None = None,
+) -> tuple[list[Transaction], str | None]:
+    # Served by ix_transactions_buyer_created_at_id: one range scan per page.
+    query = db.query(Transaction).filter(Transaction.buyer_id == buyer_id)
+    return _keyset_page(query, limit, after)
@@ -1,10 +1,17 @@
 import os
-from typing import Generator
+from typing import Any, AsyncGenerator, Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 
+def _async_database_url(url: str) -> str:
+    # psycopg 3 serves both engines; SQLite needs the aiosqlite driver.
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
 def _normalize_database_url(raw_url: str) -> str:
     if raw_url.startswith("postgres://"):
         return raw_url.replace("postgres://", "postgresql+psycopg://", 1)
@@ -17,12 +24,27 @@ DATABASE_URL = _normalize_database_url(
     os.getenv("DATABASE_URL", "sqlite:///./fairlens.db")
 )
 
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "wal").strip().lower()
+
+
+def _configure_sqlite(dbapi_connection: Any, _: Any) -> None:
+    # In WAL mode readers never block the writer, and NORMAL syncs at checkpoints
+    # rather than on every commit without risking corruption.
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    if SQLITE_JOURNAL_MODE == "wal":
+        cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
     connect_args=connect_args,
 )
+if DATABASE_URL.startswith("sqlite"):
+    event.listen(engine, "connect", _configure_sqlite)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -34,3 +56,40 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+_async_engine: Any = None
+_async_session_factory: Any = None
+
+
+def get_async_engine() -> Any:
+    """Create the async engine on first use so sync deployments never import its driver."""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        _async_engine = create_async_engine(
+            _async_database_url(DATABASE_URL),
+            pool_pre_ping=True,
+            connect_args=connect_args,
+        )
+        if DATABASE_URL.startswith("sqlite"):
+            event.listen(_async_engine.sync_engine, "connect", _configure_sqlite)
+        _async_session_factory = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
+
+async def get_async_db() -> AsyncGenerator[Any, None]:
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
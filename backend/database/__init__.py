@@ -14,3 +14,6 @@ Base = _MODULE.Base
 SessionLocal = _MODULE.SessionLocal
 engine = _MODULE.engine
 get_db = _MODULE.get_db
+get_async_engine = _MODULE.get_async_engine
+dispose_async_engine = _MODULE.dispose_async_engine
+get_async_db = _MODULE.get_async_db
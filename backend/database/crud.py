@@ -1,7 +1,9 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from database.db import PredictionLog as PredictionLogDB
+from fairness import fairness_metrics
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import List, Optional
 import uuid
 
 def create_prediction_log(db: Session, log_data: dict) -> PredictionLogDB:
@@ -18,20 +20,45 @@ def get_recent_logs(db: Session, limit: int = 50) -> List[PredictionLogDB]:
         PredictionLogDB.timestamp.desc()
     ).limit(limit).all()
 
-def get_logs_by_buyer(db: Session, buyer_id: str) -> List[PredictionLogDB]:
-    """Get all predictions for a buyer"""
-    return db.query(PredictionLogDB).filter(
-        PredictionLogDB.buyer_id == buyer_id
-    ).all()
+def get_logs_by_buyer(
+    db: Session, buyer_id: str, limit: int = 50, before: Optional[datetime] = None
+) -> List[PredictionLogDB]:
+    """Get a buyer's predictions, newest first, older than `before` when given"""
+    query = db.query(PredictionLogDB).filter(PredictionLogDB.buyer_id == buyer_id)
+    if before is not None:
+        query = query.filter(PredictionLogDB.timestamp < before)
+    return query.order_by(PredictionLogDB.timestamp.desc()).limit(limit).all()
+
+def _group_totals(db: Session, cutoff: datetime) -> dict:
+    """Per income group and decision counts and risk sums, aggregated in the database"""
+    rows = db.query(
+        PredictionLogDB.income_group,
+        PredictionLogDB.decision,
+        func.count(PredictionLogDB.id),
+        func.sum(PredictionLogDB.risk_score),
+    ).filter(
+        PredictionLogDB.timestamp >= cutoff
+    ).group_by(PredictionLogDB.income_group, PredictionLogDB.decision).all()
+
+    groups = {}
+    for income_group, decision, count, risk_sum in rows:
+        group = groups.setdefault(
+            income_group or "Unknown",
+            {"decisions": 0, "approvals": 0, "risk_sum": 0.0, "decision_mix": {}},
+        )
+        group["decisions"] += count
+        group["approvals"] += count if decision and "Approve" in decision else 0
+        group["risk_sum"] += risk_sum or 0.0
+        mix = group["decision_mix"]
+        mix[decision or "Unknown"] = mix.get(decision or "Unknown", 0) + count
+    return groups
 
 def get_statistics(db: Session, days: int = 7) -> dict:
     """Get aggregate statistics"""
     cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-    logs = db.query(PredictionLogDB).filter(
-        PredictionLogDB.timestamp >= cutoff
-    ).all()
+    groups = _group_totals(db, cutoff)
     
-    total = len(logs)
+    total = sum(group["decisions"] for group in groups.values())
     if total == 0:
         return {
             "total_predictions": 0,
@@ -40,9 +67,9 @@ def get_statistics(db: Session, days: int = 7) -> dict:
             "avg_risk_score": 0
         }
     
-    approved = len([l for l in logs if "Approve" in l.decision])
-    rejected = len([l for l in logs if l.decision == "Reject"])
-    avg_risk = sum(l.risk_score for l in logs) / total
+    approved = sum(group["approvals"] for group in groups.values())
+    rejected = sum(group["decision_mix"].get("Reject", 0) for group in groups.values())
+    avg_risk = sum(group["risk_sum"] for group in groups.values()) / total
     
     return {
         "total_predictions": total,
@@ -51,6 +78,11 @@ def get_statistics(db: Session, days: int = 7) -> dict:
         "avg_risk_score": avg_risk
     }
 
+def get_fairness_metrics(db: Session, days: int = 30) -> dict:
+    """Approval parity, average risk and decision mix per income group"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    return fairness_metrics(_group_totals(db, cutoff))
+
 def generate_prediction_id() -> str:
     """Generate unique prediction ID"""
     return f"PRED_{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:6].upper()}"
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime
+from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime, timezone
@@ -14,6 +14,7 @@ Base = declarative_base()
 
 class PredictionLog(Base):
     __tablename__ = "prediction_logs"
+    __table_args__ = (Index("ix_prediction_logs_buyer_timestamp", "buyer_id", "timestamp"),)
     
     id = Column(Integer, primary_key=True, index=True)
     prediction_id = Column(String, unique=True, index=True)
@@ -38,9 +39,17 @@ class PredictionLog(Base):
     income_group = Column(String, index=True)
     age = Column(Integer, nullable=True)
 
-Base.metadata.create_all(bind=engine)
+_tables_created = False
+
+def init_db():
+    """Create tables on first use instead of at import time"""
+    global _tables_created
+    if not _tables_created:
+        Base.metadata.create_all(bind=engine)
+        _tables_created = True
 
 def get_db():
+    init_db()
     db = SessionLocal()
     try:
         yield db
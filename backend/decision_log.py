@@ -0,0 +1,271 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+import crud
+
+logger = logging.getLogger(__name__)
+
+
+class DecisionLogFull(Exception):
+    pass
+
+
+class DecisionLogFailed(Exception):
+    pass
+
+
+class DecisionLogTimeout(Exception):
+    pass
+
+
+class _Commit:
+    """Completion of one waiting submission, set once all of its rows are flushed."""
+
+    __slots__ = ("remaining", "done", "error")
+
+    def __init__(self, rows: int) -> None:
+        self.remaining = rows
+        self.done = threading.Event()
+        self.error: str | None = None
+
+
+class DecisionLogWriter:
+    """Bounded write-behind buffer that bulk-inserts decisions from a background thread.
+
+    Producers block for up to ``enqueue_timeout`` seconds when the buffer is full
+    and then get ``DecisionLogFull``. The flusher writes whenever ``batch_size``
+    rows are pending or ``flush_interval`` seconds have passed, and ``stop``
+    drains everything still buffered before returning. Rows the flusher has not
+    picked up when ``stop`` times out are counted in ``undrained_rows``.
+    ``on_flush``, if given, is called with the duration in seconds of every
+    successful flush.
+
+    ``submit_many(rows, wait=True)`` is a group commit: the caller blocks until
+    its rows are committed, or gets ``DecisionLogFailed`` if they were dropped.
+    After ``commit_timeout`` seconds it gives up with ``DecisionLogTimeout``,
+    withdrawing any of its rows the flusher has not picked up yet. With
+    ``flush_interval=0`` the flusher commits whatever is pending as soon as it
+    is free, so rows arriving during one commit share the next one.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        capacity: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        enqueue_timeout: float = 0.1,
+        commit_timeout: float = 5.0,
+        retry_delay: float = 0.5,
+        on_flush: Callable[[float], None] | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.commit_timeout = commit_timeout
+        self.retry_delay = retry_delay
+        self.on_flush = on_flush
+
+        self._pending: deque[tuple[dict, _Commit | None]] = deque()
+        self._condition = threading.Condition()
+        self._closing = False
+        self._thread: threading.Thread | None = None
+
+        self.enqueued_rows = 0
+        self.rejected_rows = 0
+        self.timed_out_rows = 0
+        self.flushed_rows = 0
+        self.dropped_rows = 0
+        self.undrained_rows = 0
+        self.flush_count = 0
+        self.flush_errors = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="decision-log-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 30.0) -> None:
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        thread.join(timeout)
+        if thread.is_alive():
+            self._abandon_pending(timeout)
+
+    def _abandon_pending(self, timeout: float | None) -> None:
+        # The flusher is stuck, most likely in a commit; whatever it has not
+        # picked up yet will never be written.
+        with self._condition:
+            batch = list(self._pending)
+            self._pending.clear()
+            self.undrained_rows += len(batch)
+        logger.error(
+            "Decision log flusher did not finish within %g s; %d buffered rows not written",
+            timeout,
+            len(batch),
+        )
+        self._settle(batch, "Decision log shut down before these rows were written.")
+
+    def submit(self, row: dict) -> None:
+        self.submit_many([row])
+
+    def submit_many(self, rows: list[dict], wait: bool = False) -> None:
+        if not rows:
+            return
+        created_at = datetime.now(timezone.utc)
+        stamped = [{"created_at": created_at, **row} for row in rows]
+        commit = _Commit(len(stamped)) if wait else None
+        needed = min(len(stamped), self.capacity)
+        deadline = time.monotonic() + self.enqueue_timeout
+
+        with self._condition:
+            while not self._closing and len(self._pending) + needed > self.capacity:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.rejected_rows += len(stamped)
+                    raise DecisionLogFull(
+                        f"Decision log queue is full ({len(self._pending)}/{self.capacity} rows)."
+                    )
+                self._condition.wait(remaining)
+            if self._closing:
+                raise DecisionLogFull("Decision log is shutting down.")
+            self._pending.extend((row, commit) for row in stamped)
+            self.enqueued_rows += len(stamped)
+            if commit is not None or len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+
+        if commit is not None:
+            if not commit.done.wait(self.commit_timeout):
+                self._abandon(commit)
+            if commit.error is not None:
+                raise DecisionLogFailed(commit.error)
+
+    def _abandon(self, commit: _Commit) -> None:
+        with self._condition:
+            if commit.done.is_set():
+                return
+            kept = [(row, owner) for row, owner in self._pending if owner is not commit]
+            withdrawn = len(self._pending) - len(kept)
+            self._pending = deque(kept)
+            self.timed_out_rows += commit.remaining
+            in_flight = commit.remaining - withdrawn
+        logger.warning(
+            "Decision log commit timed out: %d rows withdrawn, %d still in flight",
+            withdrawn,
+            in_flight,
+        )
+        detail = "not written" if not in_flight else "not confirmed"
+        raise DecisionLogTimeout(
+            f"Decision log did not commit within {self.commit_timeout:g} s; rows {detail}."
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    def snapshot(self) -> dict:
+        avg_flush_ms = self.total_flush_ms / self.flush_count if self.flush_count else 0.0
+        return {
+            "enabled": True,
+            "queue_depth": self.queue_depth,
+            "capacity": self.capacity,
+            "enqueued_rows": self.enqueued_rows,
+            "rejected_rows": self.rejected_rows,
+            "timed_out_rows": self.timed_out_rows,
+            "flushed_rows": self.flushed_rows,
+            "dropped_rows": self.dropped_rows,
+            "undrained_rows": self.undrained_rows,
+            "flush_count": self.flush_count,
+            "flush_errors": self.flush_errors,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+            "avg_flush_ms": round(avg_flush_ms, 3),
+        }
+
+    def _take_batch(self) -> list[tuple[dict, _Commit | None]] | None:
+        with self._condition:
+            deadline = time.monotonic() + self.flush_interval
+            while not self._closing and len(self._pending) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    if self._pending or self.flush_interval > 0:
+                        break
+                    # Group commit: nothing to write, so sleep until a row arrives.
+                    remaining = None
+                self._condition.wait(remaining)
+            if not self._pending:
+                return None if self._closing else []
+            batch_length = min(self.batch_size, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(batch_length)]
+            self._condition.notify_all()
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch: list[tuple[dict, _Commit | None]]) -> None:
+        rows = [row for row, _ in batch]
+        error = None
+        for attempt in range(2):
+            started = time.perf_counter()
+            db = self.session_factory()
+            try:
+                crud.create_transactions(db=db, rows=rows)
+            except Exception as exc:
+                db.rollback()
+                error = str(exc)
+                self.flush_errors += 1
+                logger.exception(
+                    "Decision log flush of %d rows failed (attempt %d)", len(batch), attempt + 1
+                )
+                time.sleep(self.retry_delay)
+                continue
+            finally:
+                db.close()
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.flush_count += 1
+            self.flushed_rows += len(batch)
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self.total_flush_ms += elapsed_ms
+            if self.on_flush is not None:
+                self.on_flush(elapsed_ms / 1000)
+            self._settle(batch, None)
+            return
+
+        self.dropped_rows += len(batch)
+        self._settle(batch, error)
+
+    @staticmethod
+    def _settle(batch: list[tuple[dict, _Commit | None]], error: str | None) -> None:
+        for _, commit in batch:
+            if commit is None:
+                continue
+            if error is not None:
+                commit.error = error
+            commit.remaining -= 1
+            if commit.remaining == 0:
+                commit.done.set()
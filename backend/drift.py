@@ -0,0 +1,316 @@
+import json
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+DRIFT_REFERENCE_FILE_NAME = "drift_reference.json"
+RISK_COLUMN = "risk_probability"
+DEFAULT_BINS = 10
+# Conventional PSI bands: under 0.1 is stable, 0.1-0.25 a moderate shift, above that a major one.
+PSI_MODERATE = 0.1
+PSI_HIGH = 0.25
+# Empty bins would make PSI infinite; both distributions are floored at this share.
+PSI_EPSILON = 1e-4
+
+
+class DriftReference:
+    """Bin cut points and expected bin shares per column, frozen from a reference sample.
+
+    Cut points are the sample's quantiles, so each bin holds about the same
+    share of the reference. Repeated quantiles (discrete columns) collapse
+    into one cut. A value equal to a cut point falls in the bin above it.
+    """
+
+    def __init__(
+        self,
+        columns: list[str],
+        cuts: list[Any],
+        expected: list[Any],
+        rows: int,
+        source: str,
+    ) -> None:
+        if not len(columns) == len(cuts) == len(expected):
+            raise ValueError("Drift reference needs cuts and expected shares for every column.")
+        self.columns = list(columns)
+        self.cuts = [np.asarray(values, dtype=np.float64) for values in cuts]
+        self.expected = [np.asarray(values, dtype=np.float64) for values in expected]
+        for column, column_cuts, shares in zip(self.columns, self.cuts, self.expected):
+            if shares.size != column_cuts.size + 1:
+                raise ValueError(f"Drift reference for {column!r} has mismatched bins.")
+        self.rows = int(rows)
+        self.source = source
+        # Padded with +inf so one broadcast comparison bins every column at once.
+        self.max_bins = max(shares.size for shares in self.expected)
+        self._padded_cuts = np.full((len(self.columns), self.max_bins - 1), np.inf)
+        for index, column_cuts in enumerate(self.cuts):
+            self._padded_cuts[index, : column_cuts.size] = column_cuts
+
+    @classmethod
+    def from_samples(
+        cls,
+        columns: list[str],
+        samples: np.ndarray,
+        bins: int = DEFAULT_BINS,
+        source: str = "training",
+    ) -> "DriftReference":
+        samples = np.asarray(samples, dtype=np.float64)
+        if samples.ndim != 2 or samples.shape[1] != len(columns) or not len(samples):
+            raise ValueError("Drift reference samples must be a non-empty rows x columns matrix.")
+        quantiles = np.linspace(0.0, 1.0, bins + 1)[1:-1]
+        cuts, expected = [], []
+        for values in samples.T:
+            column_cuts = np.unique(np.quantile(values, quantiles))
+            counts = np.bincount(
+                np.searchsorted(column_cuts, values, side="right"), minlength=column_cuts.size + 1
+            )
+            cuts.append(column_cuts)
+            expected.append(counts / len(values))
+        return cls(columns, cuts, expected, len(samples), source)
+
+    def bin_indices(self, samples: np.ndarray) -> np.ndarray:
+        """Bin index of every value in a rows x columns matrix."""
+        return np.sum(samples[:, :, None] >= self._padded_cuts[None, :, :], axis=2)
+
+    def save(self, path: Path) -> None:
+        payload = {
+            "method": "quantile_bins",
+            "source": self.source,
+            "rows": self.rows,
+            "columns": {
+                column: {"cuts": column_cuts.tolist(), "expected": shares.tolist()}
+                for column, column_cuts, shares in zip(self.columns, self.cuts, self.expected)
+            },
+        }
+        Path(path).write_text(json.dumps(payload), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "DriftReference":
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        if payload.get("method") != "quantile_bins":
+            raise ValueError(f"Unsupported drift reference {path}.")
+        columns = list(payload["columns"])
+        return cls(
+            columns,
+            [payload["columns"][column]["cuts"] for column in columns],
+            [payload["columns"][column]["expected"] for column in columns],
+            payload["rows"],
+            payload.get("source", "training"),
+        )
+
+
+def load_drift_reference(model_path: Path) -> DriftReference | None:
+    """The reference stored next to a model file or compiled directory, if any."""
+    reference_path = Path(model_path).parent / DRIFT_REFERENCE_FILE_NAME
+    if not reference_path.exists():
+        return None
+    return DriftReference.load(reference_path)
+
+
+def population_stability_index(observed: np.ndarray, expected: np.ndarray) -> float:
+    actual = np.maximum(observed / max(observed.sum(), 1), PSI_EPSILON)
+    expected = np.maximum(expected, PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def drift_severity(psi: float) -> str:
+    if psi >= PSI_HIGH:
+        return "high"
+    if psi >= PSI_MODERATE:
+        return "moderate"
+    return "none"
+
+
+class DriftMonitor:
+    """Per-column bin counts over a sliding window, compared with a frozen reference.
+
+    Time is cut into ``bucket_seconds`` buckets kept in a ring of ``buckets``
+    slots, each holding a columns x bins count matrix. Observing a batch adds
+    to the current slot; a report sums the slots inside the requested window.
+    Memory and report cost depend on the ring and the bin count, never on
+    traffic.
+
+    The reference comes from the model version (``drift_reference.json``
+    written at training time). A version without one freezes its reference
+    from its first ``reference_rows`` scored rows after deployment. Activating
+    another version starts over.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: float = 300.0,
+        buckets: int = 288,
+        reference_rows: int = 10_000,
+        min_rows: int = 500,
+        clock: Any = time.time,
+    ) -> None:
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.reference_rows = reference_rows
+        self.min_rows = min_rows
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self.version_name: str | None = None
+        self._version_loaded_at: Any = None
+        self.columns: list[str] = []
+        self.reference: DriftReference | None = None
+        self._pending: list[np.ndarray] = []
+        self._pending_rows = 0
+        self._counts = np.zeros((0, 0, 0), dtype=np.int64)
+        self._bucket_ids = np.full(buckets, -1, dtype=np.int64)
+
+        self.observed_rows = 0
+        self.resets = 0
+
+    @property
+    def window_seconds(self) -> float:
+        return self.bucket_seconds * self.buckets
+
+    def _reset(self, version: Any) -> None:
+        self.version_name = version.name
+        self._version_loaded_at = getattr(version, "loaded_at", None)
+        self.columns = list(version.feature_columns) + [RISK_COLUMN]
+        self._pending = []
+        self._pending_rows = 0
+        self._start(getattr(version, "drift_reference", None))
+        self.resets += 1
+
+    def _start(self, reference: DriftReference | None) -> None:
+        self.reference = reference
+        self._bucket_ids.fill(-1)
+        if reference is not None:
+            self._counts = np.zeros(
+                (self.buckets, len(self.columns), reference.max_bins), dtype=np.int64
+            )
+
+    def observe(self, version: Any, rows: np.ndarray, probabilities: Any) -> None:
+        """Count one scored batch: feature rows in version column order plus their risk."""
+        samples = np.column_stack([rows, np.asarray(probabilities, dtype=np.float64)])
+        with self._lock:
+            # A version reloaded under the same name is a new model too.
+            if (version.name, getattr(version, "loaded_at", None)) != (
+                self.version_name,
+                self._version_loaded_at,
+            ):
+                self._reset(version)
+            if self.reference is None:
+                self._collect_reference(samples)
+                return
+            bucket = int(self._clock() // self.bucket_seconds)
+            slot = bucket % self.buckets
+            if self._bucket_ids[slot] != bucket:
+                self._counts[slot] = 0
+                self._bucket_ids[slot] = bucket
+            bins = self.reference.bin_indices(samples)
+            offsets = np.arange(len(self.columns)) * self.reference.max_bins
+            self._counts[slot] += np.bincount(
+                (bins + offsets).ravel(), minlength=self._counts[slot].size
+            ).reshape(self._counts[slot].shape)
+            self.observed_rows += len(samples)
+
+    def _collect_reference(self, samples: np.ndarray) -> None:
+        needed = self.reference_rows - self._pending_rows
+        self._pending.append(samples[:needed])
+        self._pending_rows += len(self._pending[-1])
+        if self._pending_rows < self.reference_rows:
+            return
+        reference = DriftReference.from_samples(
+            self.columns, np.vstack(self._pending), source="deployment"
+        )
+        self._pending = []
+        self._start(reference)
+
+    def report(self, window_seconds: float | None = None) -> dict:
+        """PSI per column over the last ``window_seconds`` (default: the whole ring)."""
+        with self._lock:
+            if self.reference is None:
+                return {
+                    "enabled": True,
+                    "model_version": self.version_name,
+                    "reference_source": None,
+                    "reference_rows": self._pending_rows,
+                    "window_seconds": 0.0,
+                    "observations": 0,
+                    "reports": [],
+                }
+            buckets = self.buckets
+            if window_seconds is not None:
+                buckets = min(max(math.ceil(window_seconds / self.bucket_seconds), 1), buckets)
+            current = int(self._clock() // self.bucket_seconds)
+            live = self._bucket_ids > current - buckets
+            counts = self._counts[live].sum(axis=0)
+            reference = self.reference
+            version_name = self.version_name
+
+        observations = int(counts[0].sum()) if len(counts) else 0
+        reports = []
+        for index, column in enumerate(self.columns):
+            expected = reference.expected[index]
+            psi = population_stability_index(counts[index, : expected.size], expected)
+            reports.append(
+                {
+                    "feature": column,
+                    "observations": observations,
+                    "psi_score": round(psi, 4),
+                    **self._assess(column, psi, observations, reference.source),
+                }
+            )
+        return {
+            "enabled": True,
+            "model_version": version_name,
+            "reference_source": reference.source,
+            "reference_rows": reference.rows,
+            "window_seconds": buckets * self.bucket_seconds,
+            "observations": observations,
+            "reports": reports,
+        }
+
+    def _assess(self, column: str, psi: float, observations: int, source: str) -> dict:
+        if observations < self.min_rows:
+            return {
+                "drift_detected": False,
+                "drift_severity": "insufficient_data",
+                "recommendations": [
+                    f"Only {observations} scored rows in the window; "
+                    f"PSI is reported from {self.min_rows}."
+                ],
+            }
+        severity = drift_severity(psi)
+        recommendations = []
+        if severity == "moderate":
+            recommendations.append(
+                f"{column} has shifted from its {source} distribution; watch it."
+            )
+        elif severity == "high" and column == RISK_COLUMN:
+            recommendations.append(
+                "Scores have moved away from the reference; review the decision threshold "
+                "and approval rate before the next retrain."
+            )
+        elif severity == "high":
+            recommendations.append(
+                f"{column} no longer matches its {source} distribution; check the upstream "
+                "feature pipeline and consider retraining."
+            )
+        return {
+            "drift_detected": severity != "none",
+            "drift_severity": severity,
+            "recommendations": recommendations,
+        }
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": True,
+            "model_version": self.version_name,
+            "reference_source": self.reference.source if self.reference is not None else None,
+            "reference_rows": (
+                self.reference.rows if self.reference is not None else self._pending_rows
+            ),
+            "bucket_seconds": self.bucket_seconds,
+            "buckets": self.buckets,
+            "observed_rows": self.observed_rows,
+            "resets": self.resets,
+        }
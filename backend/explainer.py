@@ -0,0 +1,160 @@
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from calibration import CalibratedBooster
+from model_registry import NON_MODEL_FILE_NAMES, file_digest, read_source_stamp
+from tree_engine import CompiledTreeEnsemble
+
+EXPLAIN_METHODS = ("exact", "approx")
+BOOSTER_FILE_SUFFIXES = (".ubj", ".json")
+
+
+def source_booster_path(compiled_dir: Path) -> Path | None:
+    """The booster file next to ``compiled_dir`` that it was compiled from, if any.
+
+    The compiled directory's stamp holds the SHA-256 of the booster
+    ``compile_model.py`` read. That file matches it, and so does a UBJSON copy
+    stamped in the same run. Anything else is a different model.
+    """
+    stamp = read_source_stamp(compiled_dir)
+    if stamp is None:
+        return None
+    for suffix in BOOSTER_FILE_SUFFIXES:
+        for path in sorted(Path(compiled_dir).parent.glob(f"*{suffix}")):
+            if path.name in NON_MODEL_FILE_NAMES:
+                continue
+            if read_source_stamp(path) == stamp or file_digest(path) == stamp:
+                return path
+    return None
+
+
+def booster_for(model: Any, source: str | None = None) -> Any:
+    """Return the XGBoost booster behind ``model``, or None if it has none.
+
+    A compiled ensemble keeps no cover statistics, so its booster is the file
+    next to the compiled directory that it was compiled from
+    (``model/compiled`` -> ``model/*.ubj``). A calibrated booster is explained
+    by its uncalibrated margin.
+    """
+    if isinstance(model, CalibratedBooster):
+        return booster_for(model.model, source)
+    if isinstance(model, CompiledTreeEnsemble):
+        path = source_booster_path(Path(source)) if source is not None else None
+        if path is None:
+            return None
+        import xgboost as xgb
+
+        booster = xgb.Booster()
+        booster.load_model(str(path))
+        return booster
+    if hasattr(model, "get_booster"):
+        return model.get_booster()
+
+    import xgboost as xgb
+
+    if isinstance(model, xgb.Booster):
+        return model
+    return None
+
+
+class ExplanationUnavailable(Exception):
+    pass
+
+
+class TreeExplainer:
+    """Per-feature risk contributions from the booster's native TreeSHAP.
+
+    Contributions are in log-odds space: for each row they sum with
+    ``base_value`` to the model margin. ``approx`` uses XGBoost's path-based
+    approximation, which is much cheaper but not a Shapley value. The booster
+    is resolved on first use so scoring-only processes never import xgboost.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        feature_columns: list[str],
+        method: str = "exact",
+        source: str | None = None,
+    ) -> None:
+        if method not in EXPLAIN_METHODS:
+            raise ValueError(f"Unknown explain method {method!r}; use one of {EXPLAIN_METHODS}.")
+        self.model = model
+        self.feature_columns = feature_columns
+        self.method = method
+        self.source = source
+        self._booster: Any = None
+        self._resolved = False
+        self._lock = threading.Lock()
+
+    @property
+    def compiled(self) -> bool:
+        """Whether the booster must be found next to a compiled directory."""
+        model = self.model.model if isinstance(self.model, CalibratedBooster) else self.model
+        return isinstance(model, CompiledTreeEnsemble)
+
+    @property
+    def booster(self) -> Any:
+        if not self._resolved:
+            with self._lock:
+                if not self._resolved:
+                    self._booster = booster_for(self.model, self.source)
+                    self._resolved = True
+        return self._booster
+
+    def contributions(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return (contributions of shape rows x features, base value per row)."""
+        booster = self.booster
+        if booster is None:
+            raise ExplanationUnavailable(
+                f"{type(self.model).__name__} models do not support explanations."
+            )
+        import xgboost as xgb
+
+        matrix = xgb.DMatrix(rows, feature_names=self.feature_columns)
+        values = booster.predict(
+            matrix, pred_contribs=True, approx_contribs=self.method == "approx"
+        )
+        values = np.asarray(values, dtype=float)
+        return values[:, :-1], values[:, -1]
+
+
+def rank_contributions(
+    contributions: np.ndarray,
+    top_k: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Order each row's features by absolute contribution, keeping ``top_k``.
+
+    Returns the column indices (rows x k) and, per row, the summed
+    contribution of the features that were cut off.
+    """
+    order = np.argsort(-np.abs(contributions), axis=1, kind="stable")
+    if top_k is not None and top_k < contributions.shape[1]:
+        order = order[:, :top_k]
+    kept = np.take_along_axis(contributions, order, axis=1).sum(axis=1)
+    return order, contributions.sum(axis=1) - kept
+
+
+class LatencyWindow:
+    """Rolling window of recent latencies for percentile reporting."""
+
+    def __init__(self, size: int = 1000) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def observe(self, milliseconds: float) -> None:
+        with self._lock:
+            self._samples.append(milliseconds)
+            self.count += 1
+
+    def percentiles(self, *quantiles: float) -> list[float]:
+        with self._lock:
+            samples = np.fromiter(self._samples, dtype=float)
+        if samples.size == 0:
+            return [0.0 for _ in quantiles]
+        return [float(value) for value in np.percentile(samples, quantiles)]
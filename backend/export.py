@@ -0,0 +1,130 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import Transaction
+
+EXPORT_COLUMNS = [column.name for column in Transaction.__table__.columns]
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class _ChunkSink:
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def iter_transaction_chunks(
+    session_factory: Callable[[], Session],
+    start: datetime | None = None,
+    end: datetime | None = None,
+    decision: str | None = None,
+    chunk_size: int = 5000,
+) -> Iterator[list[tuple]]:
+    statement = select(*Transaction.__table__.columns).order_by(
+        Transaction.created_at, Transaction.id
+    )
+    if start is not None:
+        statement = statement.where(Transaction.created_at >= start)
+    if end is not None:
+        statement = statement.where(Transaction.created_at < end)
+    if decision is not None:
+        statement = statement.where(Transaction.decision == decision)
+
+    # yield_per streams from a server-side cursor where the driver supports one.
+    db = session_factory()
+    try:
+        result = db.execute(statement.execution_options(yield_per=chunk_size))
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+    finally:
+        db.close()
+
+
+def _json_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def stream_ndjson(chunks: Iterator[list[tuple]]) -> Iterator[bytes]:
+    for chunk in chunks:
+        lines = [
+            json.dumps({name: _json_value(value) for name, value in zip(EXPORT_COLUMNS, row)})
+            for row in chunk
+        ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def stream_csv(chunks: Iterator[list[tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue().encode("utf-8")
+    for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_json_value(value) for value in row] for row in chunk)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def stream_parquet(chunks: Iterator[list[tuple]]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    column_types = {
+        "id": pa.int64(),
+        "neg_balance_days_30d": pa.int64(),
+        "decision": pa.string(),
+        "model_version": pa.string(),
+        "buyer_id": pa.string(),
+        "created_at": pa.timestamp("us", tz="UTC"),
+    }
+    schema = pa.schema([(name, column_types.get(name, pa.float64())) for name in EXPORT_COLUMNS])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        # One row group per database chunk keeps memory flat on both ends.
+        for chunk in chunks:
+            columns = [list(values) for values in zip(*chunk)]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+EXPORT_WRITERS = {
+    "ndjson": stream_ndjson,
+    "csv": stream_csv,
+    "parquet": stream_parquet,
+}
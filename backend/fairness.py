@@ -0,0 +1,88 @@
+from typing import Any
+
+from sqlalchemy import case
+
+from middleware.validators import HIGH_INCOME_GROUP, INCOME_GROUP_BOUNDS
+
+INCOME_GROUPS = [group for group, _ in INCOME_GROUP_BOUNDS] + [HIGH_INCOME_GROUP]
+# Disparate impact: a group approved at under 80% of the best group's rate is flagged.
+FOUR_FIFTHS_RATIO = 0.8
+MIN_GROUP_DECISIONS = 30
+
+
+def income_group_expression(monthly_income: Any) -> Any:
+    """SQL twin of ``classify_income_group`` for a monthly income column."""
+    return case(
+        *[(monthly_income < upper_bound, group) for group, upper_bound in INCOME_GROUP_BOUNDS],
+        else_=HIGH_INCOME_GROUP,
+    )
+
+
+def fairness_metrics(
+    groups: dict[str, dict],
+    min_group_decisions: int = MIN_GROUP_DECISIONS,
+) -> dict:
+    """Build the ``FairnessMetrics`` fields from per-group totals.
+
+    ``groups`` maps income group to ``decisions``, ``approvals``, ``risk_sum``
+    and a ``decision_mix`` of counts per decision. Groups with fewer than
+    ``min_group_decisions`` are reported but left out of the parity comparison.
+    """
+    total = sum(group["decisions"] for group in groups.values())
+    approvals = sum(group["approvals"] for group in groups.values())
+    rates = {
+        name: group["approvals"] / group["decisions"]
+        for name, group in groups.items()
+        if group["decisions"]
+    }
+    compared = {
+        name: rate
+        for name, rate in rates.items()
+        if groups[name]["decisions"] >= min_group_decisions
+    }
+    best_group = max(compared, key=compared.get, default=None)
+    best_rate = compared[best_group] if best_group is not None else 0.0
+
+    metrics_by_group = {}
+    issues = []
+    for name in sorted(groups, key=lambda name: (INCOME_GROUPS + [name]).index(name)):
+        group = groups[name]
+        decisions = group["decisions"]
+        if not decisions:
+            continue
+        parity = rates[name] / best_rate if name in compared and best_rate else None
+        metrics_by_group[name] = {
+            "decisions": decisions,
+            "approvals": group["approvals"],
+            "approval_rate": round(rates[name], 4),
+            "approval_parity": round(parity, 4) if parity is not None else None,
+            "avg_risk": round(group["risk_sum"] / decisions, 4),
+            "decision_mix": {
+                decision: round(count / decisions, 4)
+                for decision, count in group["decision_mix"].items()
+            },
+        }
+        if name not in compared:
+            issues.append(
+                f"{name} income group has {decisions} decisions, fewer than "
+                f"{min_group_decisions}; left out of the parity check"
+            )
+        elif parity < FOUR_FIFTHS_RATIO:
+            issues.append(
+                f"{name} income group is approved at {rates[name]:.1%}, {parity:.0%} of the "
+                f"{best_group} group's {best_rate:.1%} (four-fifths rule)"
+            )
+
+    parities = [
+        values["approval_parity"]
+        for values in metrics_by_group.values()
+        if values["approval_parity"] is not None
+    ]
+    return {
+        "total_predictions": total,
+        "approval_rate": round(approvals / total, 4) if total else 0.0,
+        "rejection_rate": round((total - approvals) / total, 4) if total else 0.0,
+        "metrics_by_group": metrics_by_group,
+        "fairness_score": min(parities) if len(parities) > 1 else 1.0,
+        "issues_detected": issues,
+    }
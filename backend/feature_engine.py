@@ -0,0 +1,316 @@
+import math
+import threading
+from collections import OrderedDict, deque
+from typing import Iterable, NamedTuple
+
+SECONDS_PER_DAY = 86_400
+WINDOW_DAYS = 90
+RECENT_DAYS = 30
+MONTHS_IN_WINDOW = WINDOW_DAYS // RECENT_DAYS
+# A BNPL purchase is repaid in four installments.
+BNPL_INSTALLMENTS = 4
+# The model was trained on buffer ratios clipped to this range.
+BUFFER_RATIO_RANGE = (-1.0, 3.0)
+
+
+class FeatureUnavailable(Exception):
+    pass
+
+
+class BankTransactionEvent(NamedTuple):
+    timestamp: float
+    amount: float
+    balance: float | None = None
+    debt_repayment: bool = False
+
+
+def _stress_index(
+    volatility: float,
+    negative_days: int,
+    total_burden: float,
+    buffer_ratio: float,
+    spend_ratio: float,
+) -> float:
+    # The composite the synthetic training data draws stress_index from.
+    score = (
+        1.6 * volatility
+        + 0.08 * negative_days
+        + 1.2 * total_burden
+        - 1.0 * buffer_ratio
+        + 0.8 * (spend_ratio - 0.8)
+        - 1.5
+    )
+    return 1.0 / (1.0 + math.exp(-score))
+
+
+class BuyerWindow:
+    """Rolling 30- and 90-day cash-flow aggregates for one buyer.
+
+    Transactions land in one bucket per UTC day, in a ring of ``WINDOW_DAYS``
+    slots. Sums (in integer cents, so removing a day restores them exactly),
+    the three 30-day inflow totals, the negative-balance day count and a
+    monotonic deque of daily low balances are updated as events arrive and as
+    days roll out of the window. Reading the features never
+    walks the history. Events older than the window are skipped. A late event
+    that lowers a past day's balance rebuilds the deque from at most 30 buckets.
+    """
+
+    __slots__ = (
+        "inflow",
+        "outflow",
+        "debt",
+        "low",
+        "bucket_day",
+        "today",
+        "first_day",
+        "balance",
+        "last_timestamp",
+        "inflow_total",
+        "outflow_total",
+        "debt_total",
+        "month_inflow",
+        "negative_days",
+        "lows",
+    )
+
+    def __init__(self) -> None:
+        self.inflow = [0] * WINDOW_DAYS
+        self.outflow = [0] * WINDOW_DAYS
+        self.debt = [0] * WINDOW_DAYS
+        self.low = [math.inf] * WINDOW_DAYS
+        self.bucket_day = [-1] * WINDOW_DAYS
+        self.today: int | None = None
+        self.first_day = 0
+        self.balance: float | None = None
+        self.last_timestamp = -math.inf
+        self._reset_totals()
+
+    def _reset_totals(self) -> None:
+        self.inflow_total = 0
+        self.outflow_total = 0
+        self.debt_total = 0
+        self.month_inflow = [0] * MONTHS_IN_WINDOW
+        self.negative_days = 0
+        # (day, low) pairs with increasing lows; the front is the 30-day minimum.
+        self.lows: deque[tuple[int, float]] = deque()
+
+    def _open(self, day: int) -> None:
+        slot = day % WINDOW_DAYS
+        self.bucket_day[slot] = day
+        self.inflow[slot] = self.outflow[slot] = self.debt[slot] = 0
+        # A day starts at the previous closing balance.
+        self.low[slot] = math.inf
+        if self.balance is not None and day == self.today:
+            self._lower(slot, day, self.balance)
+
+    def _has(self, day: int) -> bool:
+        return self.bucket_day[day % WINDOW_DAYS] == day
+
+    def _lower(self, slot: int, day: int, balance: float) -> None:
+        if balance >= self.low[slot]:
+            return
+        if self.today - day < RECENT_DAYS:
+            if balance < 0 <= self.low[slot]:
+                self.negative_days += 1
+            if day == self.today:
+                while self.lows and self.lows[-1][1] >= balance:
+                    self.lows.pop()
+                self.low[slot] = balance
+                self.lows.append((day, balance))
+                return
+            self.low[slot] = balance
+            self._rebuild_lows()
+            return
+        self.low[slot] = balance
+
+    def _rebuild_lows(self) -> None:
+        self.lows.clear()
+        for day in range(self.today - RECENT_DAYS + 1, self.today + 1):
+            slot = day % WINDOW_DAYS
+            if self.bucket_day[slot] != day or self.low[slot] == math.inf:
+                continue
+            while self.lows and self.lows[-1][1] >= self.low[slot]:
+                self.lows.pop()
+            self.lows.append((day, self.low[slot]))
+
+    def advance(self, day: int) -> None:
+        """Roll the window forward so ``day`` is the newest bucket."""
+        if self.today is None:
+            self.today = self.first_day = day
+            self._open(day)
+            return
+        if day <= self.today:
+            return
+        if day - self.today >= WINDOW_DAYS:
+            # Nothing survives the gap; only the last 30 days need the carried balance.
+            self.bucket_day = [-1] * WINDOW_DAYS
+            self._reset_totals()
+            self.first_day = day - WINDOW_DAYS + 1
+            self.today = day - RECENT_DAYS
+        while self.today < day:
+            self.today += 1
+            # Each step, one day crosses each 30-day boundary and one leaves the window.
+            for months, boundary in enumerate(range(RECENT_DAYS, WINDOW_DAYS + 1, RECENT_DAYS)):
+                aged_day = self.today - boundary
+                if not self._has(aged_day):
+                    continue
+                slot = aged_day % WINDOW_DAYS
+                self.month_inflow[months] -= self.inflow[slot]
+                if boundary < WINDOW_DAYS:
+                    self.month_inflow[months + 1] += self.inflow[slot]
+                else:
+                    self.inflow_total -= self.inflow[slot]
+                    self.outflow_total -= self.outflow[slot]
+                    self.debt_total -= self.debt[slot]
+                    self.bucket_day[slot] = -1
+                if boundary == RECENT_DAYS and self.low[slot] < 0:
+                    self.negative_days -= 1
+            while self.lows and self.lows[0][0] <= self.today - RECENT_DAYS:
+                self.lows.popleft()
+            self._open(self.today)
+
+    def add(self, event: BankTransactionEvent) -> bool:
+        day = int(event.timestamp // SECONDS_PER_DAY)
+        self.advance(day)
+        age = self.today - day
+        if age >= WINDOW_DAYS:
+            return False
+        if not self._has(day):
+            self._open(day)
+            self.first_day = min(self.first_day, day)
+        slot = day % WINDOW_DAYS
+        cents = round(event.amount * 100)
+        if cents >= 0:
+            self.inflow[slot] += cents
+            self.inflow_total += cents
+            self.month_inflow[age // RECENT_DAYS] += cents
+        else:
+            self.outflow[slot] -= cents
+            self.outflow_total -= cents
+            if event.debt_repayment:
+                self.debt[slot] -= cents
+                self.debt_total -= cents
+
+        balance = event.balance
+        in_order = event.timestamp >= self.last_timestamp
+        if balance is None and in_order and self.balance is not None:
+            balance = self.balance + event.amount
+        if in_order:
+            self.last_timestamp = event.timestamp
+            if balance is not None:
+                self.balance = balance
+        if balance is not None:
+            self._lower(slot, day, balance)
+        return True
+
+    def features(self, purchase_amount: float) -> dict[str, float | int]:
+        """The nine model features for a checkout of ``purchase_amount``."""
+        history_days = self.today - self.first_day + 1
+        # Less than a month of history is scaled as one month, not extrapolated.
+        months = max(min(history_days, WINDOW_DAYS), RECENT_DAYS) / RECENT_DAYS
+        avg_inflow = self.inflow_total / 100 / months
+        avg_outflow = self.outflow_total / 100 / months
+        if avg_inflow <= 0:
+            raise FeatureUnavailable(f"No inflow in the last {WINDOW_DAYS} days.")
+
+        full_months = min(history_days // RECENT_DAYS, MONTHS_IN_WINDOW)
+        monthly = self.month_inflow[:full_months]
+        volatility = 0.0
+        if full_months >= 2 and sum(monthly) > 0:
+            mean = sum(monthly) / full_months
+            variance = sum((value - mean) ** 2 for value in monthly) / full_months
+            volatility = math.sqrt(variance) / mean
+
+        if self.lows:
+            min_balance = self.lows[0][1]
+        else:
+            min_balance = self.balance if self.balance is not None else 0.0
+        purchase_ratio = purchase_amount / avg_inflow
+        total_burden = self.debt_total / 100 / months / avg_inflow
+        total_burden += purchase_ratio / BNPL_INSTALLMENTS
+        buffer_ratio = min_balance / avg_outflow if avg_outflow > 0 else BUFFER_RATIO_RANGE[1]
+        buffer_ratio = min(max(buffer_ratio, BUFFER_RATIO_RANGE[0]), BUFFER_RATIO_RANGE[1])
+        stress = _stress_index(
+            volatility, self.negative_days, total_burden, buffer_ratio, avg_outflow / avg_inflow
+        )
+        return {
+            "avg_monthly_inflow": round(avg_inflow, 2),
+            "inflow_volatility": round(volatility, 4),
+            "avg_monthly_outflow": round(avg_outflow, 2),
+            "min_balance_30d": round(min_balance, 2),
+            "neg_balance_days_30d": self.negative_days,
+            "purchase_to_inflow_ratio": round(purchase_ratio, 4),
+            "total_burden_ratio": round(total_burden, 4),
+            "buffer_ratio": round(buffer_ratio, 4),
+            "stress_index": round(stress, 4),
+        }
+
+
+class FeatureEngine:
+    """Thread-safe map of buyer id to ``BuyerWindow``, bounded by least-recent use.
+
+    State lives in this process only. Evicted buyers start again from their
+    next transactions.
+    """
+
+    def __init__(self, max_buyers: int = 100_000) -> None:
+        self.max_buyers = max_buyers
+        self._windows: OrderedDict[str, BuyerWindow] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.ingested = 0
+        self.skipped = 0
+        self.evictions = 0
+        self.lookups = 0
+
+    def ingest(self, buyer_id: str, events: Iterable[BankTransactionEvent]) -> tuple[int, int]:
+        """Apply events in timestamp order and return (accepted, skipped) counts."""
+        ordered = sorted(events, key=lambda event: event.timestamp)
+        accepted = 0
+        with self._lock:
+            window = self._windows.get(buyer_id)
+            if window is None:
+                window = self._windows[buyer_id] = BuyerWindow()
+                while len(self._windows) > self.max_buyers:
+                    self._windows.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._windows.move_to_end(buyer_id)
+            for event in ordered:
+                accepted += window.add(event)
+            self.ingested += accepted
+            self.skipped += len(ordered) - accepted
+        return accepted, len(ordered) - accepted
+
+    def features(
+        self,
+        buyer_id: str,
+        purchase_amount: float,
+        as_of: float | None = None,
+    ) -> tuple[dict[str, float | int], int, int] | None:
+        """Return (features, history days, as-of day), or None for an unknown buyer.
+
+        ``as_of`` (epoch seconds) rolls the window forward first, so a buyer who
+        went quiet is scored on the days since, not on stale totals.
+        """
+        with self._lock:
+            window = self._windows.get(buyer_id)
+            if window is None:
+                return None
+            self._windows.move_to_end(buyer_id)
+            if as_of is not None:
+                window.advance(int(as_of // SECONDS_PER_DAY))
+            self.lookups += 1
+            history_days = min(window.today - window.first_day + 1, WINDOW_DAYS)
+            return window.features(purchase_amount), history_days, window.today
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": True,
+            "buyers": len(self._windows),
+            "max_buyers": self.max_buyers,
+            "ingested_transactions": self.ingested,
+            "skipped_transactions": self.skipped,
+            "evictions": self.evictions,
+            "lookups": self.lookups,
+        }
@@ -0,0 +1,60 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class InferenceBusy(Exception):
+    pass
+
+
+class InferenceExecutor:
+    """Thread pool reserved for model inference, separate from the DB/request threadpool.
+
+    At most ``max_workers`` calls run at once and at most ``max_pending`` are
+    admitted in total. A call that cannot be admitted within ``queue_timeout``
+    seconds raises ``InferenceBusy`` instead of queueing without bound.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 64, queue_timeout: float = 0.5):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="inference"
+        )
+        self._slots = asyncio.Semaphore(max_pending)
+
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except TimeoutError as exc:
+            self.rejected += 1
+            raise InferenceBusy(
+                f"Inference queue is full ({self.max_pending} calls admitted)."
+            ) from exc
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(function, *args))
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def snapshot(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
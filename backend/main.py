@@ -1,20 +1,114 @@
 import json
+import logging
 import os
-from contextlib import asynccontextmanager
+import threading
+import time
+from contextlib import asynccontextmanager, nullcontext
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
-import joblib
-import pandas as pd
-import xgboost as xgb
-from fastapi import Depends, FastAPI, HTTPException, Query
+import numpy as np
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from pydantic import ValidationError
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 import crud
 import models  # noqa: F401
-from database import Base, engine, get_db
-from schemas import HealthResponse, LogsResponse, PredictRequest, PredictResponse, StatsResponse
+from database import (
+    SessionLocal,
+    dispose_async_engine,
+    engine,
+    get_async_db,
+    get_async_engine,
+    get_db,
+)
+from calibration import CalibratedBooster
+from decision_log import (
+    DecisionLogFailed,
+    DecisionLogFull,
+    DecisionLogTimeout,
+    DecisionLogWriter,
+)
+from drift import RISK_COLUMN, DriftMonitor, load_drift_reference
+from explainer import LatencyWindow, TreeExplainer, rank_contributions
+from fairness import MIN_GROUP_DECISIONS, fairness_metrics
+from feature_engine import BankTransactionEvent, FeatureEngine, FeatureUnavailable
+from export import EXPORT_MEDIA_TYPES, EXPORT_WRITERS, iter_transaction_chunks
+from inference_executor import InferenceBusy, InferenceExecutor
+from metrics import (
+    MetricsRegistry,
+    RequestMetricsMiddleware,
+    observe_since_request_start,
+    render_prometheus,
+    timed,
+)
+from micro_batcher import MicroBatcher
+from model_registry import (
+    ModelRegistry,
+    ModelVersion,
+    compiled_from,
+    discover_versions,
+    load_model_file,
+    read_active_pointer,
+    version_fingerprint,
+)
+from models.schemas import DriftReport, DriftResponse, FairnessMetrics
+from partitions import maintain_partitions
+from schema import prepare_database
+from score_cache import ScoreCache
+from schemas import (
+    BatchPredictItem,
+    BatchPredictRequest,
+    BatchPredictResponse,
+    BuyerExposureResponse,
+    BuyerFeaturesResponse,
+    BuyerHistoryResponse,
+    DecisionLogStatsResponse,
+    ExplainResponse,
+    ExplainStatsResponse,
+    Explanation,
+    FeatureContribution,
+    FeatureEngineStatsResponse,
+    HealthResponse,
+    LogsResponse,
+    MicroBatcherStatsResponse,
+    MLServiceStatsResponse,
+    ModelVersionInfo,
+    ModelVersionsResponse,
+    PredictRequest,
+    PredictResponse,
+    ReadinessResponse,
+    ScoreCacheStatsResponse,
+    StatsResponse,
+    TimeseriesResponse,
+    TransactionIngestRequest,
+    TransactionIngestResponse,
+    WorkersResponse,
+    WorkerStats,
+)
+from timeseries import (
+    DEFAULT_BUCKETS,
+    GRANULARITIES,
+    RollupRetention,
+    as_utc,
+    bucket_floor,
+    timeseries_buckets,
+)
+from tree_engine import CompiledTreeEnsemble
+from worker_metrics import (
+    WorkerCounters,
+    WorkerMetricsPublisher,
+    memory_usage,
+    read_worker_snapshots,
+)
+
+logger = logging.getLogger(__name__)
 
 PROJECT_ROOT = Path(__file__).resolve().parent
 DEFAULT_FEATURE_COLUMNS = [
@@ -29,6 +123,67 @@ DEFAULT_FEATURE_COLUMNS = [
     "stress_index",
 ]
 DEFAULT_JSON_MODEL_NAME = "gig_bnpl_xgb_model.json"
+DEFAULT_UBJ_MODEL_NAME = "gig_bnpl_xgb_model.ubj"
+DEFAULT_COMPILED_MODEL_DIR = "compiled"
+MAX_BATCH_ROWS = int(os.getenv("MAX_BATCH_ROWS", "10000"))
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "xgboost").strip().lower()
+DECISION_LOG_MODE = os.getenv("DECISION_LOG_MODE", "sync").strip().lower()
+REQUEST_MODE = os.getenv("REQUEST_MODE", "sync").strip().lower()
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(os.cpu_count() or 1)))
+INFERENCE_MAX_PENDING = int(os.getenv("INFERENCE_MAX_PENDING", "64"))
+INFERENCE_QUEUE_TIMEOUT_MS = float(os.getenv("INFERENCE_QUEUE_TIMEOUT_MS", "500"))
+SCORE_CACHE_SIZE = int(os.getenv("SCORE_CACHE_SIZE", "0"))
+SCORE_CACHE_TTL_SECONDS = float(os.getenv("SCORE_CACHE_TTL_SECONDS", "300"))
+SCORE_CACHE_DECIMALS = os.getenv("SCORE_CACHE_DECIMALS")
+SCORE_CACHE_LOG_HITS = os.getenv("SCORE_CACHE_LOG_HITS", "true").strip().lower() == "true"
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "5000"))
+STATS_REBUILD_ON_STARTUP = os.getenv("STATS_REBUILD_ON_STARTUP", "false").strip().lower() == "true"
+DB_AUTO_CREATE_SCHEMA = os.getenv("DB_AUTO_CREATE_SCHEMA", "true").strip().lower() == "true"
+MODEL_VERSION = os.getenv("MODEL_VERSION", "default")
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR")
+MODEL_REGISTRY_WATCH_SECONDS = float(os.getenv("MODEL_REGISTRY_WATCH_SECONDS", "0"))
+MODEL_WARMUP_ROWS = int(os.getenv("MODEL_WARMUP_ROWS", "64"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+MICRO_BATCH_MAX_ROWS = int(os.getenv("MICRO_BATCH_MAX_ROWS", "0"))
+MICRO_BATCH_MAX_WAIT_MS = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "2"))
+EXPLAIN_METHOD = os.getenv("EXPLAIN_METHOD", "exact").strip().lower()
+EXPLAIN_MAX_ROWS = int(os.getenv("EXPLAIN_MAX_ROWS", "1000"))
+EXPLAIN_P99_BUDGET_MS = float(os.getenv("EXPLAIN_P99_BUDGET_MS", "25"))
+EXPLAIN_LATENCY_WINDOW = int(os.getenv("EXPLAIN_LATENCY_WINDOW", "1000"))
+EXPLAIN_PRELOAD = os.getenv("EXPLAIN_PRELOAD", "false").strip().lower() == "true"
+FEATURE_ENGINE_MAX_BUYERS = int(os.getenv("FEATURE_ENGINE_MAX_BUYERS", "0"))
+DRIFT_MONITOR_ENABLED = os.getenv("DRIFT_MONITOR_ENABLED", "false").strip().lower() == "true"
+DRIFT_BUCKET_SECONDS = float(os.getenv("DRIFT_BUCKET_SECONDS", "300"))
+DRIFT_WINDOW_BUCKETS = int(os.getenv("DRIFT_WINDOW_BUCKETS", "288"))
+DRIFT_REFERENCE_ROWS = int(os.getenv("DRIFT_REFERENCE_ROWS", "10000"))
+DRIFT_MIN_ROWS = int(os.getenv("DRIFT_MIN_ROWS", "500"))
+ROLLUP_MINUTE_RETENTION_HOURS = float(os.getenv("ROLLUP_MINUTE_RETENTION_HOURS", "48"))
+ROLLUP_HOUR_RETENTION_DAYS = float(os.getenv("ROLLUP_HOUR_RETENTION_DAYS", "90"))
+ROLLUP_DAY_RETENTION_DAYS = float(os.getenv("ROLLUP_DAY_RETENTION_DAYS", "0"))
+ROLLUP_COMPACT_SECONDS = float(os.getenv("ROLLUP_COMPACT_SECONDS", "300"))
+TIMESERIES_MAX_BUCKETS = int(os.getenv("TIMESERIES_MAX_BUCKETS", "1500"))
+TRANSACTION_RETENTION_MONTHS = int(os.getenv("TRANSACTION_RETENTION_MONTHS", "0"))
+TRANSACTION_ARCHIVE_DIR = os.getenv("TRANSACTION_ARCHIVE_DIR")
+PARTITION_MAINTENANCE_SECONDS = float(os.getenv("PARTITION_MAINTENANCE_SECONDS", "3600"))
+ML_SERVICE_ENABLED = os.getenv("ML_SERVICE_ENABLED", "false").strip().lower() == "true"
+ROLLUP_RETENTION = RollupRetention(
+    minute=timedelta(hours=ROLLUP_MINUTE_RETENTION_HOURS),
+    hour=timedelta(days=ROLLUP_HOUR_RETENTION_DAYS),
+    day=timedelta(days=ROLLUP_DAY_RETENTION_DAYS) if ROLLUP_DAY_RETENTION_DAYS > 0 else None,
+)
+
+WORKER_METRICS_DIR = os.getenv("WORKER_METRICS_DIR")
+WORKER_METRICS_INTERVAL_SECONDS = float(os.getenv("WORKER_METRICS_INTERVAL_SECONDS", "2"))
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").strip().lower() == "true"
+
+_model_swap_lock = threading.Lock()
+_worker_counters = WorkerCounters()
+_metrics = MetricsRegistry() if METRICS_ENABLED else None
+# Shared by every stage while metrics are off, so an untimed stage costs one ``with``.
+_UNTIMED = nullcontext()
+_stage_meters: dict[str, tuple] = {}
+# Filled by preload() in a pre-fork parent so workers inherit the model instead of loading it.
+_preloaded: dict[str, Any] = {}
 
 
 def _resolve_model_paths() -> tuple[Path, Path]:
@@ -62,49 +217,611 @@ def _load_metadata(metadata_path: Path) -> dict[str, Any]:
     return {"threshold": threshold, "feature_columns": feature_columns}
 
 
-def _predict_risk_probability(model: Any, row: pd.DataFrame) -> float:
+def _compile_native_model(model: Any) -> CompiledTreeEnsemble | CalibratedBooster:
+    if isinstance(model, CompiledTreeEnsemble):
+        return model
+    if isinstance(model, CalibratedBooster):
+        return CalibratedBooster(_compile_native_model(model.model), model.calibrator)
+
+    import xgboost as xgb
+
+    if isinstance(model, xgb.Booster):
+        return CompiledTreeEnsemble.from_booster(model)
+    if isinstance(model, xgb.XGBClassifier):
+        return CompiledTreeEnsemble.from_booster(model.get_booster())
+    raise RuntimeError(
+        "INFERENCE_ENGINE=native needs a plain XGBoost booster or XGBClassifier; "
+        f"got {type(model).__name__}."
+    )
+
+
+def _predict_risk_probabilities(
+    model: Any,
+    rows: Any,
+    feature_columns: list[str] | None = None,
+) -> np.ndarray:
+    # rows is a DataFrame or a matrix in feature_columns order. pandas and
+    # xgboost are only imported for the model types that need them.
+    if isinstance(model, CalibratedBooster):
+        return model.predict(rows, feature_columns)
     if hasattr(model, "predict_proba"):
-        probabilities = model.predict_proba(row)
-        return float(probabilities[0][1])
+        if hasattr(model, "feature_names_in_") and isinstance(rows, np.ndarray):
+            import pandas as pd
+
+            rows = pd.DataFrame(rows, columns=feature_columns)
+        probabilities = np.asarray(model.predict_proba(rows))
+        return probabilities[:, 1].astype(float)
+
+    import xgboost as xgb
 
-    raw_prediction = model.predict(row)
-    value = float(raw_prediction[0])
-    if 0 <= value <= 1:
-        return value
     if isinstance(model, xgb.Booster):
-        prediction = model.predict(xgb.DMatrix(row))
-        return float(prediction[0])
+        if isinstance(rows, np.ndarray):
+            matrix = xgb.DMatrix(rows, feature_names=feature_columns)
+        else:
+            matrix = xgb.DMatrix(rows)
+        return np.asarray(model.predict(matrix), dtype=float)
+
+    values = np.asarray(model.predict(rows), dtype=float)
+    if np.all((values >= 0) & (values <= 1)):
+        return values
     raise ValueError("Model output is not a probability and predict_proba is unavailable.")
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    Base.metadata.create_all(bind=engine)
+def _predict_risk_probability(
+    model: Any,
+    row: Any,
+    feature_columns: list[str] | None = None,
+) -> float:
+    return float(_predict_risk_probabilities(model, row, feature_columns)[0])
+
 
+def _load_default_model() -> tuple[Any, Path, Path]:
     model_path, metadata_path = _resolve_model_paths()
-    metadata = _load_metadata(metadata_path)
     if model_path.exists():
-        model = joblib.load(model_path)
-    else:
-        json_candidates = [
-            PROJECT_ROOT / "model" / DEFAULT_JSON_MODEL_NAME,
-            PROJECT_ROOT.parent / "ml-service" / DEFAULT_JSON_MODEL_NAME,
+        return load_model_file(model_path), model_path, metadata_path
+
+    json_candidates = [
+        PROJECT_ROOT / "model" / DEFAULT_JSON_MODEL_NAME,
+        PROJECT_ROOT.parent / "ml-service" / DEFAULT_JSON_MODEL_NAME,
+    ]
+    json_path = next((path for path in json_candidates if path.exists()), None)
+    # Precompiled arrays and UBJSON parse much faster than the JSON booster, but
+    # only stand in for it when they were compiled from that exact JSON file.
+    compiled_candidates = [
+        PROJECT_ROOT / "model" / DEFAULT_UBJ_MODEL_NAME,
+        PROJECT_ROOT.parent / "ml-service" / DEFAULT_UBJ_MODEL_NAME,
+    ]
+    if INFERENCE_ENGINE == "native":
+        compiled_candidates.insert(0, PROJECT_ROOT / "model" / DEFAULT_COMPILED_MODEL_DIR)
+    for path in compiled_candidates:
+        if not path.exists():
+            continue
+        if json_path is None or compiled_from(path, json_path):
+            return load_model_file(path), path, metadata_path
+        logger.warning(
+            "Ignoring %s: it was not compiled from the current %s; rerun compile_model.py.",
+            path,
+            json_path,
+        )
+    if json_path is None:
+        raise RuntimeError(
+            f"Model file not found at {model_path}, and JSON fallback not found. "
+            f"Set MODEL_PATH or add {DEFAULT_JSON_MODEL_NAME}."
+        )
+    return load_model_file(json_path), json_path, metadata_path
+
+
+def _build_model_version(
+    name: str,
+    model: Any,
+    metadata_path: Path,
+    source: Path,
+    fingerprint: tuple | None = None,
+) -> ModelVersion:
+    metadata = _load_metadata(metadata_path)
+    feature_columns = list(metadata["feature_columns"])
+    # The explainer keeps the original model: compiled arrays drop the node
+    # statistics TreeSHAP needs.
+    explainer = TreeExplainer(model, feature_columns, method=EXPLAIN_METHOD, source=str(source))
+    drift_reference = load_drift_reference(source)
+    if drift_reference is not None and drift_reference.columns != feature_columns + [RISK_COLUMN]:
+        raise ValueError(f"Drift reference next to {source} was built for other feature columns.")
+    if INFERENCE_ENGINE == "native":
+        model = _compile_native_model(model)
+    return ModelVersion(
+        name=name,
+        model=model,
+        threshold=float(metadata["threshold"]),
+        feature_columns=feature_columns,
+        source=str(source),
+        explainer=explainer,
+        drift_reference=drift_reference,
+        fingerprint=fingerprint,
+    )
+
+
+def _warm_up(version: ModelVersion) -> None:
+    # Score synthetic rows so the first real request does not pay for lazy
+    # initialization, and refuse versions that cannot produce probabilities.
+    rng = np.random.default_rng(0)
+    rows = rng.uniform(0.0, 1.0, size=(MODEL_WARMUP_ROWS, len(version.feature_columns)))
+    probabilities = _predict_risk_probabilities(version.model, rows, version.feature_columns)
+    if probabilities.shape != (MODEL_WARMUP_ROWS,) or not np.all(
+        np.isfinite(probabilities) & (probabilities >= 0) & (probabilities <= 1)
+    ):
+        raise ValueError(f"Model version {version.name!r} failed warm-up scoring.")
+    if EXPLAIN_PRELOAD:
+        version.explainer.contributions(np.zeros((1, len(version.feature_columns))))
+
+
+def _load_registry_version(name: str) -> ModelVersion:
+    if not MODEL_REGISTRY_DIR:
+        raise KeyError(name)
+    paths = discover_versions(Path(MODEL_REGISTRY_DIR)).get(name)
+    if paths is None:
+        raise KeyError(name)
+    model_path, metadata_path = paths
+    # Taken before loading, so a file replaced mid-load is picked up on the next stage.
+    fingerprint = version_fingerprint(metadata_path.parent)
+    version = _build_model_version(
+        name, load_model_file(model_path), metadata_path, model_path, fingerprint
+    )
+    _warm_up(version)
+    return version
+
+
+def _registry_version_changed(version: ModelVersion) -> bool:
+    if not MODEL_REGISTRY_DIR or version.fingerprint is None:
+        return False
+    version_dir = Path(MODEL_REGISTRY_DIR) / version.name
+    return not version_dir.is_dir() or version_fingerprint(version_dir) != version.fingerprint
+
+
+def _load_initial_version() -> ModelVersion:
+    active_name = read_active_pointer(Path(MODEL_REGISTRY_DIR)) if MODEL_REGISTRY_DIR else None
+    if active_name is not None:
+        return _load_registry_version(active_name)
+    model, model_path, metadata_path = _load_default_model()
+    version = _build_model_version(MODEL_VERSION, model, metadata_path, model_path)
+    _warm_up(version)
+    return version
+
+
+def preload(load_model: bool = True) -> None:
+    """Prepare the schema and load the serving model before worker processes fork.
+
+    Forked workers reuse the loaded model through copy-on-write pages (or the
+    shared page cache for memory-mapped compiled arrays) and skip schema setup.
+    """
+    if DB_AUTO_CREATE_SCHEMA:
+        prepare_database(
+            engine,
+            rebuild_counters=STATS_REBUILD_ON_STARTUP,
+            rollup_retention=ROLLUP_RETENTION,
+        )
+    # Pooled connections must not be shared across fork.
+    engine.dispose()
+    _preloaded["schema_ready"] = True
+    if load_model:
+        _preloaded["version"] = _load_initial_version()
+
+
+def _stage_version(name: str) -> ModelVersion:
+    registry: ModelRegistry = app.state.registry
+    with _model_swap_lock:
+        version = registry.get(name)
+        if version is None or _registry_version_changed(version):
+            version = _load_registry_version(name)
+            registry.register(version)
+        return version
+
+
+def _unload_version(name: str) -> ModelVersion:
+    with _model_swap_lock:
+        return app.state.registry.remove(name)
+
+
+def _activate_version(name: str) -> ModelVersion:
+    _stage_version(name)
+    with _model_swap_lock:
+        return app.state.registry.activate(name)
+
+
+def _watch_active_pointer(stop_event: threading.Event) -> None:
+    registry_dir = Path(MODEL_REGISTRY_DIR or "")
+    while not stop_event.wait(MODEL_REGISTRY_WATCH_SECONDS):
+        name = read_active_pointer(registry_dir)
+        active = app.state.registry.active
+        if name is None or (name == active.name and not _registry_version_changed(active)):
+            continue
+        try:
+            _activate_version(name)
+            logger.info("Activated model version %s from %s", name, registry_dir)
+        except Exception:
+            logger.exception("Could not activate model version %s", name)
+
+
+def _compact_rollups(stop_event: threading.Event) -> None:
+    while not stop_event.wait(ROLLUP_COMPACT_SECONDS):
+        try:
+            with SessionLocal() as db:
+                removed = crud.compact_decision_rollups(db, ROLLUP_RETENTION)
+            if any(removed.values()):
+                logger.info("Compacted decision rollups: %s", removed)
+        except Exception:
+            logger.exception("Decision rollup compaction failed")
+
+
+def _maintain_partitions(stop_event: threading.Event) -> None:
+    archive_dir = Path(TRANSACTION_ARCHIVE_DIR) if TRANSACTION_ARCHIVE_DIR else None
+    while not stop_event.wait(PARTITION_MAINTENANCE_SECONDS):
+        try:
+            report = maintain_partitions(engine, TRANSACTION_RETENTION_MONTHS, archive_dir)
+            if report["created"] or report["archived"]:
+                logger.info("Partition maintenance: %s", report)
+        except Exception:
+            logger.exception("Partition maintenance failed")
+
+
+def _build_feature_matrix(
+    payloads: list[PredictRequest],
+    feature_columns: list[str],
+) -> np.ndarray:
+    known_columns = PredictRequest.model_fields
+    missing_columns = [column for column in feature_columns if column not in known_columns]
+    if missing_columns:
+        raise HTTPException(status_code=500, detail=f"Missing feature columns: {missing_columns}")
+    return np.array(
+        [[getattr(payload, column) for column in feature_columns] for payload in payloads],
+        dtype=float,
+    )
+
+
+def _score_version_rows(version: ModelVersion, rows: np.ndarray) -> np.ndarray:
+    with _stage("model"):
+        return _predict_risk_probabilities(version.model, rows, version.feature_columns)
+
+
+def _score_matrix(version: ModelVersion, rows: np.ndarray) -> np.ndarray:
+    batcher = app.state.micro_batcher
+    if batcher is None:
+        return _score_version_rows(version, rows)
+    return batcher.submit(version, rows)
+
+
+def _score_payloads(
+    version: ModelVersion,
+    payloads: list[PredictRequest],
+    observe: bool = True,
+) -> tuple[list[float], list[bool]]:
+    # Explanations re-score rows that were decided before; only decisions count as
+    # scored rows and feed the drift monitor.
+    if observe:
+        _worker_counters.add_scored(len(payloads))
+    feature_columns = version.feature_columns
+    cache = app.state.score_cache
+    if cache is None:
+        with _stage("features"):
+            ordered_rows = _build_feature_matrix(payloads, feature_columns)
+        probabilities = _score_matrix(version, ordered_rows).tolist()
+        if observe:
+            _observe_drift(version, payloads, probabilities, ordered_rows)
+        return probabilities, [False] * len(payloads)
+
+    # Any change of model version or threshold starts a fresh cache generation.
+    generation = (version.name, id(version.model), version.threshold)
+    keys = [
+        cache.make_key([getattr(payload, column, None) for column in feature_columns])
+        for payload in payloads
+    ]
+
+    probabilities: list[float | None] = [cache.get(key, generation) for key in keys]
+    cache_hits = [probability is not None for probability in probabilities]
+    missing = [index for index, hit in enumerate(cache_hits) if not hit]
+    if missing:
+        missing_payloads = [payloads[index] for index in missing]
+        with _stage("features"):
+            ordered_rows = _build_feature_matrix(missing_payloads, feature_columns)
+        scored = _score_matrix(version, ordered_rows).tolist()
+        for index, probability in zip(missing, scored):
+            probabilities[index] = probability
+            cache.put(keys[index], probability, generation)
+    if observe:
+        _observe_drift(version, payloads, probabilities)
+    return probabilities, cache_hits
+
+
+def _observe_drift(
+    version: ModelVersion,
+    payloads: list[PredictRequest],
+    probabilities: list[float],
+    rows: np.ndarray | None = None,
+) -> None:
+    monitor = app.state.drift_monitor
+    if monitor is None:
+        return
+    if rows is None:
+        rows = _build_feature_matrix(payloads, version.feature_columns)
+    monitor.observe(version, rows, probabilities)
+
+
+def _explain_payloads(
+    version: ModelVersion,
+    payloads: list[PredictRequest],
+    top_k: int | None,
+) -> list[Explanation]:
+    with _stage("explain"):
+        rows = _build_feature_matrix(payloads, version.feature_columns)
+        # Resolving the booster is a one-off load, so keep it out of the latency window.
+        if version.explainer.booster is None:
+            if version.explainer.compiled:
+                raise HTTPException(
+                    status_code=409,
+                    detail=(
+                        f"Model version {version.name!r} has no booster matching its compiled "
+                        "arrays; rerun compile_model.py."
+                    ),
+                )
+            raise HTTPException(
+                status_code=501,
+                detail=f"Model version {version.name!r} does not support explanations.",
+            )
+        started = time.perf_counter()
+        contributions, base_values = version.explainer.contributions(rows)
+        order, other = rank_contributions(contributions, top_k)
+        app.state.explain_latency.observe((time.perf_counter() - started) * 1000)
+
+        feature_columns = version.feature_columns
+        return [
+            Explanation(
+                base_value=round(float(base_values[row]), 6),
+                contributions=[
+                    FeatureContribution(
+                        feature=feature_columns[column],
+                        value=float(rows[row, column]),
+                        contribution=round(float(contributions[row, column]), 6),
+                    )
+                    for column in order[row]
+                ],
+                other=round(float(other[row]), 6),
+            )
+            for row in range(len(payloads))
         ]
-        json_model_path = next((path for path in json_candidates if path.exists()), None)
-        if json_model_path is None:
+
+
+def _decide(version: ModelVersion, risk_probability: float) -> str:
+    return "Decline" if risk_probability >= version.threshold else "Approve"
+
+
+def _log_decisions(db: Session, rows: list[dict]) -> None:
+    writer = app.state.decision_log
+    if writer is None:
+        try:
+            with _stage("db_write"):
+                crud.create_transactions(db=db, rows=rows)
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=f"Decision logging failed: {exc}") from exc
+        _count_logged_decisions(rows)
+        return
+    _submit_decisions(writer, rows)
+
+
+def _submit_decisions(writer: DecisionLogWriter, rows: list[dict]) -> None:
+    try:
+        with _stage("decision_log_enqueue"):
+            writer.submit_many(rows, wait=DECISION_LOG_MODE == "group_commit")
+    except (DecisionLogFull, DecisionLogTimeout) as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"}) from exc
+    except DecisionLogFailed as exc:
+        raise HTTPException(status_code=500, detail=f"Decision logging failed: {exc}") from exc
+    _count_logged_decisions(rows)
+
+
+def _stage_seconds(stage: str) -> Any:
+    return _metrics.histogram(
+        "stage_duration_seconds", "Time spent in each request stage.", stage=stage
+    )
+
+
+def _stage(name: str) -> Any:
+    """Context manager timing one request stage; a no-op with metrics off."""
+    if _metrics is None:
+        return _UNTIMED
+    meters = _stage_meters.get(name)
+    if meters is None:
+        meters = _stage_meters.setdefault(
+            name,
+            (
+                _stage_seconds(name),
+                _metrics.counter("stage_errors_total", "Stages that raised.", stage=name),
+            ),
+        )
+    return timed(*meters)
+
+
+def _observe_validation() -> None:
+    if _metrics is not None:
+        observe_since_request_start(_stage_seconds("validation"))
+
+
+def _count_logged_decisions(rows: list[dict]) -> None:
+    if _metrics is None or not rows:
+        return
+    approvals = sum(row["decision"] == "Approve" for row in rows)
+    for decision, count in (("Approve", approvals), ("Decline", len(rows) - approvals)):
+        if count:
+            _metrics.counter(
+                "decisions_total", "Logged decisions by decision.", decision=decision
+            ).inc(count)
+
+
+def _format_validation_errors(exc: ValidationError) -> list[str]:
+    messages = []
+    for error in exc.errors():
+        location = ".".join(str(part) for part in error["loc"])
+        messages.append(f"{location}: {error['msg']}" if location else error["msg"])
+    return messages
+
+
+def _worker_snapshot() -> dict:
+    components = {}
+    for name in (
+        "decision_log",
+        "score_cache",
+        "micro_batcher",
+        "inference_executor",
+        "feature_engine",
+        "drift_monitor",
+        "ml_connector",
+    ):
+        component = getattr(app.state, name, None)
+        if component is not None:
+            components[name] = component.snapshot()
+    snapshot = {
+        "pid": os.getpid(),
+        "started_at": app.state.started_at.isoformat(),
+        "model_version": app.state.registry.active.name,
+        "scored_rows": _worker_counters.scored_rows,
+        "memory": memory_usage(),
+        "components": components,
+    }
+    if _metrics is not None:
+        snapshot["metrics"] = _metrics.snapshot()
+    return snapshot
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    app.state.started_at = datetime.now(timezone.utc)
+    if DB_AUTO_CREATE_SCHEMA and not _preloaded.get("schema_ready"):
+        prepare_database(
+            engine,
+            rebuild_counters=STATS_REBUILD_ON_STARTUP,
+            rollup_retention=ROLLUP_RETENTION,
+        )
+
+    app.state.registry = ModelRegistry()
+    version = _preloaded.get("version") or _load_initial_version()
+    app.state.registry.register(version, activate=True)
+
+    watcher_stop = threading.Event()
+    if MODEL_REGISTRY_DIR and MODEL_REGISTRY_WATCH_SECONDS > 0:
+        threading.Thread(
+            target=_watch_active_pointer,
+            args=(watcher_stop,),
+            name="model-registry-watcher",
+            daemon=True,
+        ).start()
+    if engine.dialect.name == "postgresql" and PARTITION_MAINTENANCE_SECONDS > 0:
+        if TRANSACTION_RETENTION_MONTHS > 0 and not TRANSACTION_ARCHIVE_DIR:
             raise RuntimeError(
-                f"Model file not found at {model_path}, and JSON fallback not found. "
-                f"Set MODEL_PATH or add {DEFAULT_JSON_MODEL_NAME}."
+                "TRANSACTION_RETENTION_MONTHS drops partitions only after archiving them; "
+                "set TRANSACTION_ARCHIVE_DIR."
             )
-        booster = xgb.Booster()
-        booster.load_model(str(json_model_path))
-        model = booster
+        threading.Thread(
+            target=_maintain_partitions,
+            args=(watcher_stop,),
+            name="partition-maintenance",
+            daemon=True,
+        ).start()
+    if ROLLUP_COMPACT_SECONDS > 0:
+        threading.Thread(
+            target=_compact_rollups,
+            args=(watcher_stop,),
+            name="rollup-compactor",
+            daemon=True,
+        ).start()
+
+    app.state.explain_latency = LatencyWindow(EXPLAIN_LATENCY_WINDOW)
+
+    app.state.micro_batcher = None
+    if MICRO_BATCH_MAX_ROWS > 0:
+        app.state.micro_batcher = MicroBatcher(
+            score_fn=_score_version_rows,
+            max_batch_size=MICRO_BATCH_MAX_ROWS,
+            max_wait=MICRO_BATCH_MAX_WAIT_MS / 1000,
+        )
+        app.state.micro_batcher.start()
 
-    app.state.model = model
-    app.state.threshold = float(metadata["threshold"])
-    app.state.feature_columns = list(metadata["feature_columns"])
+    app.state.score_cache = None
+    if SCORE_CACHE_SIZE > 0:
+        app.state.score_cache = ScoreCache(
+            max_entries=SCORE_CACHE_SIZE,
+            ttl_seconds=SCORE_CACHE_TTL_SECONDS,
+            decimals=int(SCORE_CACHE_DECIMALS) if SCORE_CACHE_DECIMALS else None,
+        )
+
+    app.state.feature_engine = None
+    if FEATURE_ENGINE_MAX_BUYERS > 0:
+        app.state.feature_engine = FeatureEngine(max_buyers=FEATURE_ENGINE_MAX_BUYERS)
+
+    app.state.drift_monitor = None
+    if DRIFT_MONITOR_ENABLED:
+        app.state.drift_monitor = DriftMonitor(
+            bucket_seconds=DRIFT_BUCKET_SECONDS,
+            buckets=DRIFT_WINDOW_BUCKETS,
+            reference_rows=DRIFT_REFERENCE_ROWS,
+            min_rows=DRIFT_MIN_ROWS,
+        )
+
+    app.state.decision_log = None
+    if DECISION_LOG_MODE in ("write_behind", "group_commit"):
+        flush_ms = float(os.getenv("DECISION_LOG_FLUSH_MS", "50"))
+        app.state.decision_log = DecisionLogWriter(
+            session_factory=SessionLocal,
+            capacity=int(os.getenv("DECISION_LOG_QUEUE_SIZE", "10000")),
+            batch_size=int(os.getenv("DECISION_LOG_BATCH_SIZE", "500")),
+            # A group commit writes as soon as the flusher is free.
+            flush_interval=flush_ms / 1000 if DECISION_LOG_MODE == "write_behind" else 0.0,
+            enqueue_timeout=float(os.getenv("DECISION_LOG_ENQUEUE_TIMEOUT_MS", "100")) / 1000,
+            commit_timeout=float(os.getenv("DECISION_LOG_COMMIT_TIMEOUT_MS", "5000")) / 1000,
+            on_flush=_stage_seconds("db_flush").observe if _metrics is not None else None,
+        )
+        app.state.decision_log.start()
+
+    app.state.inference_executor = None
+    if REQUEST_MODE == "async":
+        app.state.inference_executor = InferenceExecutor(
+            max_workers=INFERENCE_WORKERS,
+            max_pending=INFERENCE_MAX_PENDING,
+            queue_timeout=INFERENCE_QUEUE_TIMEOUT_MS / 1000,
+        )
+        get_async_engine()
+
+    app.state.ml_connector = None
+    if ML_SERVICE_ENABLED:
+        from models.ml_connector import ml_connector
 
-    yield
+        await ml_connector.start()
+        app.state.ml_connector = ml_connector
+
+    app.state.worker_metrics = None
+    if WORKER_METRICS_DIR:
+        app.state.worker_metrics = WorkerMetricsPublisher(
+            Path(WORKER_METRICS_DIR),
+            snapshot_fn=_worker_snapshot,
+            interval=WORKER_METRICS_INTERVAL_SECONDS,
+        )
+        app.state.worker_metrics.start()
+
+    app.state.ready = True
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        watcher_stop.set()
+        if app.state.worker_metrics is not None:
+            app.state.worker_metrics.stop()
+        if app.state.inference_executor is not None:
+            app.state.inference_executor.shutdown()
+            await dispose_async_engine()
+        if app.state.micro_batcher is not None:
+            app.state.micro_batcher.stop()
+        if app.state.decision_log is not None:
+            app.state.decision_log.stop()
+        if app.state.ml_connector is not None:
+            await app.state.ml_connector.aclose()
 
 
 app = FastAPI(
@@ -133,7 +850,8 @@ def root() -> HealthResponse:
     return HealthResponse(
         status="ok",
         model_loaded=True,
-        threshold=app.state.threshold,
+        threshold=app.state.registry.active.threshold,
+        model_version=app.state.registry.active.name,
     )
 
 
@@ -142,71 +860,715 @@ def health() -> HealthResponse:
     return HealthResponse(
         status="ok",
         model_loaded=True,
-        threshold=app.state.threshold,
+        threshold=app.state.registry.active.threshold,
+        model_version=app.state.registry.active.name,
     )
 
 
-@app.post("/predict", response_model=PredictResponse)
-def predict(payload: PredictRequest, db: Session = Depends(get_db)) -> PredictResponse:
+@app.get("/ready", response_model=ReadinessResponse, responses={503: {"model": ReadinessResponse}})
+def ready(db: Session = Depends(get_db)) -> Any:
     try:
-        input_row = pd.DataFrame(
-            [
-                {
-                    "avg_monthly_inflow": payload.avg_monthly_inflow,
-                    "inflow_volatility": payload.inflow_volatility,
-                    "avg_monthly_outflow": payload.avg_monthly_outflow,
-                    "min_balance_30d": payload.min_balance_30d,
-                    "neg_balance_days_30d": payload.neg_balance_days_30d,
-                    "purchase_to_inflow_ratio": payload.purchase_to_inflow_ratio,
-                    "total_burden_ratio": payload.total_burden_ratio,
-                    "buffer_ratio": payload.buffer_ratio,
-                    "stress_index": payload.stress_index,
-                }
-            ]
-        )
+        # Touch the decision tables too, so a missing schema reports not_ready.
+        db.execute(text("SELECT 1 FROM transactions LIMIT 1"))
+        db.execute(text("SELECT 1 FROM decision_counters LIMIT 1"))
+        database_ok = True
+    except Exception:
+        database_ok = False
 
-        feature_columns = app.state.feature_columns
-        missing_columns = [column for column in feature_columns if column not in input_row.columns]
-        if missing_columns:
-            raise HTTPException(status_code=500, detail=f"Missing feature columns: {missing_columns}")
+    registry: ModelRegistry | None = getattr(app.state, "registry", None)
+    model_version = registry.active.name if registry is not None else None
+    started = bool(getattr(app.state, "ready", False))
+    is_ready = started and database_ok and model_version is not None
+    readiness = ReadinessResponse(
+        status="ready" if is_ready else "not_ready",
+        model_version=model_version,
+        database=database_ok,
+    )
+    if not is_ready:
+        return JSONResponse(status_code=503, content=readiness.model_dump())
+    return readiness
 
-        ordered_row = input_row[feature_columns]
-        risk_probability = _predict_risk_probability(app.state.model, ordered_row)
-        decision = "Decline" if risk_probability >= app.state.threshold else "Approve"
 
-        crud.create_transaction(
-            db=db,
-            payload=payload,
-            risk_probability=risk_probability,
-            decision=decision,
-        )
+def _predict_one(
+    payload: PredictRequest,
+    explain: bool,
+    top_k: int | None,
+) -> tuple[PredictResponse, list[dict]]:
+    try:
+        version = app.state.registry.active
+        (risk_probability,), (cache_hit,) = _score_payloads(version, [payload])
+        decision = _decide(version, risk_probability)
+        explanation = _explain_payloads(version, [payload], top_k)[0] if explain else None
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {exc}") from exc
 
-        return PredictResponse(
-            risk_probability=round(risk_probability, 6),
-            decision=decision,
+    log_rows = []
+    if SCORE_CACHE_LOG_HITS or not cache_hit:
+        log_rows.append(crud.transaction_values(payload, risk_probability, decision, version.name))
+    result = PredictResponse(
+        risk_probability=round(risk_probability, 6),
+        decision=decision,
+        explanation=explanation,
+    )
+    return result, log_rows
+
+
+def _predict_many(
+    payload: BatchPredictRequest,
+    explain: bool,
+    top_k: int | None,
+) -> tuple[BatchPredictResponse, list[dict]]:
+    raw_rows = payload.to_rows()
+    row_limit = min(MAX_BATCH_ROWS, EXPLAIN_MAX_ROWS) if explain else MAX_BATCH_ROWS
+    if len(raw_rows) > row_limit:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(raw_rows)} rows; the limit is {row_limit}.",
         )
+
+    results = [BatchPredictItem(index=index) for index in range(len(raw_rows))]
+    valid_indices: list[int] = []
+    valid_payloads: list[PredictRequest] = []
+    for index, raw_row in enumerate(raw_rows):
+        try:
+            valid_payloads.append(PredictRequest.model_validate(raw_row))
+            valid_indices.append(index)
+        except ValidationError as exc:
+            results[index].errors = _format_validation_errors(exc)
+
+    log_rows = []
+    if valid_payloads:
+        try:
+            version = app.state.registry.active
+            risk_probabilities, cache_hits = _score_payloads(version, valid_payloads)
+            explanations = (
+                _explain_payloads(version, valid_payloads, top_k)
+                if explain
+                else [None] * len(valid_payloads)
+            )
+
+            for index, row_payload, risk_probability, cache_hit, explanation in zip(
+                valid_indices, valid_payloads, risk_probabilities, cache_hits, explanations
+            ):
+                decision = _decide(version, risk_probability)
+                results[index].risk_probability = round(risk_probability, 6)
+                results[index].decision = decision
+                results[index].explanation = explanation
+                if SCORE_CACHE_LOG_HITS or not cache_hit:
+                    log_rows.append(
+                        crud.transaction_values(
+                            row_payload, risk_probability, decision, version.name
+                        )
+                    )
+        except HTTPException:
+            raise
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=f"Batch prediction failed: {exc}") from exc
+
+    response = BatchPredictResponse(
+        total=len(raw_rows),
+        scored=len(valid_payloads),
+        failed=len(raw_rows) - len(valid_payloads),
+        results=results,
+    )
+    return response, log_rows
+
+
+@app.post("/predict", response_model=PredictResponse, response_model_exclude_none=True)
+def predict(
+    payload: PredictRequest,
+    explain: bool = Query(default=False, description="Attach per-feature risk contributions"),
+    top_k: int | None = Query(default=None, ge=1, description="Keep the k largest contributions"),
+    db: Session = Depends(get_db),
+) -> PredictResponse:
+    _observe_validation()
+    result, log_rows = _predict_one(payload, explain, top_k)
+    _log_decisions(db, log_rows)
+    return result
+
+
+@app.post("/predict/batch", response_model=BatchPredictResponse)
+def predict_batch(
+    payload: BatchPredictRequest,
+    explain: bool = Query(default=False, description="Attach per-feature risk contributions"),
+    top_k: int | None = Query(default=None, ge=1, description="Keep the k largest contributions"),
+    db: Session = Depends(get_db),
+) -> BatchPredictResponse:
+    _observe_validation()
+    result, log_rows = _predict_many(payload, explain, top_k)
+    _log_decisions(db, log_rows)
+    return result
+
+
+@app.post("/explain", response_model=ExplainResponse)
+def explain_prediction(
+    payload: PredictRequest,
+    top_k: int | None = Query(default=None, ge=1, description="Keep the k largest contributions"),
+) -> ExplainResponse:
+    try:
+        version = app.state.registry.active
+        (risk_probability,), _ = _score_payloads(version, [payload], observe=False)
+        explanation = _explain_payloads(version, [payload], top_k)[0]
     except HTTPException:
         raise
     except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {exc}") from exc
+        raise HTTPException(status_code=500, detail=f"Explanation failed: {exc}") from exc
 
+    return ExplainResponse(
+        risk_probability=round(risk_probability, 6),
+        decision=_decide(version, risk_probability),
+        model_version=version.name,
+        method=version.explainer.method,
+        explanation=explanation,
+    )
 
-@app.get("/stats", response_model=StatsResponse)
-def stats(db: Session = Depends(get_db)) -> StatsResponse:
-    return StatsResponse(**crud.get_stats(db))
 
+@app.get("/explain/stats", response_model=ExplainStatsResponse)
+def explain_stats() -> ExplainStatsResponse:
+    latency: LatencyWindow = app.state.explain_latency
+    p50, p95, p99 = latency.percentiles(50, 95, 99)
+    return ExplainStatsResponse(
+        method=EXPLAIN_METHOD,
+        explained_requests=latency.count,
+        p50_ms=round(p50, 3),
+        p95_ms=round(p95, 3),
+        p99_ms=round(p99, 3),
+        p99_budget_ms=EXPLAIN_P99_BUDGET_MS,
+        within_budget=p99 <= EXPLAIN_P99_BUDGET_MS,
+    )
 
-@app.get("/logs", response_model=LogsResponse)
-def logs(
-    page: int = Query(default=1, ge=1),
+
+def _feature_engine() -> FeatureEngine:
+    feature_engine = app.state.feature_engine
+    if feature_engine is None:
+        raise HTTPException(
+            status_code=404,
+            detail="The feature engine is disabled; set FEATURE_ENGINE_MAX_BUYERS.",
+        )
+    return feature_engine
+
+
+def _epoch_seconds(moment: datetime) -> float:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _buyer_features(
+    buyer_id: str,
+    purchase_amount: float,
+    as_of: datetime | None,
+) -> tuple[PredictRequest, int, int]:
+    feature_engine = _feature_engine()
+    as_of_seconds = _epoch_seconds(as_of) if as_of is not None else time.time()
+    try:
+        found = feature_engine.features(buyer_id, purchase_amount, as_of_seconds)
+    except FeatureUnavailable as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    if found is None:
+        raise HTTPException(status_code=404, detail=f"No transactions for buyer {buyer_id!r}.")
+    features, history_days, day = found
+    try:
+        return PredictRequest(**features, buyer_id=buyer_id), history_days, day
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=_format_validation_errors(exc)) from exc
+
+
+@app.post("/buyers/{buyer_id}/transactions", response_model=TransactionIngestResponse)
+def ingest_transactions(
+    buyer_id: str,
+    payload: TransactionIngestRequest,
+) -> TransactionIngestResponse:
+    feature_engine = _feature_engine()
+    if len(payload.transactions) > MAX_BATCH_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{len(payload.transactions)} transactions; the limit is {MAX_BATCH_ROWS}.",
+        )
+    events = [
+        BankTransactionEvent(
+            timestamp=_epoch_seconds(transaction.timestamp),
+            amount=transaction.amount,
+            balance=transaction.balance,
+            debt_repayment=transaction.debt_repayment,
+        )
+        for transaction in payload.transactions
+    ]
+    accepted, skipped = feature_engine.ingest(buyer_id, events)
+    return TransactionIngestResponse(buyer_id=buyer_id, accepted=accepted, skipped=skipped)
+
+
+@app.get("/buyers/{buyer_id}/features", response_model=BuyerFeaturesResponse)
+def buyer_features(
+    buyer_id: str,
+    purchase_amount: float = Query(..., gt=0, description="Checkout amount to assess"),
+    as_of: datetime | None = Query(default=None, description="Score as of this time; default now"),
+) -> BuyerFeaturesResponse:
+    features, history_days, day = _buyer_features(buyer_id, purchase_amount, as_of)
+    return BuyerFeaturesResponse(
+        buyer_id=buyer_id,
+        as_of=datetime.fromtimestamp(day * 86_400, tz=timezone.utc).date(),
+        history_days=history_days,
+        features=features,
+    )
+
+
+@app.post(
+    "/buyers/{buyer_id}/predict",
+    response_model=PredictResponse,
+    response_model_exclude_none=True,
+)
+def predict_buyer(
+    buyer_id: str,
+    purchase_amount: float = Query(..., gt=0, description="Checkout amount to assess"),
+    as_of: datetime | None = Query(default=None, description="Score as of this time; default now"),
+    explain: bool = Query(default=False, description="Attach per-feature risk contributions"),
+    top_k: int | None = Query(default=None, ge=1, description="Keep the k largest contributions"),
+    db: Session = Depends(get_db),
+) -> PredictResponse:
+    features, _, _ = _buyer_features(buyer_id, purchase_amount, as_of)
+    result, log_rows = _predict_one(features, explain, top_k)
+    _log_decisions(db, log_rows)
+    return result
+
+
+def _buyer_exposure(db: Session, buyer_id: str) -> Any:
+    exposure = crud.get_buyer_exposure(db, buyer_id)
+    if exposure is None:
+        raise HTTPException(status_code=404, detail=f"No decisions for buyer {buyer_id!r}.")
+    return exposure
+
+
+@app.get("/buyers/{buyer_id}/exposure", response_model=BuyerExposureResponse)
+def buyer_exposure(buyer_id: str, db: Session = Depends(get_db)) -> BuyerExposureResponse:
+    exposure = _buyer_exposure(db, buyer_id)
+    response = BuyerExposureResponse.model_validate(exposure)
+    # A lapsed exposure period is only rolled over by the buyer's next approval.
+    response.recent_approvals = crud.current_recent_approvals(exposure)
+    if not response.recent_approvals:
+        response.recent_period_start = None
+    return response
+
+
+@app.get("/buyers/{buyer_id}/history", response_model=BuyerHistoryResponse)
+def buyer_history(
+    buyer_id: str,
     limit: int = Query(default=20, ge=1, le=200),
+    after: str | None = Query(default=None, description="Cursor from a previous next_cursor"),
+    db: Session = Depends(get_db),
+) -> BuyerHistoryResponse:
+    try:
+        position = crud.decode_log_cursor(after) if after is not None else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    total = _buyer_exposure(db, buyer_id).decisions
+    items, next_cursor = crud.get_buyer_history(db, buyer_id, limit=limit, after=position)
+    return BuyerHistoryResponse(
+        buyer_id=buyer_id,
+        limit=limit,
+        total=total,
+        items=items,
+        next_cursor=next_cursor,
+    )
+
+
+@app.get("/feature-engine/stats", response_model=FeatureEngineStatsResponse)
+def feature_engine_stats() -> FeatureEngineStatsResponse:
+    feature_engine = app.state.feature_engine
+    if feature_engine is None:
+        return FeatureEngineStatsResponse(enabled=False)
+    return FeatureEngineStatsResponse(**feature_engine.snapshot())
+
+
+def _stats_response(request: Request, response: Response, counts: dict[str, int]) -> Any:
+    etag = '"{total}-{approvals}-{low_risk}-{medium_risk}-{high_risk}"'.format(**counts)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return StatsResponse(**crud.stats_from_counts(counts))
+
+
+@app.get("/stats", response_model=StatsResponse, responses={304: {"description": "Not Modified"}})
+def stats(request: Request, response: Response, db: Session = Depends(get_db)) -> Any:
+    return _stats_response(request, response, crud.get_decision_counts(db))
+
+
+@app.get("/stats/fairness", response_model=FairnessMetrics)
+def fairness_stats(
+    days: int = Query(default=30, ge=1, le=3660, description="UTC days to cover, today included"),
+    min_group_decisions: int = Query(
+        default=MIN_GROUP_DECISIONS, ge=1, description="Smallest group compared for parity"
+    ),
     db: Session = Depends(get_db),
+) -> FairnessMetrics:
+    now = datetime.now(timezone.utc)
+    start = now.date() - timedelta(days=days - 1)
+    groups = crud.get_income_group_totals(db, start)
+    return FairnessMetrics(**fairness_metrics(groups, min_group_decisions), timestamp=now)
+
+
+@app.get("/stats/timeseries", response_model=TimeseriesResponse)
+def stats_timeseries(
+    start: datetime | None = Query(
+        default=None, alias="from", description="First bucket to cover; naive times are UTC"
+    ),
+    end: datetime | None = Query(
+        default=None, alias="to", description="End of the range (exclusive); default now"
+    ),
+    granularity: Literal["minute", "hour", "day"] = Query(default="hour"),
+    db: Session = Depends(get_db),
+) -> TimeseriesResponse:
+    now = datetime.now(timezone.utc)
+    end = as_utc(end) if end is not None else now
+    step = GRANULARITIES[granularity]
+    if start is None:
+        start = bucket_floor(end, granularity) - step * (DEFAULT_BUCKETS[granularity] - 1)
+    start = as_utc(start)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'.")
+
+    # Buckets before the retained range hold no data at this granularity; leave them out.
+    retained_from = ROLLUP_RETENTION.cutoffs(now)[granularity]
+    first = max(start, retained_from) if retained_from is not None else start
+    bucket_count = max(0, -(-(end - bucket_floor(first, granularity)) // step))
+    if bucket_count > TIMESERIES_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Range covers {bucket_count} {granularity} buckets; the limit is "
+                f"{TIMESERIES_MAX_BUCKETS}. Narrow it or use a coarser granularity."
+            ),
+        )
+    totals = crud.get_rollup_totals(db, granularity, first, end) if first < end else {}
+    return TimeseriesResponse(
+        granularity=granularity,
+        start=start,
+        end=end,
+        retained_from=retained_from,
+        buckets=timeseries_buckets(totals, first, end, granularity),
+    )
+
+
+@app.get("/drift", response_model=DriftResponse)
+def drift(
+    window_seconds: float | None = Query(
+        default=None, gt=0, description="Trailing window to compare; default the whole ring"
+    ),
+) -> DriftResponse:
+    monitor = app.state.drift_monitor
+    if monitor is None:
+        return DriftResponse(enabled=False, timestamp=datetime.now(timezone.utc))
+    report = monitor.report(window_seconds)
+    now = datetime.now(timezone.utc)
+    reports = [DriftReport(**item, timestamp=now) for item in report.pop("reports")]
+    return DriftResponse(**report, reports=reports, timestamp=now)
+
+
+def _logs_response(
+    db: Session,
+    page: int,
+    limit: int,
+    after: str | None,
+    cursor: bool,
+    exact_total: bool,
 ) -> LogsResponse:
-    items, total, total_pages = crud.get_logs(db=db, page=page, limit=limit)
+    if after is None and not cursor:
+        items, total, total_pages = crud.get_logs(
+            db=db, page=page, limit=limit, exact_total=exact_total
+        )
+        return LogsResponse(
+            page=page,
+            limit=limit,
+            total=total,
+            total_pages=total_pages,
+            items=items,
+        )
+
+    try:
+        position = crud.decode_log_cursor(after) if after is not None else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    items, next_cursor = crud.get_logs_after(db=db, limit=limit, after=position)
+    total = crud.count_transactions(db, exact=exact_total)
     return LogsResponse(
         page=page,
         limit=limit,
         total=total,
-        total_pages=total_pages,
+        total_pages=crud.page_count(total, limit),
         items=items,
+        next_cursor=next_cursor,
     )
+
+
+@app.get("/logs", response_model=LogsResponse)
+def logs(
+    page: int = Query(default=1, ge=1),
+    limit: int = Query(default=20, ge=1, le=200),
+    after: str | None = Query(default=None, description="Cursor from a previous next_cursor"),
+    cursor: bool = Query(default=False, description="Start keyset pagination from the newest row"),
+    exact_total: bool = Query(
+        default=False, description="Count rows instead of using the cached total"
+    ),
+    db: Session = Depends(get_db),
+) -> LogsResponse:
+    return _logs_response(db, page, limit, after, cursor, exact_total)
+
+
+@app.get("/logs/export", response_class=StreamingResponse)
+def export_logs(
+    format: Literal["ndjson", "csv", "parquet"] = Query(default="ndjson"),
+    start: datetime | None = Query(default=None, description="Inclusive lower bound on created_at"),
+    end: datetime | None = Query(default=None, description="Exclusive upper bound on created_at"),
+    decision: Literal["Approve", "Decline"] | None = Query(default=None),
+) -> StreamingResponse:
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as exc:
+            raise HTTPException(status_code=400, detail="Parquet export requires pyarrow.") from exc
+
+    # The stream outlives this handler, so it opens its own session instead of using get_db.
+    chunks = iter_transaction_chunks(
+        SessionLocal,
+        start=as_utc(start) if start is not None else None,
+        end=as_utc(end) if end is not None else None,
+        decision=decision,
+        chunk_size=EXPORT_CHUNK_SIZE,
+    )
+    return StreamingResponse(
+        EXPORT_WRITERS[format](chunks),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'},
+    )
+
+
+@app.get("/decision-log/stats", response_model=DecisionLogStatsResponse)
+def decision_log_stats() -> DecisionLogStatsResponse:
+    writer = app.state.decision_log
+    if writer is None:
+        return DecisionLogStatsResponse(enabled=False)
+    return DecisionLogStatsResponse(**writer.snapshot())
+
+
+@app.get("/score-cache/stats", response_model=ScoreCacheStatsResponse)
+def score_cache_stats() -> ScoreCacheStatsResponse:
+    cache = app.state.score_cache
+    if cache is None:
+        return ScoreCacheStatsResponse(enabled=False)
+    return ScoreCacheStatsResponse(**cache.snapshot())
+
+
+@app.get("/micro-batcher/stats", response_model=MicroBatcherStatsResponse)
+def micro_batcher_stats() -> MicroBatcherStatsResponse:
+    batcher = app.state.micro_batcher
+    if batcher is None:
+        return MicroBatcherStatsResponse(enabled=False)
+    return MicroBatcherStatsResponse(**batcher.snapshot())
+
+
+@app.get("/ml-service/stats", response_model=MLServiceStatsResponse)
+def ml_service_stats() -> MLServiceStatsResponse:
+    connector = app.state.ml_connector
+    if connector is None:
+        return MLServiceStatsResponse(enabled=False)
+    return MLServiceStatsResponse(**connector.snapshot())
+
+
+@app.get("/workers", response_model=WorkersResponse)
+def workers() -> WorkersResponse:
+    local = _worker_snapshot()
+    snapshots = read_worker_snapshots(Path(WORKER_METRICS_DIR)) if WORKER_METRICS_DIR else []
+    # The answering worker reports live numbers instead of its last published file.
+    snapshots = [local] + [snapshot for snapshot in snapshots if snapshot["pid"] != local["pid"]]
+    snapshots.sort(key=lambda snapshot: snapshot["pid"])
+    memory_totals = {
+        key: round(sum(snapshot["memory"].get(key, 0.0) for snapshot in snapshots), 1)
+        for key in ("rss_mb", "pss_mb", "private_mb")
+    }
+    return WorkersResponse(
+        workers=len(snapshots),
+        scored_rows=sum(snapshot["scored_rows"] for snapshot in snapshots),
+        memory=memory_totals,
+        items=[WorkerStats(**snapshot) for snapshot in snapshots],
+    )
+
+
+def _require_admin(x_admin_token: str | None = Header(default=None)) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN."
+        )
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
+
+
+def _version_info(version: ModelVersion) -> ModelVersionInfo:
+    return ModelVersionInfo(
+        name=version.name,
+        threshold=version.threshold,
+        feature_columns=version.feature_columns,
+        source=version.source,
+        loaded_at=version.loaded_at,
+        active=version.name == app.state.registry.active.name,
+    )
+
+
+@app.get("/models", response_model=ModelVersionsResponse)
+def list_models() -> ModelVersionsResponse:
+    registry: ModelRegistry = app.state.registry
+    available = sorted(discover_versions(Path(MODEL_REGISTRY_DIR))) if MODEL_REGISTRY_DIR else []
+    return ModelVersionsResponse(
+        active=registry.active.name,
+        loaded=[_version_info(version) for version in registry.versions()],
+        available=available,
+    )
+
+
+@app.post(
+    "/models/{name}/load",
+    response_model=ModelVersionInfo,
+    dependencies=[Depends(_require_admin)],
+)
+def load_model_version(name: str) -> ModelVersionInfo:
+    try:
+        return _version_info(_stage_version(name))
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {name}") from exc
+    except Exception as exc:
+        raise HTTPException(status_code=422, detail=f"Could not load {name}: {exc}") from exc
+
+
+@app.post(
+    "/models/{name}/activate",
+    response_model=ModelVersionInfo,
+    dependencies=[Depends(_require_admin)],
+)
+def activate_model_version(name: str) -> ModelVersionInfo:
+    try:
+        return _version_info(_activate_version(name))
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {name}") from exc
+    except Exception as exc:
+        raise HTTPException(status_code=422, detail=f"Could not activate {name}: {exc}") from exc
+
+
+@app.delete(
+    "/models/{name}",
+    response_model=ModelVersionInfo,
+    dependencies=[Depends(_require_admin)],
+)
+def unload_model_version(name: str) -> ModelVersionInfo:
+    try:
+        return _version_info(_unload_version(name))
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"Model version not loaded: {name}") from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+
+async_router = APIRouter()
+
+
+async def _run_inference(function: Any, *args: Any) -> Any:
+    try:
+        return await app.state.inference_executor.run(function, *args)
+    except InferenceBusy as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"}) from exc
+
+
+async def _log_decisions_async(db: Any, rows: list[dict]) -> None:
+    if not rows:
+        return
+    writer = app.state.decision_log
+    if writer is None:
+        await db.run_sync(_log_decisions, rows)
+        return
+    # submit_many blocks briefly under backpressure, so keep it off the event loop.
+    await run_in_threadpool(_submit_decisions, writer, rows)
+
+
+@async_router.post("/predict", response_model=PredictResponse, response_model_exclude_none=True)
+async def predict_async(
+    payload: PredictRequest,
+    explain: bool = Query(default=False, description="Attach per-feature risk contributions"),
+    top_k: int | None = Query(default=None, ge=1, description="Keep the k largest contributions"),
+    db: Any = Depends(get_async_db),
+) -> PredictResponse:
+    _observe_validation()
+    result, log_rows = await _run_inference(_predict_one, payload, explain, top_k)
+    await _log_decisions_async(db, log_rows)
+    return result
+
+
+@async_router.post("/predict/batch", response_model=BatchPredictResponse)
+async def predict_batch_async(
+    payload: BatchPredictRequest,
+    explain: bool = Query(default=False, description="Attach per-feature risk contributions"),
+    top_k: int | None = Query(default=None, ge=1, description="Keep the k largest contributions"),
+    db: Any = Depends(get_async_db),
+) -> BatchPredictResponse:
+    _observe_validation()
+    result, log_rows = await _run_inference(_predict_many, payload, explain, top_k)
+    await _log_decisions_async(db, log_rows)
+    return result
+
+
+@async_router.get(
+    "/stats", response_model=StatsResponse, responses={304: {"description": "Not Modified"}}
+)
+async def stats_async(request: Request, response: Response, db: Any = Depends(get_async_db)) -> Any:
+    counts = await db.run_sync(crud.get_decision_counts)
+    return _stats_response(request, response, counts)
+
+
+@async_router.get("/logs", response_model=LogsResponse)
+async def logs_async(
+    page: int = Query(default=1, ge=1),
+    limit: int = Query(default=20, ge=1, le=200),
+    after: str | None = Query(default=None, description="Cursor from a previous next_cursor"),
+    cursor: bool = Query(default=False, description="Start keyset pagination from the newest row"),
+    exact_total: bool = Query(
+        default=False, description="Count rows instead of using the cached total"
+    ),
+    db: Any = Depends(get_async_db),
+) -> LogsResponse:
+    return await db.run_sync(_logs_response, page, limit, after, cursor, exact_total)
+
+
+if REQUEST_MODE == "async":
+    # The async handlers take over the hot paths; every other route stays on the threadpool.
+    _async_endpoints = {
+        (route.path, method) for route in async_router.routes for method in route.methods
+    }
+    app.router.routes = [
+        route
+        for route in app.router.routes
+        if not isinstance(route, APIRoute)
+        or not any((route.path, method) in _async_endpoints for method in route.methods)
+    ]
+    app.include_router(async_router)
+
+
+if METRICS_ENABLED:
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def metrics() -> PlainTextResponse:
+        local = _metrics.snapshot()
+        snapshots = [local]
+        if WORKER_METRICS_DIR:
+            # Other workers' numbers are as fresh as their last published snapshot.
+            snapshots += [
+                snapshot["metrics"]
+                for snapshot in read_worker_snapshots(Path(WORKER_METRICS_DIR))
+                if snapshot["pid"] != os.getpid() and "metrics" in snapshot
+            ]
+        return PlainTextResponse(
+            render_prometheus(snapshots), media_type="text/plain; version=0.0.4"
+        )
+
+    app.add_middleware(RequestMetricsMiddleware, registry=_metrics)
@@ -0,0 +1,236 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable
+
+STAGE_SECONDS_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+
+# Set by RequestMetricsMiddleware when a request arrives.
+request_started: ContextVar[float | None] = ContextVar("request_started", default=None)
+
+
+class Histogram:
+    """Fixed-bucket histogram with cumulative ``le`` counts, Prometheus style."""
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect_left(self.bounds, value)] += 1
+            self.count += 1
+            self.total += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            count, total = self.count, self.total
+        buckets: dict[str, int] = {}
+        running = 0
+        for bound, bucket_count in zip(self.bounds, counts):
+            running += bucket_count
+            buckets[f"{bound:g}"] = running
+        buckets["+Inf"] = running + counts[-1]
+        return {"buckets": buckets, "count": count, "sum": round(total, 6)}
+
+
+class Counter:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class MetricsRegistry:
+    """Named counters and histograms with labels, exportable as a JSON-safe snapshot.
+
+    Snapshots from several workers can be merged and rendered in the Prometheus
+    text format by ``render_prometheus``.
+    """
+
+    def __init__(self, prefix: str = "fairlens") -> None:
+        self.prefix = prefix
+        self._help: dict[str, tuple[str, str]] = {}
+        self._counters: dict[tuple[str, tuple], Counter] = {}
+        self._histograms: dict[tuple[str, tuple], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, **labels: str) -> Counter:
+        key = (f"{self.prefix}_{name}", tuple(sorted(labels.items())))
+        counter = self._counters.get(key)
+        if counter is None:
+            with self._lock:
+                self._help.setdefault(key[0], ("counter", help_text))
+                counter = self._counters.setdefault(key, Counter())
+        return counter
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        bounds: tuple[float, ...] = STAGE_SECONDS_BUCKETS,
+        **labels: str,
+    ) -> Histogram:
+        key = (f"{self.prefix}_{name}", tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                self._help.setdefault(key[0], ("histogram", help_text))
+                histogram = self._histograms.setdefault(key, Histogram(bounds))
+        return histogram
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = list(self._counters.items())
+            histograms = list(self._histograms.items())
+            help_entries = dict(self._help)
+        return {
+            "help": {name: list(entry) for name, entry in help_entries.items()},
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": counter.value}
+                for (name, labels), counter in counters
+            ],
+            "histograms": [
+                {"name": name, "labels": dict(labels), **histogram.snapshot()}
+                for (name, labels), histogram in histograms
+            ],
+        }
+
+
+def _format_labels(labels: dict[str, str], extra: tuple[str, str] | None = None) -> str:
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in items
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def render_prometheus(snapshots: list[dict]) -> str:
+    """Sum registry snapshots from all workers into one Prometheus text exposition."""
+    help_entries: dict[str, list[str]] = {}
+    counters: dict[tuple, float] = {}
+    histograms: dict[tuple, dict] = {}
+    for snapshot in snapshots:
+        help_entries.update(snapshot["help"])
+        for entry in snapshot["counters"]:
+            key = (entry["name"], tuple(sorted(entry["labels"].items())))
+            counters[key] = counters.get(key, 0.0) + entry["value"]
+        for entry in snapshot["histograms"]:
+            key = (entry["name"], tuple(sorted(entry["labels"].items())))
+            merged = histograms.setdefault(key, {"buckets": {}, "count": 0, "sum": 0.0})
+            for bound, count in entry["buckets"].items():
+                merged["buckets"][bound] = merged["buckets"].get(bound, 0) + count
+            merged["count"] += entry["count"]
+            merged["sum"] += entry["sum"]
+
+    lines: list[str] = []
+    for name in sorted(help_entries):
+        metric_type, help_text = help_entries[name]
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        if metric_type == "counter":
+            for (counter_name, labels), value in sorted(counters.items()):
+                if counter_name == name:
+                    lines.append(f"{name}{_format_labels(dict(labels))} {value:g}")
+            continue
+        for (histogram_name, labels), merged in sorted(histograms.items()):
+            if histogram_name != name:
+                continue
+            label_map = dict(labels)
+            for bound, count in merged["buckets"].items():
+                lines.append(f"{name}_bucket{_format_labels(label_map, ('le', bound))} {count}")
+            lines.append(f"{name}_sum{_format_labels(label_map)} {merged['sum']:.6f}")
+            lines.append(f"{name}_count{_format_labels(label_map)} {merged['count']}")
+    return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    """Observe the seconds spent in a ``with`` block; blocks that raise also count as errors."""
+
+    __slots__ = ("histogram", "errors", "started")
+
+    def __init__(self, histogram: Histogram, errors: Counter) -> None:
+        self.histogram = histogram
+        self.errors = errors
+        self.started = 0.0
+
+    def __enter__(self) -> "StageTimer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> bool:
+        if exc_type is not None and issubclass(exc_type, Exception):
+            self.errors.inc()
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+
+def timed(histogram: Histogram, errors: Counter) -> StageTimer:
+    return StageTimer(histogram, errors)
+
+
+def observe_since_request_start(histogram: Histogram) -> None:
+    """Observe the time since the current request arrived.
+
+    Called first thing in a handler, this measures body parsing and pydantic
+    validation, which FastAPI performs before the handler runs.
+    """
+    started = request_started.get()
+    if started is not None:
+        histogram.observe(time.perf_counter() - started)
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware counting requests and timing them per route template."""
+
+    def __init__(self, app: Any, registry: MetricsRegistry) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        request_started.set(started)
+        status = {"code": 500}
+
+        async def send_wrapper(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            code = str(status["code"])
+            self.registry.counter(
+                "requests_total", "HTTP requests served.", method=method, path=path, status=code
+            ).inc()
+            if status["code"] >= 500:
+                self.registry.counter(
+                    "errors_total", "Requests that ended in a 5xx response.", path=path
+                ).inc()
+            self.registry.histogram(
+                "request_duration_seconds",
+                "End-to-end request latency.",
+                method=method,
+                path=path,
+            ).observe(time.perf_counter() - started)
@@ -0,0 +1,161 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable
+
+import numpy as np
+
+from metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+QUEUE_WAIT_MS_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 25.0, 50.0)
+
+
+class _Pending:
+    __slots__ = ("group", "target", "rows", "future", "enqueued_at")
+
+    def __init__(self, group: Any, rows: np.ndarray) -> None:
+        self.group = group
+        self.target = id(group)
+        self.rows = rows
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """Coalesces concurrent scoring calls into one matrix call per model.
+
+    ``submit`` blocks the calling thread until its rows are scored. A worker
+    thread starts a batch when the first request arrives and dispatches it
+    once ``max_batch_size`` rows are queued or the oldest request has waited
+    ``max_wait`` seconds. Requests for different model versions are scored
+    separately within the same dispatch.
+    """
+
+    def __init__(
+        self,
+        score_fn: Callable[[Any, np.ndarray], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait: float = 0.002,
+    ) -> None:
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._pending: deque[_Pending] = deque()
+        self._pending_rows = 0
+        self._condition = threading.Condition()
+        self._closing = False
+        self._thread: threading.Thread | None = None
+
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(QUEUE_WAIT_MS_BUCKETS)
+        self.bypassed_rows = 0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 10.0) -> None:
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, group: Any, rows: np.ndarray) -> np.ndarray:
+        # Requests that already fill a batch gain nothing from waiting.
+        if len(rows) >= self.max_batch_size or self._thread is None:
+            self.bypassed_rows += len(rows)
+            return self.score_fn(group, rows)
+
+        item = _Pending(group, rows)
+        with self._condition:
+            accepted = not self._closing
+            if accepted:
+                self._pending.append(item)
+                self._pending_rows += len(rows)
+                self._condition.notify_all()
+        if not accepted:
+            self.bypassed_rows += len(rows)
+            return self.score_fn(group, rows)
+        return item.future.result()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._pending_rows
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": True,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "queue_depth": self.queue_depth,
+            "batches": self.batch_sizes.count,
+            "batched_rows": int(self.batch_sizes.total),
+            "bypassed_rows": self.bypassed_rows,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot(),
+        }
+
+    def _take_batch(self) -> list[_Pending] | None:
+        with self._condition:
+            while not self._pending and not self._closing:
+                self._condition.wait()
+            if not self._pending:
+                return None
+
+            deadline = self._pending[0].enqueued_at + self.max_wait
+            while not self._closing and self._pending_rows < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch: list[_Pending] = []
+            batch_rows = 0
+            while self._pending and (
+                not batch or batch_rows + len(self._pending[0].rows) <= self.max_batch_size
+            ):
+                item = self._pending.popleft()
+                batch.append(item)
+                batch_rows += len(item.rows)
+            self._pending_rows -= batch_rows
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: list[_Pending]) -> None:
+        dispatched_at = time.perf_counter()
+        groups: dict[int, list[_Pending]] = {}
+        for item in batch:
+            groups.setdefault(item.target, []).append(item)
+            self.queue_wait_ms.observe((dispatched_at - item.enqueued_at) * 1000)
+
+        for items in groups.values():
+            rows = np.vstack([item.rows for item in items])
+            self.batch_sizes.observe(len(rows))
+            try:
+                scores = np.asarray(self.score_fn(items[0].group, rows))
+            except Exception as exc:
+                logger.exception("Micro-batch of %d rows failed", len(rows))
+                for item in items:
+                    item.future.set_exception(exc)
+                continue
+            offset = 0
+            for item in items:
+                item.future.set_result(scores[offset : offset + len(item.rows)])
+                offset += len(item.rows)
@@ -48,10 +48,12 @@ def calculate_metrics(data: BuyerFinancialInput) -> dict:
         "disposable_income": round(disposable_income, 2)
     }
 
+# Exclusive upper bound of monthly income for each group; anything above is HIGH_INCOME_GROUP.
+INCOME_GROUP_BOUNDS = (("Low", 30000), ("Medium", 75000))
+HIGH_INCOME_GROUP = "High"
+
 def classify_income_group(monthly_income: float) -> str:
-    if monthly_income < 30000:
-        return "Low"
-    elif monthly_income < 75000:
-        return "Medium"
-    else:
-        return "High"
\ No newline at end of file
+    for group, upper_bound in INCOME_GROUP_BOUNDS:
+        if monthly_income < upper_bound:
+            return group
+    return HIGH_INCOME_GROUP
\ No newline at end of file
@@ -0,0 +1,159 @@
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from calibration import CALIBRATION_FILE_NAME, attach_calibration
+from drift import DRIFT_REFERENCE_FILE_NAME
+from tree_engine import CompiledTreeEnsemble
+
+COMPILED_DIR_NAME = "compiled"
+MODEL_FILE_SUFFIXES = (".pkl", ".joblib", ".ubj", ".json")
+METADATA_FILE_NAME = "model_metadata.json"
+ACTIVE_FILE_NAME = "ACTIVE"
+# compile_model.py writes "<artifact><suffix>" holding the SHA-256 of the booster it compiled.
+SOURCE_STAMP_SUFFIX = ".source-sha256"
+# JSON artifacts that sit next to a model and are not boosters.
+NON_MODEL_FILE_NAMES = (METADATA_FILE_NAME, CALIBRATION_FILE_NAME, DRIFT_REFERENCE_FILE_NAME)
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    name: str
+    model: Any
+    threshold: float
+    feature_columns: list[str]
+    source: str
+    loaded_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    explainer: Any = None
+    drift_reference: Any = None
+    # Fingerprint of the registry directory the version was loaded from, if any.
+    fingerprint: tuple | None = None
+
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def source_stamp_path(artifact_path: Path) -> Path:
+    artifact_path = Path(artifact_path)
+    return artifact_path.with_name(artifact_path.name + SOURCE_STAMP_SUFFIX)
+
+
+def read_source_stamp(artifact_path: Path) -> str | None:
+    stamp_path = source_stamp_path(artifact_path)
+    if not stamp_path.exists():
+        return None
+    return stamp_path.read_text(encoding="utf-8").strip() or None
+
+
+def compiled_from(artifact_path: Path, source_path: Path) -> bool:
+    """Whether ``artifact_path`` was compiled from the current ``source_path``."""
+    stamp = read_source_stamp(artifact_path)
+    return stamp is not None and stamp == file_digest(source_path)
+
+
+def load_model_file(model_path: Path) -> Any:
+    # Heavy libraries are imported only for the artifact type actually being loaded.
+    # Boosters pick up a calibration table stored next to them.
+    if CompiledTreeEnsemble.is_compiled_dir(model_path):
+        return attach_calibration(CompiledTreeEnsemble.load(model_path), model_path)
+    if model_path.suffix in (".json", ".ubj"):
+        import xgboost as xgb
+
+        booster = xgb.Booster()
+        booster.load_model(str(model_path))
+        return attach_calibration(booster, model_path)
+
+    import joblib
+
+    return joblib.load(model_path)
+
+
+def discover_versions(registry_dir: Path) -> dict[str, tuple[Path, Path]]:
+    """Map version name to (model file, metadata file) for each subdirectory of ``registry_dir``."""
+    versions: dict[str, tuple[Path, Path]] = {}
+    if not registry_dir.is_dir():
+        return versions
+    for version_dir in sorted(path for path in registry_dir.iterdir() if path.is_dir()):
+        compiled_dir = version_dir / COMPILED_DIR_NAME
+        model_files = [compiled_dir] if CompiledTreeEnsemble.is_compiled_dir(compiled_dir) else []
+        model_files += [
+            path
+            for suffix in MODEL_FILE_SUFFIXES
+            for path in sorted(version_dir.glob(f"*{suffix}"))
+            if path.name not in NON_MODEL_FILE_NAMES
+        ]
+        if model_files:
+            versions[version_dir.name] = (model_files[0], version_dir / METADATA_FILE_NAME)
+    return versions
+
+
+def version_fingerprint(version_dir: Path) -> tuple:
+    """Name, size and mtime of each file under ``version_dir``; changes when one is replaced."""
+    return tuple(
+        (str(path.relative_to(version_dir)), stat.st_size, stat.st_mtime_ns)
+        for path in sorted(version_dir.rglob("*"))
+        if path.is_file()
+        for stat in (path.stat(),)
+    )
+
+
+def read_active_pointer(registry_dir: Path) -> str | None:
+    pointer = registry_dir / ACTIVE_FILE_NAME
+    if not pointer.exists():
+        return None
+    return pointer.read_text(encoding="utf-8").strip() or None
+
+
+class ModelRegistry:
+    """Named model versions with one active version that can be swapped atomically.
+
+    Request handlers read ``active`` once and use that snapshot for the whole
+    request, so a swap never mixes one version's model with another's threshold.
+    """
+
+    def __init__(self) -> None:
+        self._versions: dict[str, ModelVersion] = {}
+        self._active: ModelVersion | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> ModelVersion:
+        active = self._active
+        if active is None:
+            raise RuntimeError("No active model version.")
+        return active
+
+    def get(self, name: str) -> ModelVersion | None:
+        return self._versions.get(name)
+
+    def versions(self) -> list[ModelVersion]:
+        with self._lock:
+            return list(self._versions.values())
+
+    def register(self, version: ModelVersion, activate: bool = False) -> None:
+        # A reloaded copy of the active version replaces it in place.
+        with self._lock:
+            self._versions[version.name] = version
+            if activate or self._active is None or self._active.name == version.name:
+                self._active = version
+
+    def activate(self, name: str) -> ModelVersion:
+        with self._lock:
+            version = self._versions.get(name)
+            if version is None:
+                raise KeyError(name)
+            self._active = version
+            return version
+
+    def remove(self, name: str) -> ModelVersion:
+        with self._lock:
+            version = self._versions.get(name)
+            if version is None:
+                raise KeyError(name)
+            if version is self._active:
+                raise ValueError(f"Cannot unload the active model version {name!r}.")
+            return self._versions.pop(name)
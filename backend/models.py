@@ -1,12 +1,22 @@
-from sqlalchemy import Column, DateTime, Float, Integer, String, func
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Date, DateTime, Float, Index, Integer, String, func
 
 from database import Base
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_created_at_id", "created_at", "id"),
+        Index("ix_transactions_buyer_created_at_id", "buyer_id", "created_at", "id"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     avg_monthly_inflow = Column(Float, nullable=False)
     inflow_volatility = Column(Float, nullable=False)
     avg_monthly_outflow = Column(Float, nullable=False)
@@ -16,6 +26,75 @@ class Transaction(Base):
     total_burden_ratio = Column(Float, nullable=False)
     buffer_ratio = Column(Float, nullable=False)
     stress_index = Column(Float, nullable=False)
-    risk_probability = Column(Float, nullable=False, index=True)
-    decision = Column(String(20), nullable=False, index=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    risk_probability = Column(Float, nullable=False)
+    decision = Column(String(20), nullable=False)
+    model_version = Column(String(64), nullable=True)
+    buyer_id = Column(String(64), nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        default=_utcnow,
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+class DecisionCounter(Base):
+    __tablename__ = "decision_counters"
+
+    slot = Column(Integer, primary_key=True, autoincrement=False)
+    total = Column(Integer, nullable=False, default=0)
+    approvals = Column(Integer, nullable=False, default=0)
+    low_risk = Column(Integer, nullable=False, default=0)
+    medium_risk = Column(Integer, nullable=False, default=0)
+    high_risk = Column(Integer, nullable=False, default=0)
+
+
+class FairnessRollup(Base):
+    """Decision totals per UTC day and income group, spread over counter slots."""
+
+    __tablename__ = "fairness_rollups"
+
+    day = Column(Date, primary_key=True)
+    income_group = Column(String(16), primary_key=True)
+    slot = Column(Integer, primary_key=True, autoincrement=False)
+    decisions = Column(Integer, nullable=False, default=0)
+    approvals = Column(Integer, nullable=False, default=0)
+    risk_sum = Column(Float, nullable=False, default=0.0)
+
+
+class DecisionRollup(Base):
+    """Decision totals per time bucket, spread over counter slots.
+
+    New decisions land in ``minute`` buckets; compaction folds expired minute
+    buckets into ``hour`` buckets and expired hour buckets into ``day`` buckets.
+    """
+
+    __tablename__ = "decision_rollups"
+
+    granularity = Column(String(8), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    slot = Column(Integer, primary_key=True, autoincrement=False)
+    decisions = Column(Integer, nullable=False, default=0)
+    approvals = Column(Integer, nullable=False, default=0)
+    risk_sum = Column(Float, nullable=False, default=0.0)
+
+
+class BuyerExposure(Base):
+    """Per-buyer decision aggregates, updated in the same commit as each decision.
+
+    ``recent_approvals`` counts approvals since ``recent_period_start``. A period
+    lasts ``BUYER_EXPOSURE_PERIOD_DAYS`` days and the first approval after it
+    lapses opens the next one, so the count is a tumbling window, not a sliding one.
+    """
+
+    __tablename__ = "buyer_exposures"
+
+    buyer_id = Column(String(64), primary_key=True)
+    decisions = Column(Integer, nullable=False, default=0)
+    approvals = Column(Integer, nullable=False, default=0)
+    approved_purchase_ratio = Column(Float, nullable=False, default=0.0)
+    recent_approvals = Column(Integer, nullable=False, default=0)
+    recent_period_start = Column(DateTime(timezone=True), nullable=True)
+    last_decision = Column(String(20), nullable=False)
+    last_risk_probability = Column(Float, nullable=False)
+    last_decision_at = Column(DateTime(timezone=True), nullable=False)
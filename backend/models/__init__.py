@@ -10,3 +10,7 @@ _MODULE = module_from_spec(_SPEC)
 _SPEC.loader.exec_module(_MODULE)
 
 Transaction = _MODULE.Transaction
+DecisionCounter = _MODULE.DecisionCounter
+FairnessRollup = _MODULE.FairnessRollup
+DecisionRollup = _MODULE.DecisionRollup
+BuyerExposure = _MODULE.BuyerExposure
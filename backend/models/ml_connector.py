@@ -1,67 +1,303 @@
-import requests
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Callable
+
 import httpx
-from typing import Dict, Tuple
+
 from config import settings
 from models.schemas import MLModelRequest, MLModelResponse
 
-class MLServiceConnector:
+# Answers worth asking again for; other 4xx answers mean the request itself is wrong.
+RETRYABLE_STATUS_CODES = {429}
+HEALTH_CHECK_TIMEOUT = 5.0
+
+
+class MLServiceError(Exception):
+    """The ML service did not return a usable prediction."""
+
+
+class MLServiceUnavailable(MLServiceError):
+    """The circuit breaker is open, so the ML service was not called."""
+
+
+class CircuitBreaker:
+    """Stops calling a failing service for a while, then lets one probe through.
+
+    ``failure_threshold`` consecutive failures open the breaker. After
+    ``reset_timeout`` seconds it half-opens and admits one call: a success
+    closes it, a failure opens it again. A probe that never reports back
+    (a cancelled request) is replaced after another ``reset_timeout``.
     """
-    Connector to communicate with ML Model Service
-    YOUR TEAMMATE provides the ML endpoint
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probe_started: float | None = None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = self._clock()
+            if self.state == "open":
+                if now - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                self._probe_started = None
+            if self._probe_started is None or now - self._probe_started >= self.reset_timeout:
+                self._probe_started = now
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opened += 1
+                self.state = "open"
+                self._opened_at = self._clock()
+                self._probe_started = None
+
+
+class MLServiceConnector:
+    """Client for the external ML model service.
+
+    One pooled ``httpx`` client per calling style (async and sync) lives as
+    long as the connector, so calls reuse keep-alive connections instead of
+    opening one each. The app lifespan calls ``start`` and ``aclose``; a
+    connector used outside it opens its clients on first use.
+
+    A call is retried up to ``max_retries`` times after timeouts, connection
+    errors, 5xx and 429 answers, sleeping a full-jitter exponential backoff
+    in between. Every failed attempt feeds the circuit breaker, which fails
+    calls fast while the service is down. With ``hedge_after`` set, an async
+    call still unanswered after that many seconds is raced against a second
+    copy and the first usable answer wins.
     """
-    
-    def __init__(self):
-        self.ml_url = settings.ML_SERVICE_URL
-        self.timeout = settings.ML_REQUEST_TIMEOUT
-    
-    async def predict(self, ml_request: MLModelRequest) -> MLModelResponse:
-        """
-        Send request to ML service and get prediction
-        
-        OPTION 1: If your ML teammate provides a REST API endpoint
-        """
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.ml_url}/predict",  # Your ML teammate's endpoint
-                    json=ml_request.dict(),
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                
-                # Parse ML response
-                ml_data = response.json()
-                return MLModelResponse(**ml_data)
-        
-        except httpx.TimeoutException:
-            raise Exception("ML service timeout")
-        except httpx.HTTPError as e:
-            raise Exception(f"ML service error: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Error calling ML service: {str(e)}")
-    
-    def predict_sync(self, ml_request: MLModelRequest) -> MLModelResponse:
-        """
-        OPTION 2: Synchronous version (if you prefer sync over async)
-        """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        timeout: float | None = None,
+        max_connections: int | None = None,
+        max_keepalive_connections: int | None = None,
+        http2: bool | None = None,
+        max_retries: int | None = None,
+        retry_backoff: float | None = None,
+        retry_backoff_max: float | None = None,
+        breaker: CircuitBreaker | None = None,
+        hedge_after: float | None = None,
+    ) -> None:
+        self.ml_url = (base_url or settings.ML_SERVICE_URL).rstrip("/")
+        self.timeout = timeout if timeout is not None else settings.ML_REQUEST_TIMEOUT
+        self.limits = httpx.Limits(
+            max_connections=max_connections or settings.ML_MAX_CONNECTIONS,
+            max_keepalive_connections=(
+                max_keepalive_connections or settings.ML_MAX_KEEPALIVE_CONNECTIONS
+            ),
+        )
+        self.http2 = settings.ML_HTTP2 if http2 is None else http2
+        self.max_retries = settings.ML_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_backoff = (
+            settings.ML_RETRY_BACKOFF_MS / 1000 if retry_backoff is None else retry_backoff
+        )
+        self.retry_backoff_max = (
+            settings.ML_RETRY_BACKOFF_MAX_MS / 1000
+            if retry_backoff_max is None
+            else retry_backoff_max
+        )
+        self.breaker = breaker or CircuitBreaker(
+            settings.ML_BREAKER_FAILURES, settings.ML_BREAKER_RESET_SECONDS
+        )
+        if hedge_after is None:
+            hedge_after = settings.ML_HEDGE_AFTER_MS / 1000
+        self.hedge_after = hedge_after if hedge_after > 0 else None
+
+        self._async_client: httpx.AsyncClient | None = None
+        self._sync_client: httpx.Client | None = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def _client_options(self) -> dict[str, Any]:
+        if self.http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError as exc:
+                raise RuntimeError(
+                    'ML_HTTP2 needs the h2 package (pip install "httpx[http2]").'
+                ) from exc
+        return {
+            "base_url": self.ml_url,
+            "timeout": self.timeout,
+            "limits": self.limits,
+            "http2": self.http2,
+        }
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(**self._client_options())
+        return self._async_client
+
+    def _get_sync_client(self) -> httpx.Client:
+        with self._lock:
+            if self._sync_client is None:
+                self._sync_client = httpx.Client(**self._client_options())
+            return self._sync_client
+
+    async def start(self) -> None:
+        self._get_async_client()
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        with self._lock:
+            if self._sync_client is not None:
+                self._sync_client.close()
+                self._sync_client = None
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _admit(self) -> None:
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise MLServiceUnavailable("ML service circuit breaker is open")
+        self._count("requests")
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.retry_backoff_max, self.retry_backoff * 2**attempt))
+
+    @staticmethod
+    def _retryable(response: httpx.Response) -> bool:
+        return response.status_code >= 500 or response.status_code in RETRYABLE_STATUS_CODES
+
+    def _result(self, response: httpx.Response) -> MLModelResponse | None:
+        """The prediction in ``response``, or None when the answer is worth retrying."""
+        if self._retryable(response):
+            return None
+        self.breaker.record_success()
+        if response.is_error:
+            raise MLServiceError(
+                f"ML service error: {response.status_code} {response.reason_phrase}"
+            )
         try:
-            response = requests.post(
-                f"{self.ml_url}/predict",
-                json=ml_request.dict(),
-                timeout=self.timeout
+            return MLModelResponse(**response.json())
+        except ValueError as exc:
+            raise MLServiceError(f"Invalid ML service response: {exc}") from exc
+
+    def _failed(self, outcome: httpx.Response | httpx.TransportError) -> MLServiceError:
+        self._count("failures")
+        self.breaker.record_failure()
+        if isinstance(outcome, httpx.TimeoutException):
+            error = MLServiceError("ML service timeout")
+        elif isinstance(outcome, httpx.TransportError):
+            error = MLServiceError(f"ML service error: {outcome}")
+        else:
+            error = MLServiceError(
+                f"ML service error: {outcome.status_code} {outcome.reason_phrase}"
             )
-            response.raise_for_status()
-            
-            ml_data = response.json()
-            return MLModelResponse(**ml_data)
-        
-        except requests.Timeout:
-            raise Exception("ML service timeout")
-        except requests.HTTPError as e:
-            raise Exception(f"ML service error: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Error calling ML service: {str(e)}")
-    
+        if isinstance(outcome, Exception):
+            error.__cause__ = outcome
+        return error
+
+    async def _post(self, client: httpx.AsyncClient, payload: dict) -> httpx.Response:
+        if self.hedge_after is None:
+            return await client.post("/predict", json=payload)
+        first = asyncio.ensure_future(client.post("/predict", json=payload))
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if done:
+                return first.result()
+
+            self._count("hedged")
+            second = asyncio.ensure_future(client.post("/predict", json=payload))
+            tasks.append(second)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and not self._retryable(task.result()):
+                        if task is second:
+                            self._count("hedge_wins")
+                        return task.result()
+            # Neither copy was usable; report the original one.
+            return first.result()
+        finally:
+            # The losing copy is cancelled, which closes its connection.
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()
+
+    async def predict(self, ml_request: MLModelRequest) -> MLModelResponse:
+        """Send request to ML service and get prediction"""
+        payload = ml_request.model_dump()
+        client = self._get_async_client()
+        for attempt in range(self.max_retries + 1):
+            self._admit()
+            try:
+                outcome = await self._post(client, payload)
+            except httpx.TransportError as exc:
+                outcome = exc
+            else:
+                result = self._result(outcome)
+                if result is not None:
+                    return result
+            error = self._failed(outcome)
+            if attempt == self.max_retries:
+                raise error
+            self._count("retries")
+            await asyncio.sleep(self._backoff(attempt))
+
+    def predict_sync(self, ml_request: MLModelRequest) -> MLModelResponse:
+        """Synchronous version of ``predict``, without hedging"""
+        payload = ml_request.model_dump()
+        client = self._get_sync_client()
+        for attempt in range(self.max_retries + 1):
+            self._admit()
+            try:
+                outcome = client.post("/predict", json=payload)
+            except httpx.TransportError as exc:
+                outcome = exc
+            else:
+                result = self._result(outcome)
+                if result is not None:
+                    return result
+            error = self._failed(outcome)
+            if attempt == self.max_retries:
+                raise error
+            self._count("retries")
+            time.sleep(self._backoff(attempt))
+
     def predict_local(self, ml_request: MLModelRequest) -> MLModelResponse:
         """
         OPTION 3: If your ML teammate provides a Python function/class
@@ -72,7 +308,7 @@ class MLServiceConnector:
             # from ml_model import RiskModel  # Your teammate's code
             # model = RiskModel()
             # result = model.predict(ml_request.dict())
-            
+
             # For now, return a mock response
             # REPLACE THIS with actual ML model call
             return MLModelResponse(
@@ -86,23 +322,36 @@ class MLServiceConnector:
                     "emi_tenure_months": 0.05
                 }
             )
-        
+
         except Exception as e:
             raise Exception(f"Error in local ML prediction: {str(e)}")
-    
+
     async def health_check(self) -> bool:
         """
         Check if ML service is healthy
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.ml_url}/health",
-                    timeout=5
-                )
-                return response.status_code == 200
-        except:
+            response = await self._get_async_client().get(
+                "/health", timeout=HEALTH_CHECK_TIMEOUT
+            )
+            return response.status_code == 200
+        except httpx.HTTPError:
             return False
 
+    def snapshot(self) -> dict:
+        return {
+            "enabled": True,
+            "base_url": self.ml_url,
+            "http2": self.http2,
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "short_circuited": self.short_circuited,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "breaker_state": self.breaker.state,
+            "breaker_opened": self.breaker.opened,
+        }
+
 # Singleton instance
-ml_connector = MLServiceConnector()
\ No newline at end of file
+ml_connector = MLServiceConnector()
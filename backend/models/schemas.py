@@ -119,22 +119,46 @@ class LenderDashboardData(BaseModel):
     
     timestamp: datetime
 
+class GroupFairnessMetrics(BaseModel):
+    decisions: int
+    approvals: int
+    approval_rate: float
+    approval_parity: Optional[float] = Field(
+        default=None, description="Approval rate over the best-approved group's rate"
+    )
+    avg_risk: float
+    decision_mix: Dict[str, float] = Field(..., description="Share of decisions of each kind")
+
 class FairnessMetrics(BaseModel):
     total_predictions: int
     approval_rate: float
     rejection_rate: float
-    metrics_by_group: Dict
+    metrics_by_group: Dict[str, GroupFairnessMetrics]
     fairness_score: float
     issues_detected: List[str]
     timestamp: datetime
 
 class DriftReport(BaseModel):
+    feature: Optional[str] = None
+    observations: int = 0
     drift_detected: bool
     drift_severity: str
     psi_score: float
     recommendations: List[str]
     timestamp: datetime
 
+class DriftResponse(BaseModel):
+    enabled: bool
+    model_version: Optional[str] = None
+    reference_source: Optional[str] = Field(
+        default=None, description="training, or deployment when frozen from live traffic"
+    )
+    reference_rows: int = 0
+    window_seconds: float = 0.0
+    observations: int = 0
+    reports: List[DriftReport] = Field(default_factory=list)
+    timestamp: datetime
+
 class HealthResponse(BaseModel):
     status: str
     version: str
@@ -0,0 +1,290 @@
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Column, MetaData, Table, select, text
+from sqlalchemy.engine import Connection, Engine
+
+import crud
+from models import Transaction
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = Transaction.__tablename__
+DEFAULT_PARTITION = f"{TABLE_NAME}_default"
+PARTITION_NAME = re.compile(rf"^{TABLE_NAME}_(\d{{4}})_(\d{{2}})$")
+# Partitions are created this many months ahead so inserts never wait on DDL.
+MONTHS_AHEAD = 2
+# Shared by every worker so only one of them maintains partitions at a time.
+MAINTENANCE_LOCK_KEY = 0x46414952
+ARCHIVE_SUFFIX = ".parquet"
+ARCHIVE_CHUNK_ROWS = 5000
+
+
+def month_floor(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    moment = moment.astimezone(timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{TABLE_NAME}_{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(name: str) -> datetime | None:
+    match = PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+
+
+def _partitioned_table() -> Table:
+    # Postgres needs the partition key in every unique constraint, so the
+    # primary key becomes (id, created_at); id keeps its sequence.
+    columns = [
+        Column(
+            column.name,
+            column.type,
+            primary_key=column.name in ("id", "created_at"),
+            autoincrement=column.name == "id",
+            nullable=column.nullable,
+            server_default=column.server_default.arg if column.server_default else None,
+        )
+        for column in Transaction.__table__.columns
+    ]
+    return Table(TABLE_NAME, MetaData(), *columns, postgresql_partition_by="RANGE (created_at)")
+
+
+def is_partitioned(connection: Connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(
+        connection.scalar(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :name AND pg_table_is_visible(c.oid))"
+            ),
+            {"name": TABLE_NAME},
+        )
+    )
+
+
+def list_partitions(connection: Connection) -> dict[str, datetime]:
+    """Monthly partitions attached to the table, by name; the default one is left out."""
+    names = connection.scalars(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "WHERE parent.relname = :name AND pg_table_is_visible(parent.oid)"
+        ),
+        {"name": TABLE_NAME},
+    )
+    partitions = {}
+    for name in names:
+        month = partition_month(name)
+        if month is not None:
+            partitions[name] = month
+    return partitions
+
+
+def _bounds(month: datetime) -> str:
+    return f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+
+
+def create_month_partition(connection: Connection, month: datetime) -> str:
+    """Attach the partition for ``month``, moving any of its rows out of the default partition."""
+    name = partition_name(month)
+    start, end = month, add_months(month, 1)
+    stranded = connection.scalar(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :start AND created_at < :end)"
+        ),
+        {"start": start, "end": end},
+    )
+    if not stranded:
+        connection.exec_driver_sql(
+            f"CREATE TABLE {name} PARTITION OF {TABLE_NAME} FOR VALUES {_bounds(month)}"
+        )
+        return name
+    # Postgres refuses a partition whose rows still sit in the default one.
+    connection.exec_driver_sql(
+        f"CREATE TABLE {name} (LIKE {TABLE_NAME} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    connection.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"start": start, "end": end},
+    )
+    connection.exec_driver_sql(
+        f"ALTER TABLE {TABLE_NAME} ATTACH PARTITION {name} FOR VALUES {_bounds(month)}"
+    )
+    return name
+
+
+def ensure_month_partitions(connection: Connection, start: datetime, end: datetime) -> list[str]:
+    """Create any missing monthly partitions from ``start``'s month through ``end``'s."""
+    existing = set(list_partitions(connection))
+    created = []
+    month = month_floor(start)
+    while month <= end:
+        if partition_name(month) not in existing:
+            created.append(create_month_partition(connection, month))
+        month = add_months(month, 1)
+    return created
+
+
+def create_partitioned_transactions(connection: Connection, now: datetime | None = None) -> None:
+    """Create an empty ``transactions`` partitioned by UTC month, plus a default partition.
+
+    The default partition catches rows outside every monthly one (a backfill,
+    say); maintenance later moves them into partitions of their own.
+    """
+    now = now or datetime.now(timezone.utc)
+    _partitioned_table().create(connection)
+    connection.exec_driver_sql(
+        f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE_NAME} DEFAULT"
+    )
+    current = month_floor(now)
+    ensure_month_partitions(connection, current, add_months(current, MONTHS_AHEAD))
+
+
+def partition_existing_transactions(connection: Connection) -> int:
+    """Rewrite an unpartitioned ``transactions`` table as a partitioned one.
+
+    Runs in the caller's transaction: the old table is renamed, its indexes
+    dropped, every row copied into monthly partitions and the old table
+    dropped. Indexes are recreated afterwards by ``create_schema``. Returns
+    the number of rows moved.
+    """
+    legacy = f"{TABLE_NAME}_unpartitioned"
+    connection.exec_driver_sql(f"ALTER TABLE {TABLE_NAME} RENAME TO {legacy}")
+    connection.exec_driver_sql(f"ALTER TABLE {legacy} DROP CONSTRAINT IF EXISTS {TABLE_NAME}_pkey")
+    for index in Transaction.__table__.indexes:
+        connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+    months = connection.scalars(
+        text(f"SELECT DISTINCT date_trunc('month', created_at, 'UTC') FROM {legacy}")
+    ).all()
+    create_partitioned_transactions(connection)
+    for month in sorted(months):
+        ensure_month_partitions(connection, month, month)
+
+    columns = ", ".join(column.name for column in Transaction.__table__.columns)
+    moved = connection.exec_driver_sql(
+        f"INSERT INTO {TABLE_NAME} ({columns}) SELECT {columns} FROM {legacy}"
+    ).rowcount
+    connection.exec_driver_sql(
+        f"SELECT setval(pg_get_serial_sequence('{TABLE_NAME}', 'id'), "
+        f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {TABLE_NAME}), false)"
+    )
+    connection.exec_driver_sql(f"DROP TABLE {legacy}")
+    return moved
+
+
+def archive_partition(connection: Connection, name: str, archive_dir: Path) -> Path:
+    """Write one monthly partition to zstd Parquet, then detach and drop it.
+
+    The partition is share-locked first, so the file holds exactly the rows
+    that are dropped. The file is fsynced and renamed into place before the
+    partition goes. The month's decisions are taken out of
+    ``decision_counters`` in the same transaction, so ``/stats`` and the
+    ``/logs`` total keep matching the rows that can still be read.
+    """
+    from export import stream_parquet
+
+    month = partition_month(name)
+    end = add_months(month, 1)
+    connection.exec_driver_sql(f"LOCK TABLE {name} IN SHARE MODE")
+    counts = crud.count_decisions_from_transactions(connection, start=month, end=end)
+    result = connection.execute(
+        select(*Transaction.__table__.columns)
+        .where(Transaction.created_at >= month, Transaction.created_at < end)
+        .order_by(Transaction.created_at, Transaction.id)
+        .execution_options(yield_per=ARCHIVE_CHUNK_ROWS)
+    )
+    chunks = ([tuple(row) for row in partition] for partition in result.partitions())
+
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"{name}{ARCHIVE_SUFFIX}"
+    partial = path.with_suffix(f"{ARCHIVE_SUFFIX}.partial")
+    with partial.open("wb") as handle:
+        for data in stream_parquet(chunks):
+            handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(partial, path)
+
+    crud.subtract_decision_counts(connection, counts)
+    connection.exec_driver_sql(f"ALTER TABLE {TABLE_NAME} DETACH PARTITION {name}")
+    connection.exec_driver_sql(f"DROP TABLE {name}")
+    return path
+
+
+def maintain_partitions(
+    bind: Engine,
+    retention_months: int = 0,
+    archive_dir: Path | None = None,
+    now: datetime | None = None,
+) -> dict[str, Any]:
+    """Create upcoming and stranded monthly partitions and archive expired ones.
+
+    Partitions older than the current month minus ``retention_months`` are
+    archived to ``archive_dir`` (0 keeps every partition). Each step commits
+    on its own, under a session advisory lock that other workers skip past.
+    """
+    report: dict[str, Any] = {"created": [], "archived": []}
+    current = month_floor(now or datetime.now(timezone.utc))
+    with bind.connect() as connection:
+        if not is_partitioned(connection):
+            return report
+        locked = connection.scalar(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}
+        )
+        connection.commit()
+        if not locked:
+            return report
+        try:
+            stranded = connection.scalars(
+                text(
+                    "SELECT DISTINCT date_trunc('month', created_at, 'UTC') "
+                    f"FROM {DEFAULT_PARTITION}"
+                )
+            ).all()
+            for month in sorted(stranded):
+                report["created"] += ensure_month_partitions(connection, month, month)
+            report["created"] += ensure_month_partitions(
+                connection, current, add_months(current, MONTHS_AHEAD)
+            )
+            connection.commit()
+
+            if retention_months > 0 and archive_dir is not None:
+                oldest_kept = add_months(current, -retention_months)
+                partitions = list_partitions(connection)
+                for name in sorted(partitions):
+                    if partitions[name] >= oldest_kept:
+                        continue
+                    path = archive_partition(connection, name, archive_dir)
+                    connection.commit()
+                    logger.info("Archived partition %s to %s", name, path)
+                    report["archived"].append(name)
+        finally:
+            connection.rollback()
+            connection.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": MAINTENANCE_LOCK_KEY}
+            )
+            connection.commit()
+    return report
@@ -0,0 +1,93 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+import crud
+import models  # noqa: F401
+import partitions
+from database import Base, SessionLocal, engine
+from timeseries import RollupRetention
+
+
+def _add_missing_columns(bind: Engine) -> None:
+    # Only nullable columns can be added in place; anything else needs a real migration.
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=bind.dialect)
+            with bind.begin() as connection:
+                connection.execute(
+                    text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+                )
+
+
+# Single-column indexes on transactions that cost every insert and served no query.
+RETIRED_INDEXES = (
+    "ix_transactions_id",
+    "ix_transactions_risk_probability",
+    "ix_transactions_decision",
+)
+
+
+def create_schema(bind: Engine) -> None:
+    # On Postgres a new decision log is partitioned by month from the start.
+    if bind.dialect.name == "postgresql" and not inspect(bind).has_table(partitions.TABLE_NAME):
+        with bind.begin() as connection:
+            partitions.create_partitioned_transactions(connection)
+    Base.metadata.create_all(bind=bind)
+    _add_missing_columns(bind)
+    # create_all skips indexes on tables that already exist, so add new ones explicitly.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+    with bind.begin() as connection:
+        for name in RETIRED_INDEXES:
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+
+
+def prepare_database(
+    bind: Engine,
+    rebuild_counters: bool = False,
+    rollup_retention: RollupRetention = RollupRetention(),
+) -> None:
+    create_schema(bind)
+    partitions.maintain_partitions(bind)
+    with SessionLocal(bind=bind) as db:
+        crud.ensure_decision_counters(db, rebuild=rebuild_counters)
+        crud.ensure_fairness_rollups(db, rebuild=rebuild_counters)
+        crud.ensure_decision_rollups(db, rebuild=rebuild_counters, retention=rollup_retention)
+        crud.ensure_buyer_exposures(db, rebuild=rebuild_counters)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Create or upgrade the FairLens database schema.")
+    parser.add_argument(
+        "--rebuild-counters",
+        action="store_true",
+        help=(
+            "Recount the /stats, fairness, time series and buyer exposure aggregates "
+            "from transactions."
+        ),
+    )
+    parser.add_argument(
+        "--partition-transactions",
+        action="store_true",
+        help="Postgres only: rewrite an unpartitioned transactions table as monthly partitions.",
+    )
+    args = parser.parse_args()
+    if args.partition_transactions:
+        with engine.begin() as connection:
+            if connection.dialect.name != "postgresql":
+                raise SystemExit("Partitioning needs Postgres.")
+            if partitions.is_partitioned(connection):
+                raise SystemExit("transactions is already partitioned.")
+            moved = partitions.partition_existing_transactions(connection)
+        print(f"Moved {moved} transactions into monthly partitions.")
+    prepare_database(engine, rebuild_counters=args.rebuild_counters)
@@ -1,7 +1,8 @@
-from datetime import datetime
-from typing import Literal
+import math
+from datetime import date, datetime
+from typing import Any, Literal
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 
 class PredictRequest(BaseModel):
@@ -14,6 +15,9 @@ class PredictRequest(BaseModel):
     total_burden_ratio: float = Field(..., description="Total burden ratio")
     buffer_ratio: float = Field(..., description="Buffer ratio")
     stress_index: float = Field(..., description="Stress index")
+    buyer_id: str | None = Field(
+        default=None, max_length=64, description="Buyer to record the decision against"
+    )
 
     @field_validator("*")
     @classmethod
@@ -26,9 +30,113 @@ class PredictRequest(BaseModel):
         return value
 
 
+class BankTransaction(BaseModel):
+    timestamp: datetime = Field(..., description="When the transaction posted; naive times are UTC")
+    amount: float = Field(..., description="Signed amount: credits positive, debits negative")
+    balance: float | None = Field(
+        default=None, description="Account balance after the transaction, when the bank reports it"
+    )
+    debt_repayment: bool = Field(
+        default=False, description="Debit that services a loan, card or BNPL plan"
+    )
+
+    @field_validator("amount", "balance")
+    @classmethod
+    def validate_finite(cls, value: float | None) -> float | None:
+        if value is not None and not math.isfinite(value):
+            raise ValueError("Value must be a finite number")
+        return value
+
+
+class TransactionIngestRequest(BaseModel):
+    transactions: list[BankTransaction] = Field(..., min_length=1)
+
+
+class TransactionIngestResponse(BaseModel):
+    buyer_id: str
+    accepted: int
+    skipped: int = Field(..., description="Transactions older than the 90-day window")
+
+
+class BuyerFeaturesResponse(BaseModel):
+    buyer_id: str
+    as_of: date = Field(..., description="Newest day in the buyer's window (UTC)")
+    history_days: int = Field(..., description="Days of history behind the features, up to 90")
+    features: PredictRequest
+
+
+class FeatureEngineStatsResponse(BaseModel):
+    enabled: bool
+    buyers: int = 0
+    max_buyers: int = 0
+    ingested_transactions: int = 0
+    skipped_transactions: int = 0
+    evictions: int = 0
+    lookups: int = 0
+
+
+class FeatureContribution(BaseModel):
+    feature: str
+    value: float
+    contribution: float
+
+
+class Explanation(BaseModel):
+    base_value: float = Field(..., description="Model margin before any feature, in log-odds")
+    contributions: list[FeatureContribution] = Field(
+        ..., description="Per-feature log-odds contributions, largest magnitude first"
+    )
+    other: float = Field(0.0, description="Summed contribution of features cut by top_k")
+
+
 class PredictResponse(BaseModel):
     risk_probability: float
     decision: Literal["Approve", "Decline"]
+    explanation: Explanation | None = None
+
+
+class BatchPredictRequest(BaseModel):
+    rows: list[dict[str, Any]] | None = Field(
+        default=None, description="Row-oriented applicants, one PredictRequest object per entry"
+    )
+    columns: dict[str, list[Any]] | None = Field(
+        default=None, description="Column-oriented applicants, one equal-length array per feature"
+    )
+
+    @model_validator(mode="after")
+    def validate_layout(self) -> "BatchPredictRequest":
+        if (self.rows is None) == (self.columns is None):
+            raise ValueError("Provide exactly one of 'rows' or 'columns'")
+        if self.columns is not None:
+            lengths = {len(values) for values in self.columns.values()}
+            if len(lengths) > 1:
+                raise ValueError("All arrays in 'columns' must have the same length")
+        return self
+
+    def to_rows(self) -> list[dict[str, Any]]:
+        if self.rows is not None:
+            return self.rows
+        columns = self.columns or {}
+        row_count = len(next(iter(columns.values()), []))
+        return [
+            {name: values[index] for name, values in columns.items()}
+            for index in range(row_count)
+        ]
+
+
+class BatchPredictItem(BaseModel):
+    index: int
+    risk_probability: float | None = None
+    decision: Literal["Approve", "Decline"] | None = None
+    explanation: Explanation | None = None
+    errors: list[str] | None = None
+
+
+class BatchPredictResponse(BaseModel):
+    total: int
+    scored: int
+    failed: int
+    results: list[BatchPredictItem]
 
 
 class StatsResponse(BaseModel):
@@ -53,6 +161,8 @@ class LogItem(BaseModel):
     stress_index: float
     risk_probability: float
     decision: Literal["Approve", "Decline"]
+    model_version: str | None = None
+    buyer_id: str | None = None
     created_at: datetime
 
 
@@ -62,9 +172,177 @@ class LogsResponse(BaseModel):
     total: int
     total_pages: int
     items: list[LogItem]
+    next_cursor: str | None = None
+
+
+class BuyerExposureResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    buyer_id: str
+    decisions: int
+    approvals: int
+    recent_approvals: int = Field(
+        ..., description="Approvals in the buyer's current 30-day exposure period"
+    )
+    recent_period_start: datetime | None = None
+    approved_purchase_ratio: float = Field(
+        ..., description="Summed purchase_to_inflow_ratio over every approval"
+    )
+    last_decision: Literal["Approve", "Decline"]
+    last_risk_probability: float
+    last_decision_at: datetime
+
+
+class BuyerHistoryResponse(BaseModel):
+    buyer_id: str
+    limit: int
+    total: int = Field(..., description="Decisions recorded for the buyer")
+    items: list[LogItem]
+    next_cursor: str | None = None
+
+
+class TimeseriesBucket(BaseModel):
+    start: datetime
+    decisions: int
+    approvals: int
+    declines: int
+    approval_rate: float
+    avg_risk: float | None = None
+
+
+class TimeseriesResponse(BaseModel):
+    granularity: Literal["minute", "hour", "day"]
+    start: datetime
+    end: datetime
+    retained_from: datetime | None = Field(
+        None, description="Oldest bucket kept at this granularity; earlier buckets are omitted"
+    )
+    buckets: list[TimeseriesBucket]
+
+
+class DecisionLogStatsResponse(BaseModel):
+    enabled: bool
+    queue_depth: int = 0
+    capacity: int = 0
+    enqueued_rows: int = 0
+    rejected_rows: int = 0
+    timed_out_rows: int = 0
+    flushed_rows: int = 0
+    dropped_rows: int = 0
+    undrained_rows: int = 0
+    flush_count: int = 0
+    flush_errors: int = 0
+    last_flush_ms: float = 0.0
+    max_flush_ms: float = 0.0
+    avg_flush_ms: float = 0.0
+
+
+class ScoreCacheStatsResponse(BaseModel):
+    enabled: bool
+    size: int = 0
+    max_entries: int = 0
+    ttl_seconds: float = 0.0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    hit_rate: float = 0.0
+
+
+class MLServiceStatsResponse(BaseModel):
+    enabled: bool
+    base_url: str | None = None
+    http2: bool = False
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    short_circuited: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    breaker_state: Literal["closed", "open", "half_open"] | None = None
+    breaker_opened: int = 0
+
+
+class ExplainResponse(BaseModel):
+    risk_probability: float
+    decision: Literal["Approve", "Decline"]
+    model_version: str
+    method: Literal["exact", "approx"]
+    explanation: Explanation
+
+
+class ExplainStatsResponse(BaseModel):
+    method: Literal["exact", "approx"]
+    explained_requests: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    p99_budget_ms: float
+    within_budget: bool
+
+
+class HistogramSnapshot(BaseModel):
+    buckets: dict[str, int] = Field(
+        default_factory=dict, description="Cumulative counts keyed by upper bound"
+    )
+    count: int = 0
+    sum: float = 0.0
+
+
+class MicroBatcherStatsResponse(BaseModel):
+    enabled: bool
+    max_batch_size: int = 0
+    max_wait_ms: float = 0.0
+    queue_depth: int = 0
+    batches: int = 0
+    batched_rows: int = 0
+    bypassed_rows: int = 0
+    batch_size: HistogramSnapshot = Field(default_factory=HistogramSnapshot)
+    queue_wait_ms: HistogramSnapshot = Field(default_factory=HistogramSnapshot)
+
+
+class WorkerStats(BaseModel):
+    pid: int
+    started_at: datetime
+    model_version: str
+    scored_rows: int
+    memory: dict[str, float]
+    components: dict[str, dict[str, Any]]
+
+
+class WorkersResponse(BaseModel):
+    workers: int
+    scored_rows: int
+    memory: dict[str, float] = Field(
+        ..., description="Summed MiB; pss_mb is the combined footprint with sharing counted once"
+    )
+    items: list[WorkerStats]
 
 
 class HealthResponse(BaseModel):
     status: str
     model_loaded: bool
     threshold: float
+    model_version: str | None = None
+
+
+class ReadinessResponse(BaseModel):
+    status: Literal["ready", "not_ready"]
+    model_version: str | None
+    database: bool
+
+
+class ModelVersionInfo(BaseModel):
+    name: str
+    threshold: float
+    feature_columns: list[str]
+    source: str
+    loaded_at: datetime
+    active: bool
+
+
+class ModelVersionsResponse(BaseModel):
+    active: str
+    loaded: list[ModelVersionInfo]
+    available: list[str]
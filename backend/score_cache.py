@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class ScoreCache:
+    """Thread-safe LRU cache of risk probabilities keyed on the ordered feature vector.
+
+    Entries expire after ``ttl_seconds``. The cache empties itself whenever the
+    ``generation`` passed to ``get``/``put`` changes, which callers derive from
+    the active model and threshold.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100_000,
+        ttl_seconds: float = 300.0,
+        decimals: int | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.decimals = decimals
+
+        self._entries: OrderedDict[tuple, tuple[float, float]] = OrderedDict()
+        self._generation: Hashable | None = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def make_key(self, values: list[Any]) -> tuple:
+        if self.decimals is None:
+            return tuple(values)
+        return tuple(round(value, self.decimals) for value in values)
+
+    def _check_generation(self, generation: Hashable) -> None:
+        if generation != self._generation:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._generation = generation
+
+    def get(self, key: tuple, generation: Hashable) -> float | None:
+        with self._lock:
+            self._check_generation(generation)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value: float, generation: Hashable) -> None:
+        with self._lock:
+            self._check_generation(generation)
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
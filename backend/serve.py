@@ -0,0 +1,186 @@
+"""Production launcher: load the model once, then fork uvicorn workers that share it.
+
+The parent binds the listening socket, prepares the schema once, loads and
+warms up the model on a single thread, and forks ``--workers`` children. Each
+child serves the shared socket with its own event loop. Forked workers start
+from the parent's memory, so model pages stay shared until written. Compiled
+native models (``INFERENCE_ENGINE=native``) are memory-mapped and shared
+through the page cache.
+
+SIGTERM or SIGINT is forwarded to every worker. Each one stops accepting
+connections, finishes in-flight requests, runs the app shutdown (draining the
+decision log), and exits. Workers still running after ``--graceful-timeout``
+seconds are killed. Workers that die unexpectedly are replaced.
+"""
+
+import argparse
+import gc
+import logging
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+logger = logging.getLogger("serve")
+
+# fork() is only safe from a single-threaded parent. Warm-up scoring would start
+# XGBoost's OpenMP pool, and pyarrow (imported by xgboost through pandas) starts a
+# jemalloc background thread. Both read these at library load, so they are set
+# before main is imported; workers inherit them and scale out by process instead.
+FORK_SAFE_ENVIRONMENT = {
+    "OMP_NUM_THREADS": "1",
+    "JE_ARROW_MALLOC_CONF": "background_thread:false",
+}
+
+
+def _bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _thread_count() -> int:
+    try:
+        return len(os.listdir("/proc/self/task"))
+    except OSError:
+        return 1
+
+
+def _run_worker(sock: socket.socket, args: argparse.Namespace) -> None:
+    import uvicorn
+
+    from main import app
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(
+        app,
+        log_level=args.log_level,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        timeout_keep_alive=args.keep_alive,
+    )
+    # uvicorn installs its own SIGTERM/SIGINT handlers for a graceful shutdown.
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(sock: socket.socket, args: argparse.Namespace) -> int:
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 0
+        try:
+            _run_worker(sock, args)
+        except BaseException:
+            logger.exception("Worker %d crashed", os.getpid())
+            exit_code = 1
+        finally:
+            logging.shutdown()
+            # Skip the parent's atexit handlers, which own the shared metrics directory.
+            os._exit(exit_code)
+    logger.info("Started worker %d", pid)
+    return pid
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    )
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "10000")))
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--graceful-timeout", type=float, default=30.0)
+    parser.add_argument("--keep-alive", type=int, default=5)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument(
+        "--no-preload",
+        action="store_true",
+        help="Let every worker load its own model copy (for memory comparisons).",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(message)s")
+
+    # Workers publish their metrics here; main reads the variable at import.
+    metrics_dir = tempfile.mkdtemp(prefix="fairlens-workers-")
+    os.environ["WORKER_METRICS_DIR"] = metrics_dir
+    for name, value in FORK_SAFE_ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+
+    import main as app_module
+
+    started = time.perf_counter()
+    app_module.preload(load_model=not args.no_preload)
+    logger.info("Prepared workers in %.2f s", time.perf_counter() - started)
+
+    threads = _thread_count()
+    if threads > 1:
+        logger.warning("Forking workers from a parent with %d threads", threads)
+
+    sock = _bind_socket(args.host, args.port, args.backlog)
+    # Move everything allocated so far out of the collector's reach, so GC passes
+    # in the workers do not write to (and un-share) the inherited pages.
+    gc.collect()
+    gc.freeze()
+
+    stopping = False
+    kill_deadline = 0.0
+    children: set[int] = set()
+
+    def request_stop(signum: int, frame: object) -> None:
+        nonlocal stopping, kill_deadline
+        if stopping:
+            return
+        stopping = True
+        kill_deadline = time.monotonic() + args.graceful_timeout + 5
+        logger.info("Received signal %d; draining %d workers", signum, len(children))
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    for _ in range(args.workers):
+        children.add(_spawn(sock, args))
+
+    try:
+        while children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                if stopping and time.monotonic() > kill_deadline:
+                    for child in list(children):
+                        logger.warning("Worker %d did not drain in time; killing it", child)
+                        os.kill(child, signal.SIGKILL)
+                    kill_deadline = float("inf")
+                time.sleep(0.1)
+                continue
+
+            children.discard(pid)
+            if stopping:
+                logger.info("Worker %d exited", pid)
+                continue
+            exit_code = os.waitstatus_to_exitcode(status)
+            logger.warning("Worker %d exited with code %d; restarting", pid, exit_code)
+            time.sleep(1)
+            if not stopping:
+                children.add(_spawn(sock, args))
+    finally:
+        sock.close()
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+"""Generate synthetic gig-economy cash-flow applicants in constant memory.
+
+Rows come from a small latent model: income level drives volatility, which in
+turn drives spending, balance dips, negative-balance days and stress. The
+``default_next_cycle`` label is drawn from a logistic function of the same
+factors plus noise. Every chunk is generated with NumPy from its own seed
+``[seed, chunk_index]``. With the same ``--seed`` and ``--chunk-rows``, a
+smaller ``--rows`` yields a prefix of a larger run.
+
+Write training data (CSV or Parquet by suffix) or bulk-seed the ``transactions``
+table of ``DATABASE_URL`` for load tests and dashboards::
+
+    python synthetic_data.py generate --rows 20000000 --out ../data/synthetic_training_data.csv
+    python synthetic_data.py generate --rows 20000000 --out ../data/synthetic.parquet
+    python synthetic_data.py seed-db --rows 2000000 --days 180
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+
+FEATURE_COLUMNS = [
+    "avg_monthly_inflow",
+    "inflow_volatility",
+    "avg_monthly_outflow",
+    "min_balance_30d",
+    "neg_balance_days_30d",
+    "purchase_to_inflow_ratio",
+    "total_burden_ratio",
+    "buffer_ratio",
+    "stress_index",
+]
+LABEL_COLUMN = "default_next_cycle"
+DEFAULT_CHUNK_ROWS = 250_000
+DEFAULT_THRESHOLD = 0.55
+DEFAULT_OUTPUT = Path(__file__).resolve().parent.parent / "data" / "synthetic_training_data.csv"
+
+
+def _sigmoid(values: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-values))
+
+
+def generate_chunk(rng: np.random.Generator, rows: int) -> dict[str, np.ndarray]:
+    """One chunk of applicants: the feature columns, the label and its probability."""
+    log_inflow = rng.normal(11.0, 0.55, rows)
+    inflow = np.exp(log_inflow)
+    # Lower earners lean on fewer platforms and see choppier income.
+    volatility = np.clip(rng.beta(2.0, 5.0, rows) + 0.12 * (11.0 - log_inflow), 0.02, 1.5)
+    spend_ratio = np.clip(rng.normal(0.78, 0.14, rows) + 0.15 * volatility, 0.3, 1.6)
+    outflow = inflow * spend_ratio
+
+    # Savings and the worst dip of the last 30 days, in months of inflow.
+    savings = rng.lognormal(-1.2, 0.9, rows)
+    dip = rng.gamma(2.0, 0.5, rows) * volatility + np.maximum(spend_ratio - 1.0, 0.0)
+    min_balance = inflow * (savings - dip)
+    negative_days = np.minimum(rng.poisson(30.0 * _sigmoid(-4.0 - 6.0 * (savings - dip))), 30)
+
+    purchase_ratio = np.clip(rng.lognormal(np.log(0.15), 0.8, rows), 0.005, 3.0)
+    existing_debt = rng.beta(1.2, 6.0, rows)
+    # A BNPL purchase is repaid in four installments.
+    total_burden = existing_debt + purchase_ratio / 4.0
+    buffer_ratio = np.clip(min_balance / outflow, -1.0, 3.0)
+    stress = _sigmoid(
+        1.6 * volatility
+        + 0.08 * negative_days
+        + 1.2 * total_burden
+        - 1.0 * buffer_ratio
+        + 0.8 * (spend_ratio - 0.8)
+        - 1.5
+        + rng.normal(0.0, 0.15, rows)
+    )
+
+    default_logit = (
+        -3.9
+        + 2.8 * volatility
+        + 0.14 * negative_days
+        + 2.4 * total_burden
+        - 1.6 * buffer_ratio
+        + 1.8 * purchase_ratio
+        + 2.2 * (spend_ratio - 0.8)
+        + rng.normal(0.0, 0.3, rows)
+    )
+    default_probability = _sigmoid(default_logit)
+    return {
+        "avg_monthly_inflow": np.round(inflow, 2),
+        "inflow_volatility": np.round(volatility, 4),
+        "avg_monthly_outflow": np.round(outflow, 2),
+        "min_balance_30d": np.round(min_balance, 2),
+        "neg_balance_days_30d": negative_days.astype(np.int64),
+        "purchase_to_inflow_ratio": np.round(purchase_ratio, 4),
+        "total_burden_ratio": np.round(total_burden, 4),
+        "buffer_ratio": np.round(buffer_ratio, 4),
+        "stress_index": np.round(stress, 4),
+        LABEL_COLUMN: (rng.random(rows) < default_probability).astype(np.int8),
+        "default_probability": default_probability,
+    }
+
+
+def iter_chunks(
+    rows: int, seed: int = 42, chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Iterator[dict[str, np.ndarray]]:
+    for index, start in enumerate(range(0, rows, chunk_rows)):
+        rng = np.random.default_rng([seed, index])
+        chunk = generate_chunk(rng, chunk_rows)
+        # A short last chunk is cut from a full one, so smaller runs are prefixes of larger ones.
+        if rows - start < chunk_rows:
+            chunk = {name: values[: rows - start] for name, values in chunk.items()}
+        yield chunk
+
+
+def write_csv(chunks: Iterator[dict[str, np.ndarray]], path: Path) -> int:
+    columns = [*FEATURE_COLUMNS, LABEL_COLUMN]
+    written = 0
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        # pandas formats floats in Python, several times slower than pyarrow's writer.
+        import pandas as pd
+
+        with path.open("w", encoding="utf-8", newline="") as file:
+            for chunk in chunks:
+                frame = pd.DataFrame({column: chunk[column] for column in columns})
+                frame.to_csv(file, header=written == 0, index=False)
+                written += len(frame)
+        return written
+
+    options = pa_csv.WriteOptions(include_header=False)
+    with path.open("wb") as file:
+        # pyarrow quotes header names, so write the plain header ourselves.
+        file.write((",".join(columns) + "\n").encode("utf-8"))
+        writer = None
+        for chunk in chunks:
+            table = pa.table({column: chunk[column] for column in columns})
+            if writer is None:
+                writer = pa_csv.CSVWriter(file, table.schema, write_options=options)
+            writer.write_table(table)
+            written += table.num_rows
+        if writer is not None:
+            writer.close()
+    return written
+
+
+def write_parquet(chunks: Iterator[dict[str, np.ndarray]], path: Path) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise SystemExit("Parquet output requires pyarrow (pip install pyarrow).") from exc
+
+    columns = [*FEATURE_COLUMNS, LABEL_COLUMN]
+    written = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.table({column: chunk[column] for column in columns})
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+            # One row group per chunk keeps memory flat and lets readers stream.
+            writer.write_table(table)
+            written += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+
+def seed_transactions(
+    bind: Any,
+    rows: int,
+    seed: int = 42,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    days: float = 90.0,
+    threshold: float = DEFAULT_THRESHOLD,
+    model_version: str = "synthetic",
+    scorer: Any = None,
+) -> int:
+    """Bulk-insert ``rows`` decisions spread evenly over the last ``days``, oldest first.
+
+    ``risk_probability`` is the generator's own default probability unless a
+    ``scorer`` (a function from a feature matrix to probabilities) is given.
+    The ``/stats`` counters are recounted afterwards.
+    """
+    from sqlalchemy import insert
+
+    from crud import copy_transactions
+    from models import Transaction
+    from partitions import ensure_month_partitions, is_partitioned
+    from schema import prepare_database
+
+    prepare_database(bind)
+    now = datetime.now(timezone.utc)
+    with bind.begin() as connection:
+        # Backfilled months get their own partitions instead of landing in the default one.
+        if is_partitioned(connection):
+            ensure_month_partitions(connection, now - timedelta(days=days), now)
+    step = timedelta(days=days) / max(rows, 1)
+    inserted = 0
+    for chunk in iter_chunks(rows, seed, chunk_rows):
+        count = len(chunk[LABEL_COLUMN])
+        if scorer is not None:
+            matrix = np.column_stack([chunk[column] for column in FEATURE_COLUMNS])
+            risk = np.asarray(scorer(matrix), dtype=float)
+        else:
+            risk = np.round(chunk["default_probability"], 6)
+        values = [chunk[column].tolist() for column in FEATURE_COLUMNS]
+        decisions = np.where(risk >= threshold, "Decline", "Approve").tolist()
+        first = now - step * (rows - inserted)
+        records = [
+            {
+                **dict(zip(FEATURE_COLUMNS, row)),
+                "risk_probability": probability,
+                "decision": decision,
+                "model_version": model_version,
+                "created_at": first + step * offset,
+            }
+            for offset, (row, probability, decision) in enumerate(
+                zip(zip(*values), risk.tolist(), decisions)
+            )
+        ]
+        with bind.begin() as connection:
+            if bind.dialect.name == "postgresql":
+                copy_transactions(connection, records)
+            else:
+                if bind.dialect.name == "sqlite":
+                    connection.exec_driver_sql("PRAGMA synchronous=OFF")
+                connection.execute(insert(Transaction), records)
+        inserted += count
+    prepare_database(bind, rebuild_counters=True)
+    return inserted
+
+
+def _model_scorer() -> Any:
+    from main import (
+        DEFAULT_FEATURE_COLUMNS,
+        _load_default_model,
+        _load_metadata,
+        _predict_risk_probabilities,
+    )
+
+    model, _, metadata_path = _load_default_model()
+    feature_columns = _load_metadata(metadata_path).get("feature_columns", DEFAULT_FEATURE_COLUMNS)
+    if list(feature_columns) != FEATURE_COLUMNS:
+        raise SystemExit(f"Model expects columns {feature_columns}, not {FEATURE_COLUMNS}.")
+    return lambda matrix: _predict_risk_probabilities(model, matrix, FEATURE_COLUMNS)
+
+
+def _generate(args: argparse.Namespace) -> int:
+    suffix = args.out.suffix.lower()
+    if suffix not in {".csv", ".parquet"}:
+        raise SystemExit("--out must end in .csv or .parquet")
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    writer = write_parquet if suffix == ".parquet" else write_csv
+
+    labels = 0
+    started = time.perf_counter()
+
+    def counted(chunks: Iterator[dict[str, np.ndarray]]) -> Iterator[dict[str, np.ndarray]]:
+        nonlocal labels
+        for chunk in chunks:
+            labels += int(chunk[LABEL_COLUMN].sum())
+            yield chunk
+
+    written = writer(counted(iter_chunks(args.rows, args.seed, args.chunk_rows)), args.out)
+    elapsed = time.perf_counter() - started
+    print(
+        f"wrote {written} rows to {args.out} in {elapsed:.1f} s "
+        f"({written / elapsed:,.0f} rows/s), default rate {labels / max(written, 1):.3f}"
+    )
+    return 0
+
+
+def _seed_db(args: argparse.Namespace) -> int:
+    from database import engine
+
+    started = time.perf_counter()
+    inserted = seed_transactions(
+        engine,
+        args.rows,
+        seed=args.seed,
+        chunk_rows=args.chunk_rows,
+        days=args.days,
+        threshold=args.threshold,
+        model_version=args.model_version,
+        scorer=_model_scorer() if args.score else None,
+    )
+    elapsed = time.perf_counter() - started
+    print(f"inserted {inserted} transactions in {elapsed:.1f} s ({inserted / elapsed:,.0f} rows/s)")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Write training data to CSV or Parquet")
+    generate.add_argument("--out", type=Path, default=DEFAULT_OUTPUT)
+    generate.set_defaults(handler=_generate)
+
+    seed_db = commands.add_parser("seed-db", help="Bulk-insert decisions into DATABASE_URL")
+    seed_db.add_argument("--days", type=float, default=90.0, help="Spread created_at over this")
+    seed_db.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    seed_db.add_argument("--model-version", default="synthetic")
+    seed_db.add_argument(
+        "--score", action="store_true", help="Score rows with the serving model instead"
+    )
+    seed_db.set_defaults(handler=_seed_db)
+
+    for command in (generate, seed_db):
+        command.add_argument("--rows", type=int, default=1_000_000)
+        command.add_argument("--seed", type=int, default=42)
+        command.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
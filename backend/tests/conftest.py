@@ -0,0 +1,75 @@
+"""Shared fixtures. main.py reads its settings at import, so they are set here first."""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+ML_SERVICE_DIR = BACKEND_DIR.parent / "ml-service"
+MODEL_JSON = ML_SERVICE_DIR / "gig_bnpl_xgb_model.json"
+ADMIN_TOKEN = "test-admin-token"
+CANDIDATE_VERSION = "candidate"
+
+_work_dir = Path(tempfile.mkdtemp(prefix="fairlens-tests-"))
+_registry_dir = _work_dir / "registry"
+(_registry_dir / CANDIDATE_VERSION).mkdir(parents=True)
+shutil.copy(MODEL_JSON, _registry_dir / CANDIDATE_VERSION / MODEL_JSON.name)
+shutil.copy(
+    BACKEND_DIR / "model" / "model_metadata.json",
+    _registry_dir / CANDIDATE_VERSION / "model_metadata.json",
+)
+
+os.environ.update(
+    {
+        "DATABASE_URL": f"sqlite:///{_work_dir / 'fairlens-test.db'}",
+        "MODEL_PATH": str(_work_dir / "missing.pkl"),
+        "MODEL_REGISTRY_DIR": str(_registry_dir),
+        "ADMIN_TOKEN": ADMIN_TOKEN,
+        "SCORE_CACHE_SIZE": "1000",
+        "ROLLUP_COMPACT_SECONDS": "0",
+    }
+)
+sys.path.insert(0, str(BACKEND_DIR))
+
+_APPLICANT = {
+    "avg_monthly_inflow": 42000.0,
+    "inflow_volatility": 0.22,
+    "avg_monthly_outflow": 31000.0,
+    "min_balance_30d": 3500.0,
+    "neg_balance_days_30d": 1,
+    "purchase_to_inflow_ratio": 0.18,
+    "total_burden_ratio": 0.41,
+    "buffer_ratio": 0.9,
+    "stress_index": 0.3,
+}
+
+
+def pytest_sessionfinish(session, exitstatus) -> None:
+    shutil.rmtree(_work_dir, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def applicant() -> dict:
+    return dict(_APPLICANT)
+
+
+@pytest.fixture
+def db(client):
+    from database import SessionLocal
+
+    with SessionLocal() as session:
+        yield session
@@ -0,0 +1,143 @@
+import os
+from pathlib import Path
+
+from conftest import ADMIN_TOKEN, CANDIDATE_VERSION
+
+
+def _stats_total(client) -> int:
+    return client.get("/stats").json()["total_predictions"]
+
+
+def test_batch_reports_errors_per_row(client, applicant):
+    before = _stats_total(client)
+    rows = [
+        applicant,
+        {**applicant, "stress_index": "high"},
+        {key: value for key, value in applicant.items() if key != "buffer_ratio"},
+        {**applicant, "neg_balance_days_30d": -1},
+    ]
+
+    response = client.post("/predict/batch", json={"rows": rows})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["scored"], body["failed"]) == (4, 1, 3)
+    assert [item["index"] for item in body["results"]] == [0, 1, 2, 3]
+    assert body["results"][0]["decision"] in ("Approve", "Decline")
+    assert not body["results"][0]["errors"]
+    for item in body["results"][1:]:
+        assert item["errors"]
+        assert item["risk_probability"] is None
+    assert any("stress_index" in error for error in body["results"][1]["errors"])
+    assert any("buffer_ratio" in error for error in body["results"][2]["errors"])
+    # Only the valid row is logged.
+    assert _stats_total(client) == before + 1
+
+
+def test_batch_rows_and_columns_agree(client, applicant):
+    other = {**applicant, "stress_index": 0.9, "buffer_ratio": 0.1}
+    columns = {key: [applicant[key], other[key]] for key in applicant}
+
+    by_rows = client.post("/predict/batch", json={"rows": [applicant, other]}).json()
+    by_columns = client.post("/predict/batch", json={"columns": columns}).json()
+
+    assert by_rows["results"] == by_columns["results"]
+
+
+def test_batch_rejects_ragged_columns(client, applicant):
+    columns = {key: [value] for key, value in applicant.items()}
+    columns["stress_index"] = [0.1, 0.2]
+
+    assert client.post("/predict/batch", json={"columns": columns}).status_code == 422
+
+
+def test_stats_etag_revalidates(client, applicant):
+    first = client.get("/stats")
+    etag = first.headers["ETag"]
+
+    unchanged = client.get("/stats", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == etag
+    assert not unchanged.content
+    assert client.get("/stats", headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+
+    client.post("/predict", json=applicant)
+    changed = client.get("/stats", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["total_predictions"] == first.json()["total_predictions"] + 1
+
+
+def test_score_cache_invalidated_by_model_swap(client, applicant):
+    import main
+
+    registry = main.app.state.registry
+    original = registry.active.name
+    payload = {**applicant, "avg_monthly_inflow": 51234.5}
+
+    def cache_stats() -> dict:
+        return client.get("/score-cache/stats").json()
+
+    first = client.post("/predict", json=payload).json()
+    hits = cache_stats()["hits"]
+    assert client.post("/predict", json=payload).json() == first
+    assert cache_stats()["hits"] == hits + 1
+
+    headers = {"X-Admin-Token": ADMIN_TOKEN}
+    try:
+        response = client.post(f"/models/{CANDIDATE_VERSION}/activate", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["active"] is True
+
+        before = cache_stats()
+        swapped = client.post("/predict", json=payload).json()
+        after = cache_stats()
+        # Same weights in a new model object: same answer, but not served from the old entry.
+        assert swapped["risk_probability"] == first["risk_probability"]
+        assert after["hits"] == before["hits"]
+        assert after["misses"] == before["misses"] + 1
+        assert after["invalidations"] == before["invalidations"] + 1
+    finally:
+        client.post(f"/models/{original}/activate", headers=headers)
+    assert registry.active.name == original
+
+
+def test_admin_routes_need_token(client):
+    response = client.post(f"/models/{CANDIDATE_VERSION}/activate")
+
+    assert response.status_code == 401
+
+
+def test_explain_does_not_count_as_scored(client, applicant):
+    payload = {**applicant, "avg_monthly_inflow": 47321.0}
+    before = client.get("/workers").json()["scored_rows"]
+
+    response = client.post("/explain", json=payload)
+    assert response.status_code == 200
+    assert client.get("/workers").json()["scored_rows"] == before
+
+    client.post("/predict", json=payload)
+    assert client.get("/workers").json()["scored_rows"] == before + 1
+
+
+def test_registry_reloads_changed_version_and_unloads_retired(client):
+    import main
+
+    headers = {"X-Admin-Token": ADMIN_TOKEN}
+    first = client.post(f"/models/{CANDIDATE_VERSION}/load", headers=headers).json()
+    again = client.post(f"/models/{CANDIDATE_VERSION}/load", headers=headers).json()
+    assert again["loaded_at"] == first["loaded_at"]
+
+    metadata = Path(os.environ["MODEL_REGISTRY_DIR"]) / CANDIDATE_VERSION / "model_metadata.json"
+    stat = metadata.stat()
+    os.utime(metadata, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    reloaded = client.post(f"/models/{CANDIDATE_VERSION}/load", headers=headers).json()
+    assert reloaded["loaded_at"] != first["loaded_at"]
+
+    active = main.app.state.registry.active.name
+    assert client.delete(f"/models/{active}", headers=headers).status_code == 409
+    assert client.delete(f"/models/{CANDIDATE_VERSION}", headers=headers).status_code == 200
+    assert CANDIDATE_VERSION not in [
+        version["name"] for version in client.get("/models").json()["loaded"]
+    ]
+    assert client.delete(f"/models/{CANDIDATE_VERSION}", headers=headers).status_code == 404
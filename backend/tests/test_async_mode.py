@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from conftest import BACKEND_DIR
+from inference_executor import InferenceBusy, InferenceExecutor
+
+
+def test_executor_runs_calls_off_the_event_loop():
+    executor = InferenceExecutor(max_workers=2)
+
+    async def main() -> tuple[str, str]:
+        return threading.current_thread().name, await executor.run(
+            lambda: threading.current_thread().name
+        )
+
+    try:
+        loop_thread, worker_thread = asyncio.run(main())
+    finally:
+        executor.shutdown()
+
+    assert worker_thread != loop_thread
+    assert worker_thread.startswith("inference")
+    assert executor.snapshot()["completed"] == 1
+
+
+def test_executor_rejects_calls_beyond_max_pending():
+    executor = InferenceExecutor(max_workers=1, max_pending=1, queue_timeout=0.05)
+    release = threading.Event()
+
+    async def main() -> None:
+        blocked = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        with pytest.raises(InferenceBusy):
+            await executor.run(lambda: None)
+        assert executor.in_flight == 1
+        release.set()
+        assert await blocked is True
+
+    try:
+        asyncio.run(main())
+    finally:
+        executor.shutdown()
+
+    assert executor.snapshot()["rejected"] == 1
+    assert executor.in_flight == 0
+
+
+_ASYNC_CLIENT_SCRIPT = """
+import json
+from fastapi.testclient import TestClient
+import main
+
+applicant = json.loads({applicant!r})
+with TestClient(main.app) as client:
+    predicted = client.post("/predict", json=applicant)
+    batch = client.post("/predict/batch", json={{"rows": [applicant] * 3}})
+    logs = client.get("/logs", params={{"cursor": True, "limit": 10}})
+    stats = client.get("/stats")
+    print(json.dumps({{
+        "statuses": [r.status_code for r in (predicted, batch, logs, stats)],
+        "logged": len(logs.json()["items"]),
+        "total": stats.json()["total_predictions"],
+        "completed": main.app.state.inference_executor.completed,
+    }}))
+"""
+
+
+def test_async_mode_serves_predictions_and_logs(tmp_path, applicant):
+    # main.py picks its handlers at import, so async mode needs its own interpreter.
+    env = {
+        **os.environ,
+        "REQUEST_MODE": "async",
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'async.db'}",
+    }
+    script = _ASYNC_CLIENT_SCRIPT.format(applicant=json.dumps(applicant))
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert completed.returncode == 0, completed.stderr
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    assert result["statuses"] == [200, 200, 200, 200]
+    assert result["logged"] == result["total"] == 4
+    assert result["completed"] == 2
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+import xgboost as xgb
+from sklearn.calibration import CalibratedClassifierCV
+
+from calibrate_model import _kept_booster
+
+
+@pytest.fixture(scope="module")
+def training_data():
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(600, 4))
+    labels = (features[:, 0] + rng.normal(scale=0.5, size=600) > 0).astype(int)
+    return features, labels
+
+
+def _classifier() -> xgb.XGBClassifier:
+    return xgb.XGBClassifier(n_estimators=5, max_depth=2)
+
+
+def test_unfitted_estimator_falls_back_to_a_fold(training_data):
+    calibrated = CalibratedClassifierCV(_classifier(), method="isotonic", cv=3)
+    calibrated.fit(*training_data)
+
+    booster, kept = _kept_booster(calibrated, fold=None)
+
+    assert kept == "fold 0"
+    fold_booster = calibrated.calibrated_classifiers_[0].estimator.get_booster()
+    assert booster.save_raw("json") == fold_booster.save_raw("json")
+
+
+def test_fitted_estimator_is_kept(training_data):
+    calibrated = CalibratedClassifierCV(
+        _classifier().fit(*training_data), method="isotonic", cv=3
+    )
+    calibrated.fit(*training_data)
+
+    _, kept = _kept_booster(calibrated, fold=None)
+    _, chosen = _kept_booster(calibrated, fold=2)
+
+    assert (kept, chosen) == ("estimator", "fold 2")
+
+
+def test_missing_fold_is_rejected(training_data):
+    calibrated = CalibratedClassifierCV(_classifier(), method="isotonic", cv=3)
+    calibrated.fit(*training_data)
+
+    with pytest.raises(SystemExit, match="out of range"):
+        _kept_booster(calibrated, fold=3)
+    with pytest.raises(SystemExit, match="not a fitted"):
+        _kept_booster(CalibratedClassifierCV(_classifier()), fold=None)
@@ -0,0 +1,37 @@
+from sqlalchemy import func, select
+
+import crud
+from models import DecisionCounter, Transaction
+
+
+def _recount(db) -> dict:
+    return crud.count_decisions_from_transactions(db)
+
+
+def test_seeding_an_existing_table_changes_nothing(db, client, applicant):
+    client.post("/predict", json=applicant)
+    before = crud.get_decision_counts(db)
+
+    crud.ensure_decision_counters(db)
+
+    assert crud.get_decision_counts(db) == before == _recount(db)
+    assert db.scalar(select(func.count()).select_from(DecisionCounter)) == (
+        crud.DECISION_COUNTER_SLOTS
+    )
+
+
+def test_seeding_fills_missing_slots_and_rebuild_recounts(db, client, applicant):
+    client.post("/predict", json=applicant)
+    db.query(DecisionCounter).filter(DecisionCounter.slot != 0).delete()
+    db.query(DecisionCounter).filter(DecisionCounter.slot == 0).update({"total": 0})
+    db.commit()
+
+    crud.ensure_decision_counters(db)
+    assert db.scalar(select(func.count()).select_from(DecisionCounter)) == (
+        crud.DECISION_COUNTER_SLOTS
+    )
+    assert crud.get_decision_counts(db)["total"] == 0
+
+    crud.ensure_decision_counters(db, rebuild=True)
+    assert crud.get_decision_counts(db) == _recount(db)
+    assert crud.get_decision_counts(db)["total"] == db.scalar(select(func.count(Transaction.id)))
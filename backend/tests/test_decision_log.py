@@ -0,0 +1,60 @@
+import threading
+
+from sqlalchemy import func, select
+
+import crud
+from decision_log import DecisionLogWriter
+from models import Transaction
+from schemas import PredictRequest
+
+
+def _rows(applicant: dict, count: int) -> list[dict]:
+    payload = PredictRequest(**applicant)
+    return [crud.transaction_values(payload, 0.2, "Approve") for _ in range(count)]
+
+
+def _transactions(db) -> int:
+    db.expire_all()
+    return db.scalar(select(func.count(Transaction.id)))
+
+
+def test_stop_drains_buffered_rows(db, applicant):
+    from database import SessionLocal
+
+    before = _transactions(db)
+    writer = DecisionLogWriter(SessionLocal, batch_size=1000, flush_interval=60.0)
+    writer.start()
+    writer.submit_many(_rows(applicant, 7))
+
+    writer.stop()
+
+    assert _transactions(db) == before + 7
+    assert writer.snapshot()["flushed_rows"] == 7
+    assert writer.undrained_rows == 0
+
+
+def test_stop_timeout_counts_rows_the_stuck_flusher_never_took(db, applicant):
+    from database import SessionLocal
+
+    release = threading.Event()
+    picked_up = threading.Event()
+
+    def stuck_session():
+        picked_up.set()
+        release.wait(5)
+        return SessionLocal()
+
+    writer = DecisionLogWriter(stuck_session, batch_size=1, flush_interval=0.0)
+    writer.start()
+    writer.submit_many(_rows(applicant, 1))
+    assert picked_up.wait(5)
+    writer.submit_many(_rows(applicant, 2))
+    flusher = writer._thread
+
+    writer.stop(timeout=0.1)
+
+    assert writer.undrained_rows == 2
+    assert writer.queue_depth == 0
+    release.set()
+    flusher.join(5)
+    assert writer.flushed_rows == 1
@@ -0,0 +1,121 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from drift import RISK_COLUMN, DriftMonitor, DriftReference
+
+COLUMNS = ["income", "stress"]
+
+
+def _version(reference=None, name="v1", loaded_at=None) -> SimpleNamespace:
+    return SimpleNamespace(
+        name=name,
+        feature_columns=COLUMNS,
+        drift_reference=reference,
+        loaded_at=loaded_at or datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def _samples(rng, rows: int, shift: float = 0.0) -> tuple[np.ndarray, np.ndarray]:
+    features = rng.normal(loc=shift, size=(rows, len(COLUMNS)))
+    return features, 1 / (1 + np.exp(-features[:, 0]))
+
+
+def _reference(rng) -> DriftReference:
+    features, scores = _samples(rng, 5000)
+    return DriftReference.from_samples(COLUMNS + [RISK_COLUMN], np.column_stack([features, scores]))
+
+
+def _severities(report: dict) -> dict:
+    return {entry["feature"]: entry["drift_severity"] for entry in report["reports"]}
+
+
+def test_psi_flags_a_shifted_population_only():
+    rng = np.random.default_rng(0)
+    version = _version(_reference(rng))
+    stable, shifted = DriftMonitor(min_rows=100), DriftMonitor(min_rows=100)
+
+    stable.observe(version, *_samples(rng, 2000))
+    shifted.observe(version, *_samples(rng, 2000, shift=1.0))
+
+    assert set(_severities(stable.report()).values()) == {"none"}
+    assert set(_severities(shifted.report()).values()) == {"high"}
+    assert all(entry["drift_detected"] for entry in shifted.report()["reports"])
+
+
+def test_old_buckets_leave_the_window():
+    rng = np.random.default_rng(1)
+    now = [0.0]
+    monitor = DriftMonitor(bucket_seconds=10.0, buckets=3, min_rows=1, clock=lambda: now[0])
+    version = _version(_reference(rng))
+
+    monitor.observe(version, *_samples(rng, 100, shift=2.0))
+    now[0] = 15.0
+    monitor.observe(version, *_samples(rng, 50))
+
+    assert monitor.report()["observations"] == 150
+    assert monitor.report(window_seconds=10.0)["observations"] == 50
+    now[0] = 35.0
+    assert monitor.report()["observations"] == 50
+    now[0] = 45.0
+    assert monitor.report()["observations"] == 0
+
+
+def test_reference_is_frozen_from_deployment_traffic():
+    rng = np.random.default_rng(2)
+    monitor = DriftMonitor(reference_rows=300, min_rows=1)
+    version = _version()
+
+    monitor.observe(version, *_samples(rng, 200))
+    assert monitor.report()["reference_source"] is None
+    assert monitor.report()["reference_rows"] == 200
+    monitor.observe(version, *_samples(rng, 200))
+    monitor.observe(version, *_samples(rng, 40))
+
+    report = monitor.report()
+    assert report["reference_source"] == "deployment"
+    assert report["reference_rows"] == 300
+    assert report["observations"] == 40
+
+
+def test_a_new_or_reloaded_version_starts_a_fresh_window():
+    rng = np.random.default_rng(3)
+    reference = _reference(rng)
+    monitor = DriftMonitor(min_rows=1)
+
+    monitor.observe(_version(reference), *_samples(rng, 100))
+    monitor.observe(_version(reference, name="v2"), *_samples(rng, 10))
+    assert monitor.report()["observations"] == 10
+
+    reloaded = _version(reference, name="v2", loaded_at=datetime(2026, 2, 1, tzinfo=timezone.utc))
+    monitor.observe(reloaded, *_samples(rng, 5))
+    assert monitor.report()["observations"] == 5
+    assert monitor.resets == 3
+
+
+def test_small_windows_report_insufficient_data():
+    rng = np.random.default_rng(4)
+    monitor = DriftMonitor(min_rows=500)
+
+    monitor.observe(_version(_reference(rng)), *_samples(rng, 100, shift=3.0))
+
+    assert set(_severities(monitor.report()).values()) == {"insufficient_data"}
+
+
+def test_reference_round_trips_through_json(tmp_path):
+    rng = np.random.default_rng(5)
+    reference = _reference(rng)
+    path = tmp_path / "drift_reference.json"
+
+    reference.save(path)
+    loaded = DriftReference.load(path)
+
+    assert loaded.columns == reference.columns
+    assert loaded.rows == reference.rows
+    for original, restored in zip(reference.cuts, loaded.cuts):
+        np.testing.assert_allclose(restored, original)
+    samples = np.column_stack(_samples(rng, 50))
+    np.testing.assert_array_equal(loaded.bin_indices(samples), reference.bin_indices(samples))
+    assert sum(loaded.expected[0]) == pytest.approx(1.0)
@@ -0,0 +1,56 @@
+import shutil
+
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from conftest import MODEL_JSON
+from explainer import TreeExplainer, source_booster_path
+from model_registry import file_digest, source_stamp_path
+from tree_engine import CompiledTreeEnsemble
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    shutil.copy(MODEL_JSON, tmp_path / MODEL_JSON.name)
+    booster = xgb.Booster()
+    booster.load_model(str(MODEL_JSON))
+    CompiledTreeEnsemble.from_booster(booster).save(tmp_path / "compiled")
+    source_stamp_path(tmp_path / "compiled").write_text(file_digest(MODEL_JSON) + "\n")
+    return tmp_path
+
+
+def _other_booster(path) -> None:
+    rng = np.random.default_rng(1)
+    features = rng.normal(size=(200, 9))
+    booster = xgb.train({"max_depth": 2}, xgb.DMatrix(features, label=features[:, 0] > 0), 3)
+    booster.save_model(str(path))
+
+
+def test_compiled_model_is_explained_by_its_source(model_dir):
+    # Sorts before the real source, so a first-match lookup would pick it.
+    _other_booster(model_dir / "a_retrained.json")
+
+    assert source_booster_path(model_dir / "compiled") == model_dir / MODEL_JSON.name
+
+
+def test_stamped_ubj_copy_counts_as_the_source(model_dir):
+    (model_dir / MODEL_JSON.name).unlink()
+    ubj_path = model_dir / "gig_bnpl_xgb_model.ubj"
+    booster = xgb.Booster()
+    booster.load_model(str(MODEL_JSON))
+    booster.save_model(str(ubj_path))
+    source_stamp_path(ubj_path).write_text(file_digest(MODEL_JSON) + "\n")
+
+    assert source_booster_path(model_dir / "compiled") == ubj_path
+
+
+def test_retrained_source_leaves_no_booster(model_dir):
+    _other_booster(model_dir / MODEL_JSON.name)
+    compiled = CompiledTreeEnsemble.load(model_dir / "compiled")
+    explainer = TreeExplainer(
+        compiled, [f"f{index}" for index in range(9)], source=str(model_dir / "compiled")
+    )
+
+    assert explainer.compiled
+    assert explainer.booster is None
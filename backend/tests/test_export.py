@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from export import EXPORT_COLUMNS, iter_transaction_chunks
+from models import Transaction
+
+
+def _ndjson(client, **params) -> list[dict]:
+    response = client.get("/logs/export", params={"format": "ndjson", **params})
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_ndjson_export_filters_by_decision(db, client, applicant):
+    client.post("/predict/batch", json={"rows": [applicant] * 3})
+
+    rows = _ndjson(client, decision="Approve")
+
+    expected = db.scalar(
+        select(func.count(Transaction.id)).where(Transaction.decision == "Approve")
+    )
+    assert len(rows) == expected
+    assert {row["decision"] for row in rows} <= {"Approve"}
+    assert list(rows[0]) == EXPORT_COLUMNS
+
+
+def test_export_bounds_with_an_offset_are_compared_in_utc(client, applicant):
+    client.post("/predict", json=applicant)
+    newest = client.get("/logs", params={"cursor": True, "limit": 1}).json()["items"][0]
+    created_at = datetime.fromisoformat(newest["created_at"]).replace(tzinfo=timezone.utc)
+    # The same instant two hours east of UTC.
+    start = created_at.astimezone(timezone(timedelta(hours=2)))
+
+    end = start + timedelta(seconds=1)
+    window = _ndjson(client, start=start.isoformat(), end=end.isoformat())
+    before = _ndjson(client, end=start.isoformat())
+
+    assert newest["id"] in [row["id"] for row in window]
+    assert newest["id"] not in [row["id"] for row in before]
+
+
+def test_csv_export_has_header_and_every_row(db, client, applicant):
+    client.post("/predict", json=applicant)
+
+    response = client.get("/logs/export", params={"format": "csv"})
+    table = list(csv.reader(io.StringIO(response.text)))
+
+    assert table[0] == EXPORT_COLUMNS
+    assert len(table) - 1 == db.scalar(select(func.count(Transaction.id)))
+
+
+def test_chunks_cover_the_table_in_order(client, applicant):
+    from database import SessionLocal
+
+    client.post("/predict/batch", json={"rows": [applicant] * 5})
+
+    chunks = list(iter_transaction_chunks(SessionLocal, chunk_size=2))
+
+    assert max(len(chunk) for chunk in chunks) == 2
+    id_index = EXPORT_COLUMNS.index("id")
+    created_index = EXPORT_COLUMNS.index("created_at")
+    keys = [(row[created_index], row[id_index]) for chunk in chunks for row in chunk]
+    assert keys == sorted(keys)
+
+
+def test_parquet_export_round_trips(db, client, applicant):
+    pq = pytest.importorskip("pyarrow.parquet")
+    client.post("/predict", json=applicant)
+
+    response = client.get("/logs/export", params={"format": "parquet"})
+    table = pq.read_table(io.BytesIO(response.content))
+
+    assert table.column_names == EXPORT_COLUMNS
+    assert table.num_rows == db.scalar(select(func.count(Transaction.id)))
@@ -0,0 +1,59 @@
+def test_logs_cursor_walks_every_row_newest_first(client, applicant):
+    rows = [{**applicant, "stress_index": index / 10} for index in range(7)]
+    client.post("/predict/batch", json={"rows": rows})
+    expected = client.get("/logs", params={"limit": 200, "exact_total": True}).json()
+    expected_ids = [item["id"] for item in expected["items"]]
+
+    seen = []
+    page = client.get("/logs", params={"cursor": True, "limit": 3}).json()
+    while True:
+        seen += page["items"]
+        if page["next_cursor"] is None:
+            break
+        page = client.get("/logs", params={"after": page["next_cursor"], "limit": 3}).json()
+
+    assert [item["id"] for item in seen] == expected_ids
+    keys = [(item["created_at"], item["id"]) for item in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == len(keys) == expected["total"]
+
+
+def test_logs_cursor_round_trips(db, client, applicant):
+    import crud
+    from models import Transaction
+
+    client.post("/predict", json=applicant)
+    transaction = db.query(Transaction).order_by(Transaction.id.desc()).first()
+
+    cursor = crud.encode_log_cursor(transaction)
+
+    assert crud.decode_log_cursor(cursor) == (transaction.created_at, transaction.id)
+    assert "=" not in cursor
+
+
+def test_logs_rejects_bad_cursor(client):
+    response = client.get("/logs", params={"after": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+def test_logs_cursor_is_not_shifted_by_new_rows(client, applicant):
+    client.post("/predict/batch", json={"rows": [applicant] * 4})
+    first = client.get("/logs", params={"cursor": True, "limit": 2}).json()
+    expected = client.get("/logs", params={"after": first["next_cursor"], "limit": 2}).json()
+
+    # Offset pages would slide by the rows inserted in between; keyset pages do not.
+    client.post("/predict/batch", json={"rows": [applicant] * 3})
+    second = client.get("/logs", params={"after": first["next_cursor"], "limit": 2}).json()
+
+    assert [item["id"] for item in second["items"]] == [item["id"] for item in expected["items"]]
+    assert not {item["id"] for item in first["items"]} & {item["id"] for item in second["items"]}
+
+
+def test_logs_total_comes_from_counters_unless_exact(client, applicant):
+    client.post("/predict", json=applicant)
+    cheap = client.get("/logs", params={"cursor": True, "limit": 1}).json()
+    exact = client.get("/logs", params={"cursor": True, "limit": 1, "exact_total": True}).json()
+
+    assert cheap["total"] == exact["total"] == client.get("/stats").json()["total_predictions"]
+    assert cheap["total_pages"] == cheap["total"]
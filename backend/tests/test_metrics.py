@@ -0,0 +1,79 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from metrics import Histogram, MetricsRegistry, RequestMetricsMiddleware, render_prometheus, timed
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+
+    assert snapshot["buckets"] == {"0.1": 2, "1": 3, "+Inf": 4}
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == pytest.approx(2.65)
+
+
+def test_stage_timer_counts_errors_and_still_observes():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_duration_seconds", "Stage latency.", stage="model")
+    errors = registry.counter("stage_errors_total", "Stage errors.", stage="model")
+
+    with timed(histogram, errors):
+        pass
+    with pytest.raises(ValueError):
+        with timed(histogram, errors):
+            raise ValueError("boom")
+
+    assert histogram.count == 2
+    assert errors.value == 1
+
+
+def test_render_sums_worker_snapshots():
+    snapshots = []
+    for value in (0.01, 0.2):
+        registry = MetricsRegistry()
+        registry.counter("decisions_total", "Decisions.", decision="Approve").inc()
+        registry.histogram("stage_duration_seconds", "Stage latency.", stage="model").observe(value)
+        snapshots.append(registry.snapshot())
+
+    text = render_prometheus(snapshots)
+
+    assert "# TYPE fairlens_decisions_total counter" in text
+    assert 'fairlens_decisions_total{decision="Approve"} 2' in text
+    assert 'fairlens_stage_duration_seconds_bucket{stage="model",le="0.01"} 1' in text
+    assert 'fairlens_stage_duration_seconds_bucket{stage="model",le="+Inf"} 2' in text
+    assert 'fairlens_stage_duration_seconds_count{stage="model"} 2' in text
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors.", path='/a"b\\c').inc()
+
+    assert 'path="/a\\"b\\\\c"' in render_prometheus([registry.snapshot()])
+
+
+def test_middleware_labels_requests_by_route_template():
+    registry = MetricsRegistry()
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int) -> dict:
+        if item_id == 0:
+            raise HTTPException(status_code=503)
+        return {"id": item_id}
+
+    app.add_middleware(RequestMetricsMiddleware, registry=registry)
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/items/0")
+
+    text = render_prometheus([registry.snapshot()])
+    assert 'fairlens_requests_total{method="GET",path="/items/{item_id}",status="200"} 2' in text
+    assert 'fairlens_requests_total{method="GET",path="/items/{item_id}",status="503"} 1' in text
+    assert 'fairlens_errors_total{path="/items/{item_id}"} 1' in text
+    assert 'fairlens_request_duration_seconds_count{method="GET",path="/items/{item_id}"} 3' in text
@@ -0,0 +1,111 @@
+import threading
+
+import numpy as np
+import pytest
+
+from micro_batcher import MicroBatcher
+
+
+def _submit_concurrently(batcher: MicroBatcher, requests: list[tuple]) -> list:
+    results: list = [None] * len(requests)
+
+    def call(index: int, group, rows) -> None:
+        try:
+            results[index] = batcher.submit(group, rows)
+        except Exception as exc:
+            results[index] = exc
+
+    threads = [
+        threading.Thread(target=call, args=(index, group, rows))
+        for index, (group, rows) in enumerate(requests)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def _recording_score_fn(calls: list):
+    def score(group, rows):
+        calls.append((group, len(rows)))
+        return rows[:, 0] * group["scale"]
+
+    return score
+
+
+def test_concurrent_rows_share_one_call_and_get_their_own_scores():
+    calls: list = []
+    # A long wait makes a full batch the only dispatch trigger.
+    batcher = MicroBatcher(_recording_score_fn(calls), max_batch_size=4, max_wait=5.0)
+    batcher.start()
+    group = {"scale": 10.0}
+    try:
+        results = _submit_concurrently(
+            batcher, [(group, np.array([[float(index)]])) for index in range(4)]
+        )
+    finally:
+        batcher.stop()
+
+    assert calls == [(group, 4)]
+    assert [float(result[0]) for result in results] == [0.0, 10.0, 20.0, 30.0]
+    assert batcher.snapshot()["batched_rows"] == 4
+
+
+def test_each_model_version_is_scored_separately():
+    calls: list = []
+    batcher = MicroBatcher(_recording_score_fn(calls), max_batch_size=4, max_wait=5.0)
+    batcher.start()
+    first, second = {"scale": 1.0}, {"scale": -1.0}
+    try:
+        results = _submit_concurrently(
+            batcher,
+            [(first, np.array([[1.0]])), (second, np.array([[2.0]]))] * 2,
+        )
+    finally:
+        batcher.stop()
+
+    assert sorted(rows for _, rows in calls) == [2, 2]
+    assert [float(result[0]) for result in results] == [1.0, -2.0, 1.0, -2.0]
+
+
+def test_a_failed_batch_fails_every_caller():
+    def score(group, rows):
+        raise RuntimeError("model exploded")
+
+    batcher = MicroBatcher(score, max_batch_size=2, max_wait=5.0)
+    batcher.start()
+    try:
+        results = _submit_concurrently(batcher, [(None, np.zeros((1, 1)))] * 2)
+    finally:
+        batcher.stop()
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_full_requests_and_a_stopped_batcher_score_directly():
+    calls: list = []
+    batcher = MicroBatcher(_recording_score_fn(calls), max_batch_size=2, max_wait=5.0)
+    group = {"scale": 1.0}
+
+    batcher.start()
+    batcher.submit(group, np.ones((2, 1)))
+    batcher.stop()
+    batcher.submit(group, np.ones((1, 1)))
+
+    assert calls == [(group, 2), (group, 1)]
+    assert batcher.bypassed_rows == 3
+    assert batcher.snapshot()["batches"] == 0
+
+
+def test_partial_batch_is_dispatched_after_max_wait():
+    calls: list = []
+    batcher = MicroBatcher(_recording_score_fn(calls), max_batch_size=64, max_wait=0.01)
+    batcher.start()
+    try:
+        result = batcher.submit({"scale": 2.0}, np.array([[3.0]]))
+    finally:
+        batcher.stop()
+
+    assert result == pytest.approx([6.0])
+    assert len(calls) == 1
@@ -0,0 +1,183 @@
+import asyncio
+
+import httpx
+import pytest
+
+from models.ml_connector import (
+    CircuitBreaker,
+    MLServiceConnector,
+    MLServiceError,
+    MLServiceUnavailable,
+)
+from models.schemas import MLModelRequest
+
+BASE_URL = "http://ml-service.test"
+PREDICTION = {"risk_score": 0.3, "risk_category": "Moderate", "feature_importance": {"foir": 0.2}}
+REQUEST = MLModelRequest(
+    monthly_income=50000.0,
+    dti_ratio=0.3,
+    foir=0.4,
+    savings_months=2.0,
+    emi_tenure_months=6,
+    purchase_amount=12000.0,
+    existing_emi=4000.0,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _replies(*responses):
+    """A MockTransport handler answering with ``responses`` in turn; exceptions are raised."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        outcome = responses[min(len(calls), len(responses) - 1)]
+        calls.append(request)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return handler, calls
+
+
+def _connector(handler, **options) -> MLServiceConnector:
+    options = {"max_retries": 2, "retry_backoff": 0.0, "hedge_after": 0.0, **options}
+    connector = MLServiceConnector(base_url=BASE_URL, http2=False, **options)
+    transport = httpx.MockTransport(handler)
+    connector._sync_client = httpx.Client(base_url=BASE_URL, transport=transport)
+    connector._async_client = httpx.AsyncClient(base_url=BASE_URL, transport=transport)
+    return connector
+
+
+def test_breaker_opens_after_threshold_and_closes_on_probe_success():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock.now = 10.0
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_the_breaker():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 10.0
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert breaker.opened == 2
+    clock.now = 15.0
+    assert not breaker.allow()
+
+
+def test_lost_probe_is_replaced_after_reset_timeout():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0, clock=clock)
+    breaker.record_failure()
+    clock.now = 10.0
+    assert breaker.allow()
+
+    clock.now = 19.0
+    assert not breaker.allow()
+    clock.now = 20.0
+    assert breaker.allow()
+
+
+def test_retries_server_errors_then_succeeds():
+    handler, calls = _replies(
+        httpx.Response(503),
+        httpx.ConnectError("refused"),
+        httpx.Response(200, json=PREDICTION),
+    )
+    connector = _connector(handler)
+
+    result = connector.predict_sync(REQUEST)
+
+    assert result.risk_score == PREDICTION["risk_score"]
+    assert len(calls) == 3
+    assert connector.snapshot()["retries"] == 2
+    assert connector.breaker.state == "closed"
+
+
+def test_client_errors_are_not_retried():
+    handler, calls = _replies(httpx.Response(422))
+    connector = _connector(handler)
+
+    with pytest.raises(MLServiceError, match="422"):
+        connector.predict_sync(REQUEST)
+
+    assert len(calls) == 1
+    assert connector.retries == 0
+    assert connector.breaker.failures == 0
+
+
+def test_exhausted_retries_open_the_breaker_and_fail_fast():
+    handler, calls = _replies(httpx.Response(500))
+    connector = _connector(handler, breaker=CircuitBreaker(failure_threshold=3, clock=FakeClock()))
+
+    with pytest.raises(MLServiceError, match="500"):
+        connector.predict_sync(REQUEST)
+    with pytest.raises(MLServiceUnavailable):
+        connector.predict_sync(REQUEST)
+
+    assert len(calls) == 3
+    assert connector.snapshot()["short_circuited"] == 1
+    assert connector.snapshot()["breaker_state"] == "open"
+
+
+def test_async_predict_reuses_one_pooled_client():
+    handler, calls = _replies(httpx.ReadTimeout("slow"), httpx.Response(200, json=PREDICTION))
+    connector = _connector(handler)
+    client = connector._async_client
+
+    async def main() -> None:
+        await connector.predict(REQUEST)
+        await connector.predict(REQUEST)
+        assert connector._get_async_client() is client
+        await connector.aclose()
+
+    asyncio.run(main())
+
+    assert len(calls) == 3
+    assert connector.retries == 1
+    assert connector._async_client is None and connector._sync_client is None
+
+
+def test_slow_call_is_hedged_and_the_faster_copy_wins():
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(1.0)
+        return httpx.Response(200, json=PREDICTION)
+
+    connector = _connector(handler, hedge_after=0.01)
+
+    async def main() -> None:
+        await connector.predict(REQUEST)
+        await connector.aclose()
+
+    asyncio.run(main())
+
+    assert len(calls) == 2
+    assert connector.snapshot()["hedged"] == connector.snapshot()["hedge_wins"] == 1
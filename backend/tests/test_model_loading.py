@@ -0,0 +1,52 @@
+import shutil
+
+import pytest
+import xgboost as xgb
+
+from conftest import MODEL_JSON
+from model_registry import file_digest, source_stamp_path
+
+
+@pytest.fixture
+def project_root(tmp_path, monkeypatch):
+    import main
+
+    root = tmp_path / "backend"
+    (root / "model").mkdir(parents=True)
+    (tmp_path / "ml-service").mkdir()
+    shutil.copy(MODEL_JSON, tmp_path / "ml-service" / main.DEFAULT_JSON_MODEL_NAME)
+    monkeypatch.setattr(main, "PROJECT_ROOT", root)
+    return root
+
+
+def _write_ubj(root, stamp: str | None) -> None:
+    import main
+
+    booster = xgb.Booster()
+    booster.load_model(str(MODEL_JSON))
+    ubj_path = root / "model" / main.DEFAULT_UBJ_MODEL_NAME
+    booster.save_model(str(ubj_path))
+    if stamp is not None:
+        source_stamp_path(ubj_path).write_text(stamp + "\n", encoding="utf-8")
+
+
+def test_stamped_artifact_is_preferred(project_root):
+    import main
+
+    json_path = project_root.parent / "ml-service" / main.DEFAULT_JSON_MODEL_NAME
+    _write_ubj(project_root, file_digest(json_path))
+
+    _, source, _ = main._load_default_model()
+
+    assert source == project_root / "model" / main.DEFAULT_UBJ_MODEL_NAME
+
+
+@pytest.mark.parametrize("stamp", [None, "0" * 64])
+def test_stale_artifact_does_not_shadow_json(project_root, stamp):
+    import main
+
+    _write_ubj(project_root, stamp)
+
+    _, source, _ = main._load_default_model()
+
+    assert source == project_root.parent / "ml-service" / main.DEFAULT_JSON_MODEL_NAME
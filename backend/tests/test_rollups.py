@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+import crud
+from models import DecisionRollup
+from schemas import PredictRequest
+from timeseries import RollupRetention
+
+NOW = datetime(2020, 1, 10, 12, 30, tzinfo=timezone.utc)
+# Minute buckets before 2020-01-08 12:00 become hours; hours before 2020-01-07 become days.
+RETENTION = RollupRetention(minute=timedelta(hours=48), hour=timedelta(days=3))
+MINUTE_CUTOFF = datetime(2020, 1, 8, 12, tzinfo=timezone.utc)
+HOUR_CUTOFF = datetime(2020, 1, 7, tzinfo=timezone.utc)
+
+
+def _log_rows(db, applicant, moments: list[datetime]) -> None:
+    payload = PredictRequest(**applicant)
+    rows = []
+    for index, moment in enumerate(moments):
+        risk = (index % 10) / 10
+        decision = "Approve" if risk < 0.5 else "Decline"
+        rows.append({**crud.transaction_values(payload, risk, decision), "created_at": moment})
+    crud.create_transactions(db, rows)
+
+
+def _totals(db, granularity: str, start: datetime, end: datetime) -> dict:
+    return {
+        bucket: (totals["decisions"], totals["approvals"], round(totals["risk_sum"], 6))
+        for bucket, totals in crud.get_rollup_totals(db, granularity, start, end).items()
+    }
+
+
+def _bucket_counts(db, start: datetime, end: datetime) -> dict[str, int]:
+    rows = db.execute(
+        select(DecisionRollup.granularity, func.count())
+        .where(DecisionRollup.bucket_start >= start, DecisionRollup.bucket_start < end)
+        .group_by(DecisionRollup.granularity)
+    )
+    return dict(rows.all())
+
+
+def test_compaction_keeps_totals(db, applicant):
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    to_days = [start + timedelta(hours=3, minutes=minute, seconds=7) for minute in range(0, 150, 7)]
+    to_hours = [
+        datetime(2020, 1, 8, 3, tzinfo=timezone.utc) + timedelta(minutes=minute)
+        for minute in range(0, 300, 11)
+    ]
+    kept = [NOW - timedelta(minutes=minute) for minute in range(1, 90, 13)]
+    _log_rows(db, applicant, to_days + to_hours + kept)
+    days_before = _totals(db, "day", start, NOW)
+    hours_before = _totals(db, "hour", HOUR_CUTOFF, NOW)
+    assert sum(totals[0] for totals in days_before.values()) == len(to_days + to_hours + kept)
+
+    removed = crud.compact_decision_rollups(db, RETENTION, now=NOW)
+
+    assert removed == {"minute": len(to_days + to_hours), "hour": 3, "day": 0}
+    assert _totals(db, "day", start, NOW) == days_before
+    assert _totals(db, "hour", HOUR_CUTOFF, NOW) == hours_before
+    assert _bucket_counts(db, start, HOUR_CUTOFF) == {"day": 1}
+    assert _bucket_counts(db, HOUR_CUTOFF, MINUTE_CUTOFF) == {"hour": 5}
+    assert _bucket_counts(db, MINUTE_CUTOFF, NOW) == {"minute": len(kept)}
+
+    # A second pass finds nothing left to move.
+    assert crud.compact_decision_rollups(db, RETENTION, now=NOW) == {
+        "minute": 0,
+        "hour": 0,
+        "day": 0,
+    }
+    assert _totals(db, "day", start, NOW) == days_before
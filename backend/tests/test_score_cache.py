@@ -0,0 +1,49 @@
+import score_cache
+from score_cache import ScoreCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ScoreCache(max_entries=2)
+    cache.put(("a",), 0.1, "g")
+    cache.put(("b",), 0.2, "g")
+    assert cache.get(("a",), "g") == 0.1
+
+    cache.put(("c",), 0.3, "g")
+
+    assert cache.get(("b",), "g") is None
+    assert cache.get(("a",), "g") == 0.1
+    assert cache.get(("c",), "g") == 0.3
+    assert cache.evictions == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(score_cache.time, "monotonic", lambda: now[0])
+    cache = ScoreCache(ttl_seconds=5.0)
+    cache.put(("a",), 0.1, "g")
+
+    now[0] = 104.9
+    assert cache.get(("a",), "g") == 0.1
+    now[0] = 105.0
+    assert cache.get(("a",), "g") is None
+    assert cache.expirations == 1
+    assert cache.snapshot()["size"] == 0
+
+
+def test_new_generation_empties_the_cache():
+    cache = ScoreCache()
+    cache.put(("a",), 0.1, ("v1", 0.5))
+
+    assert cache.get(("a",), ("v1", 0.6)) is None
+    assert cache.invalidations == 1
+    cache.put(("a",), 0.2, ("v1", 0.6))
+    assert cache.get(("a",), ("v1", 0.5)) is None
+    assert cache.invalidations == 2
+
+
+def test_quantized_keys_share_an_entry():
+    cache = ScoreCache(decimals=2)
+
+    assert cache.make_key([0.1234, 5.0]) == cache.make_key([0.1201, 5.004])
+    assert cache.make_key([0.1234]) != cache.make_key([0.1251])
+    assert ScoreCache().make_key([0.1234]) != ScoreCache().make_key([0.1201])
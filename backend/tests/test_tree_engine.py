@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from conftest import MODEL_JSON
+from tree_engine import CompiledTreeEnsemble
+
+PARITY_TOLERANCE = 1e-6
+
+
+def _sample_rows(engine: CompiledTreeEnsemble, row_count: int, seed: int) -> np.ndarray:
+    # Span the split thresholds each feature is used with, and blank out some cells.
+    rng = np.random.default_rng(seed)
+    feature_count = len(engine.feature_names or []) or int(engine.feature_index.max()) + 1
+    rows = np.empty((row_count, feature_count), dtype=np.float32)
+    finite = np.isfinite(engine.threshold)
+    for feature in range(feature_count):
+        used = engine.threshold[finite & (engine.feature_index == feature)]
+        low, high = (float(used.min()), float(used.max())) if used.size else (0.0, 1.0)
+        margin = (high - low) * 0.1 or 1.0
+        rows[:, feature] = rng.uniform(low - margin, high + margin, size=row_count)
+    rows[rng.random(rows.shape) < 0.05] = np.nan
+    return rows
+
+
+def _xgboost_probabilities(booster: xgb.Booster, rows: np.ndarray, names) -> np.ndarray:
+    return booster.predict(xgb.DMatrix(rows, feature_names=names))
+
+
+@pytest.fixture(scope="module")
+def shipped_booster() -> xgb.Booster:
+    booster = xgb.Booster()
+    booster.load_model(str(MODEL_JSON))
+    return booster
+
+
+def test_native_engine_matches_shipped_model(shipped_booster):
+    engine = CompiledTreeEnsemble.from_booster(shipped_booster)
+    rows = _sample_rows(engine, 5000, seed=7)
+
+    expected = _xgboost_probabilities(shipped_booster, rows, engine.feature_names)
+
+    np.testing.assert_allclose(engine.predict(rows), expected, rtol=0, atol=PARITY_TOLERANCE)
+
+
+def test_native_engine_matches_model_trained_with_missing_values():
+    rng = np.random.default_rng(3)
+    features = rng.normal(size=(2000, 6))
+    labels = (features[:, 0] + features[:, 1] ** 2 - features[:, 2] > 0.5).astype(int)
+    # Missing values that carry signal, so the trees learn both default directions.
+    features[(labels == 1) & (rng.random(2000) < 0.3), 3] = np.nan
+    features[(labels == 0) & (rng.random(2000) < 0.3), 4] = np.nan
+    booster = xgb.train(
+        {"objective": "binary:logistic", "max_depth": 5, "eta": 0.3},
+        xgb.DMatrix(features, label=labels),
+        num_boost_round=40,
+    )
+    engine = CompiledTreeEnsemble.from_booster(booster)
+    assert engine.default_left.any() and not engine.default_left.all()
+    rows = _sample_rows(engine, 3000, seed=11)
+
+    expected = _xgboost_probabilities(booster, rows, None)
+
+    np.testing.assert_allclose(engine.predict(rows), expected, rtol=0, atol=PARITY_TOLERANCE)
+
+
+def test_compiled_arrays_round_trip(shipped_booster, tmp_path):
+    engine = CompiledTreeEnsemble.from_booster(shipped_booster)
+    rows = _sample_rows(engine, 500, seed=5)
+    engine.save(tmp_path / "compiled")
+
+    loaded = CompiledTreeEnsemble.load(tmp_path / "compiled")
+
+    assert CompiledTreeEnsemble.is_compiled_dir(tmp_path / "compiled")
+    assert loaded.feature_names == engine.feature_names
+    np.testing.assert_array_equal(loaded.predict(rows), engine.predict(rows))
+    np.testing.assert_array_equal(
+        CompiledTreeEnsemble.from_json_file(MODEL_JSON).predict(rows), engine.predict(rows)
+    )
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+GRANULARITIES = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+# Buckets returned when ``from`` is omitted.
+DEFAULT_BUCKETS = {"minute": 60, "hour": 24, "day": 30}
+
+
+class RollupRetention(NamedTuple):
+    """How long each granularity is kept before it is folded into the next one.
+
+    Minute buckets older than ``minute`` become hour buckets, hour buckets older
+    than ``hour`` become day buckets, and day buckets older than ``day`` are
+    deleted (``None`` keeps them). Cutoffs are floored to the coarser bucket so
+    a compaction pass always moves whole hours and days.
+    """
+
+    minute: timedelta = timedelta(hours=48)
+    hour: timedelta = timedelta(days=90)
+    day: timedelta | None = None
+
+    def cutoffs(self, now: datetime) -> dict[str, datetime | None]:
+        """Oldest bucket start kept at each granularity."""
+        return {
+            "minute": bucket_floor(now - self.minute, "hour"),
+            "hour": bucket_floor(now - self.hour, "day"),
+            "day": bucket_floor(now - self.day, "day") if self.day is not None else None,
+        }
+
+
+def as_utc(moment: datetime) -> datetime:
+    """Naive datetimes (SQLite hands them back that way) are taken to be UTC."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def bucket_floor(moment: datetime, granularity: str) -> datetime:
+    moment = as_utc(moment).replace(second=0, microsecond=0)
+    if granularity in ("hour", "day"):
+        moment = moment.replace(minute=0)
+    if granularity == "day":
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def bucket_starts(start: datetime, end: datetime, granularity: str) -> list[datetime]:
+    """Every bucket overlapping ``[start, end)``."""
+    step = GRANULARITIES[granularity]
+    current = bucket_floor(start, granularity)
+    starts = []
+    while current < end:
+        starts.append(current)
+        current += step
+    return starts
+
+
+def timeseries_buckets(
+    totals: dict[datetime, dict],
+    start: datetime,
+    end: datetime,
+    granularity: str,
+) -> list[dict]:
+    """One entry per bucket in ``[start, end)``; buckets without decisions are zeros."""
+    buckets = []
+    for bucket_start in bucket_starts(start, end, granularity):
+        bucket = totals.get(bucket_start)
+        decisions = bucket["decisions"] if bucket else 0
+        approvals = bucket["approvals"] if bucket else 0
+        buckets.append(
+            {
+                "start": bucket_start,
+                "decisions": decisions,
+                "approvals": approvals,
+                "declines": decisions - approvals,
+                "approval_rate": round(approvals / decisions, 4) if decisions else 0.0,
+                "avg_risk": round(bucket["risk_sum"] / decisions, 4) if decisions else None,
+            }
+        )
+    return buckets
@@ -0,0 +1,370 @@
+"""Train the risk model out of core from chunked Parquet or CSV files.
+
+Batches are streamed through an ``xgboost.DataIter``. With the default
+``--memory quantile``, only the quantized ``QuantileDMatrix`` (about one byte
+per feature value) is held in RAM, never the raw frame. ``--memory external``
+pages the quantized data to ``--cache-dir`` instead, so the dataset is bounded
+by disk rather than memory. Training uses the ``hist`` tree method on all
+cores.
+
+A deterministic slice of every batch (``--eval-fraction``) is held out for
+validation. With ``--calibrate isotonic`` the same slice fits an isotonic
+margin-to-probability table (``calibration.json``) that the API applies to the
+single booster. The slice and its scores also freeze the ``/drift`` reference
+(``drift_reference.json``). The booster JSON and ``model_metadata.json`` are
+written to ``--out-dir`` in the layout a ``MODEL_REGISTRY_DIR`` version
+directory expects::
+
+    python synthetic_data.py generate --rows 20000000 --out ../data/synthetic.parquet
+    python train_model.py --data ../data/synthetic.parquet --out-dir model/registry/v2
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+import xgboost as xgb
+
+from calibration import CALIBRATION_FILE_NAME, IsotonicCalibrator
+from drift import DRIFT_REFERENCE_FILE_NAME, RISK_COLUMN, DriftReference
+from main import DEFAULT_FEATURE_COLUMNS, DEFAULT_JSON_MODEL_NAME, _predict_risk_probabilities
+from model_registry import METADATA_FILE_NAME, load_model_file
+
+LABEL_COLUMN = "default_next_cycle"
+DATA_SUFFIXES = (".parquet", ".csv")
+CSV_BYTES_PER_ROW = 80
+PARITY_TOLERANCE = 1e-6
+
+
+def _data_files(inputs: list[Path]) -> list[Path]:
+    files: list[Path] = []
+    for path in inputs:
+        if path.is_dir():
+            files += sorted(child for child in path.iterdir() if child.suffix in DATA_SUFFIXES)
+        elif path.suffix in DATA_SUFFIXES:
+            files.append(path)
+        else:
+            raise SystemExit(f"{path} is not a .parquet or .csv file or a directory of them")
+    if not files:
+        raise SystemExit("No .parquet or .csv files found in --data")
+    return files
+
+
+def _read_batches(path: Path, columns: list[str], batch_rows: int) -> Iterator[np.ndarray]:
+    """Yield float32 matrices with ``columns`` in order, about ``batch_rows`` rows each."""
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        # One row group at a time: iter_batches keeps decoded pages alive across
+        # batches, so its resident memory grows with the file instead of the batch.
+        parquet = pq.ParquetFile(path)
+        for index in range(parquet.num_row_groups):
+            table = parquet.read_row_group(index, columns=columns)
+            for start in range(0, table.num_rows, batch_rows):
+                part = table.slice(start, batch_rows)
+                matrix = np.empty((part.num_rows, len(columns)), dtype=np.float32)
+                for position, name in enumerate(columns):
+                    matrix[:, position] = part.column(name).to_numpy()
+                yield matrix
+            del table
+        return
+
+    try:
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        import pandas as pd
+
+        for frame in pd.read_csv(path, usecols=columns, chunksize=batch_rows, dtype=np.float32):
+            yield frame[columns].to_numpy()
+        return
+
+    reader = pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(block_size=batch_rows * CSV_BYTES_PER_ROW),
+        convert_options=pa_csv.ConvertOptions(include_columns=columns),
+    )
+    for batch in reader:
+        yield np.column_stack(
+            [batch.column(name).to_numpy(zero_copy_only=False) for name in columns]
+        ).astype(np.float32, copy=False)
+
+
+class ChunkIterator(xgb.DataIter):
+    """Feeds the training part of every batch to xgboost, one batch per ``next`` call.
+
+    xgboost walks the iterator several times while it builds the quantized
+    matrix. The first pass also counts rows and labels and keeps up to
+    ``eval_max_rows`` held-out rows.
+    """
+
+    def __init__(
+        self,
+        files: list[Path],
+        feature_columns: list[str],
+        batch_rows: int,
+        eval_fraction: float,
+        eval_max_rows: int,
+        seed: int,
+        cache_prefix: str | None = None,
+    ) -> None:
+        self.files = files
+        self.feature_columns = feature_columns
+        self.batch_rows = batch_rows
+        self.eval_fraction = eval_fraction
+        self.eval_max_rows = eval_max_rows
+        self.seed = seed
+        self._batches: Iterator[np.ndarray] | None = None
+        self._batch_index = 0
+        self._first_pass = True
+        self._eval_parts: list[np.ndarray] = []
+        self._eval_rows = 0
+
+        self.passes = 0
+        self.train_rows = 0
+        self.positives = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def _all_batches(self) -> Iterator[np.ndarray]:
+        columns = [*self.feature_columns, LABEL_COLUMN]
+        for path in self.files:
+            yield from _read_batches(path, columns, self.batch_rows)
+
+    def reset(self) -> None:
+        if self._batches is not None:
+            self._first_pass = False
+        self._batches = None
+        self._batch_index = 0
+
+    def next(self, input_data: Any) -> bool:
+        if self._batches is None:
+            self._batches = self._all_batches()
+            self.passes += 1
+        batch = next(self._batches, None)
+        if batch is None:
+            return False
+
+        # The same rows are held out on every pass because the mask depends only on the batch.
+        held_out = (
+            np.random.default_rng([self.seed, self._batch_index]).random(len(batch))
+            < self.eval_fraction
+        )
+        self._batch_index += 1
+        train = batch[~held_out]
+        if self._first_pass:
+            self.train_rows += len(train)
+            self.positives += int(train[:, -1].sum())
+            if self._eval_rows < self.eval_max_rows and held_out.any():
+                part = batch[held_out][: self.eval_max_rows - self._eval_rows]
+                self._eval_parts.append(part)
+                self._eval_rows += len(part)
+        input_data(data=train[:, :-1], label=train[:, -1], feature_names=self.feature_columns)
+        return True
+
+    def eval_matrix(self) -> np.ndarray:
+        if not self._eval_parts:
+            return np.empty((0, len(self.feature_columns) + 1), dtype=np.float32)
+        return np.vstack(self._eval_parts)
+
+
+def _roc_auc(labels: np.ndarray, scores: np.ndarray) -> float:
+    # Rank-sum (Mann-Whitney) AUC, with ties given their average rank.
+    order = np.argsort(scores, kind="mergesort")
+    sorted_scores = scores[order]
+    ranks = np.empty(len(scores), dtype=float)
+    boundaries = np.flatnonzero(np.diff(sorted_scores)) + 1
+    starts = np.concatenate([[0], boundaries])
+    ends = np.concatenate([boundaries, [len(scores)]])
+    for start, end in zip(starts, ends):
+        ranks[order[start:end]] = (start + end + 1) / 2
+    positives = labels == 1
+    count_positive, count_negative = positives.sum(), (~positives).sum()
+    if not count_positive or not count_negative:
+        return float("nan")
+    rank_sum = ranks[positives].sum() - count_positive * (count_positive + 1) / 2
+    return float(rank_sum / (count_positive * count_negative))
+
+
+class _ThroughputCallback(xgb.callback.TrainingCallback):
+    def __init__(self, rows: int, every: int) -> None:
+        super().__init__()
+        self.rows = rows
+        self.every = every
+        self.started = 0.0
+
+    def before_training(self, model: Any) -> Any:
+        self.started = time.perf_counter()
+        return model
+
+    def after_iteration(self, model: Any, epoch: int, evals_log: dict) -> bool:
+        rounds = epoch + 1
+        if self.every and rounds % self.every == 0:
+            elapsed = time.perf_counter() - self.started
+            auc = evals_log.get("eval", {}).get("auc", [float("nan")])[-1]
+            print(
+                f"round {rounds:5d}  eval auc {auc:.4f}  "
+                f"{self.rows * rounds / elapsed / 1e6:8.2f} M row-rounds/s"
+            )
+        return False
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", type=Path, nargs="+", required=True)
+    parser.add_argument("--out-dir", type=Path, required=True)
+    parser.add_argument("--memory", choices=["quantile", "external"], default="quantile")
+    parser.add_argument("--cache-dir", type=Path, help="Page cache for --memory external")
+    parser.add_argument("--batch-rows", type=int, default=1_000_000)
+    parser.add_argument("--rounds", type=int, default=600)
+    parser.add_argument("--max-depth", type=int, default=6)
+    parser.add_argument("--learning-rate", type=float, default=0.05)
+    parser.add_argument("--subsample", type=float, default=0.85)
+    parser.add_argument("--colsample-bytree", type=float, default=0.85)
+    parser.add_argument("--max-bin", type=int, default=256)
+    parser.add_argument(
+        "--scale-pos-weight",
+        default="1",
+        help="Positive class weight, or 'auto' for negatives/positives like the notebook",
+    )
+    parser.add_argument("--threshold", type=float, default=0.55)
+    parser.add_argument("--calibrate", choices=["none", "isotonic"], default="none")
+    parser.add_argument("--eval-fraction", type=float, default=0.02)
+    parser.add_argument("--eval-max-rows", type=int, default=500_000)
+    parser.add_argument("--nthread", type=int, default=0, help="0 uses every core")
+    parser.add_argument("--log-every", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    files = _data_files(args.data)
+    feature_columns = list(DEFAULT_FEATURE_COLUMNS)
+    nthread = args.nthread or os.cpu_count() or 1
+    cache_dir = None
+    if args.memory == "external":
+        cache_dir = args.cache_dir or Path(tempfile.mkdtemp(prefix="fairlens-xgb-cache-"))
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    iterator = ChunkIterator(
+        files,
+        feature_columns,
+        batch_rows=args.batch_rows,
+        eval_fraction=args.eval_fraction,
+        eval_max_rows=args.eval_max_rows,
+        seed=args.seed,
+        cache_prefix=str(cache_dir / "train") if cache_dir is not None else None,
+    )
+
+    started = time.perf_counter()
+    if args.memory == "quantile":
+        dtrain = xgb.QuantileDMatrix(iterator, max_bin=args.max_bin, nthread=nthread)
+    elif hasattr(xgb, "ExtMemQuantileDMatrix"):
+        dtrain = xgb.ExtMemQuantileDMatrix(iterator, max_bin=args.max_bin, nthread=nthread)
+    else:
+        # xgboost < 3.0 pages a plain DMatrix and quantizes it during training.
+        dtrain = xgb.DMatrix(iterator, nthread=nthread)
+    load_seconds = time.perf_counter() - started
+    rows = iterator.train_rows
+    print(
+        f"loaded {rows:,} training rows from {len(files)} files in {load_seconds:.1f} s "
+        f"({rows / load_seconds:,.0f} rows/s, {iterator.passes} passes, {args.memory} memory)"
+    )
+    if not rows or not iterator.positives or iterator.positives == rows:
+        raise SystemExit("Training data needs both defaulted and repaid rows")
+
+    scale_pos_weight = (
+        (rows - iterator.positives) / iterator.positives
+        if args.scale_pos_weight == "auto"
+        else float(args.scale_pos_weight)
+    )
+    held_out = iterator.eval_matrix()
+    deval = xgb.DMatrix(held_out[:, :-1], label=held_out[:, -1], feature_names=feature_columns)
+    params = {
+        "objective": "binary:logistic",
+        "eval_metric": "auc",
+        "tree_method": "hist",
+        "max_depth": args.max_depth,
+        "learning_rate": args.learning_rate,
+        "subsample": args.subsample,
+        "colsample_bytree": args.colsample_bytree,
+        "max_bin": args.max_bin,
+        "scale_pos_weight": scale_pos_weight,
+        "nthread": nthread,
+        "seed": args.seed,
+    }
+
+    started = time.perf_counter()
+    booster = xgb.train(
+        params,
+        dtrain,
+        num_boost_round=args.rounds,
+        evals=[(deval, "eval")] if len(held_out) else [],
+        verbose_eval=False,
+        callbacks=[_ThroughputCallback(rows, args.log_every)],
+    )
+    train_seconds = time.perf_counter() - started
+    eval_scores = booster.predict(deval)
+    eval_auc = _roc_auc(held_out[:, -1], eval_scores) if len(held_out) else float("nan")
+    print(
+        f"trained {args.rounds} rounds in {train_seconds:.1f} s "
+        f"({rows * args.rounds / train_seconds / 1e6:.2f} M row-rounds/s on {nthread} threads), "
+        f"eval auc {eval_auc:.4f} on {len(held_out):,} rows"
+    )
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    model_path = args.out_dir / DEFAULT_JSON_MODEL_NAME
+    booster.save_model(str(model_path))
+    calibration_path = args.out_dir / CALIBRATION_FILE_NAME
+    expected = eval_scores
+    if args.calibrate == "isotonic":
+        if not len(held_out):
+            raise SystemExit("--calibrate isotonic needs held-out rows (--eval-fraction > 0)")
+        calibrator = IsotonicCalibrator.fit(
+            booster.predict(deval, output_margin=True), held_out[:, -1]
+        )
+        calibrator.save(calibration_path)
+        expected = calibrator.transform(booster.predict(deval, output_margin=True))
+        print(f"wrote {calibration_path} with {calibrator.size} breakpoints")
+    elif calibration_path.exists():
+        # A stale table would otherwise be applied to the new booster.
+        calibration_path.unlink()
+    # Held-out rows and their served scores are the baseline /drift compares traffic with.
+    reference_path = args.out_dir / DRIFT_REFERENCE_FILE_NAME
+    if len(held_out):
+        reference_samples = np.column_stack([held_out[:, :-1], expected])
+        DriftReference.from_samples(
+            feature_columns + [RISK_COLUMN], reference_samples, source="training"
+        ).save(reference_path)
+        print(f"wrote {reference_path} from {len(held_out):,} held-out rows")
+    elif reference_path.exists():
+        reference_path.unlink()
+    metadata = {
+        "threshold": args.threshold,
+        "feature_columns": feature_columns,
+        "training": {
+            "rows": rows,
+            "positives": iterator.positives,
+            "eval_rows": len(held_out),
+            "eval_auc": round(eval_auc, 6),
+            "params": params,
+            "rounds": args.rounds,
+            "calibration": args.calibrate,
+            "load_seconds": round(load_seconds, 2),
+            "train_seconds": round(train_seconds, 2),
+            "xgboost_version": xgb.__version__,
+            "data": [str(path) for path in files],
+        },
+    }
+    (args.out_dir / METADATA_FILE_NAME).write_text(json.dumps(metadata, indent=2), "utf-8")
+
+    # Check the saved file loads the way the API loads it and scores identically.
+    loaded = load_model_file(model_path)
+    served = _predict_risk_probabilities(loaded, held_out[:, :-1], feature_columns)
+    max_error = float(np.max(np.abs(served - expected), initial=0.0))
+    print(f"wrote {model_path} and {METADATA_FILE_NAME}; reload parity max |diff| = {max_error:.1e}")
+    return 0 if max_error <= PARITY_TOLERANCE else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
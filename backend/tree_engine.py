@@ -0,0 +1,214 @@
+import json
+import math
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+SUPPORTED_OBJECTIVES = {"binary:logistic", "reg:logistic"}
+ARRAY_NAMES = ("feature_index", "threshold", "default_left", "leaf_value")
+META_FILE_NAME = "meta.json"
+ROW_CHUNK_SIZE = 256
+MAX_COMPILED_DEPTH = 16
+
+
+def _parse_float(value: Any) -> float:
+    # xgboost >= 2 stores base_score as a vector string such as "[5E-1]".
+    if isinstance(value, str):
+        value = value.strip("[]").split(",")[0]
+    return float(value)
+
+
+class CompiledTreeEnsemble:
+    """XGBoost gbtree model flattened into NumPy arrays for vectorized traversal.
+
+    Every tree is padded to a complete binary tree of ``max_depth`` levels and
+    stored in heap order, so the children of node ``i`` are ``2i + 1`` and
+    ``2i + 2``. Leaves above the last level become always-left splits that carry
+    their value down, which lets a whole batch walk all trees in lockstep.
+    """
+
+    def __init__(
+        self,
+        feature_index: np.ndarray,
+        threshold: np.ndarray,
+        default_left: np.ndarray,
+        leaf_value: np.ndarray,
+        max_depth: int,
+        base_margin: float,
+        objective: str,
+        feature_names: list[str] | None = None,
+    ) -> None:
+        self.feature_index = feature_index
+        self.threshold = threshold
+        self.default_left = default_left
+        self.leaf_value = leaf_value
+        self.max_depth = max_depth
+        self.base_margin = base_margin
+        self.objective = objective
+        self.feature_names = feature_names
+
+    @property
+    def num_trees(self) -> int:
+        return int(self.leaf_value.shape[0])
+
+    @classmethod
+    def from_json_dict(cls, model: dict[str, Any]) -> "CompiledTreeEnsemble":
+        learner = model["learner"]
+        objective = learner["objective"]["name"]
+        if objective not in SUPPORTED_OBJECTIVES:
+            raise ValueError(f"Unsupported objective for native inference: {objective}")
+
+        booster = learner["gradient_booster"]
+        if booster.get("name") != "gbtree":
+            raise ValueError(f"Unsupported booster for native inference: {booster.get('name')}")
+
+        model_param = learner["learner_model_param"]
+        if int(model_param.get("num_class", 0)) > 1 or int(model_param.get("num_target", 1)) > 1:
+            raise ValueError("Native inference supports single-output models only.")
+
+        base_score = _parse_float(model_param["base_score"])
+        base_margin = math.log(base_score / (1.0 - base_score))
+
+        trees = booster["model"]["trees"]
+        if any(any(tree.get("split_type", [])) for tree in trees):
+            raise ValueError("Categorical splits are not supported by native inference.")
+
+        max_depth = max((_tree_depth(tree) for tree in trees), default=0)
+        if max_depth > MAX_COMPILED_DEPTH:
+            raise ValueError(
+                f"Tree depth {max_depth} exceeds the native inference limit "
+                f"of {MAX_COMPILED_DEPTH}."
+            )
+
+        internal_count = (1 << max_depth) - 1
+        leaf_count = 1 << max_depth
+        feature_index = np.zeros((len(trees), internal_count), dtype=np.int32)
+        threshold = np.full((len(trees), internal_count), np.inf, dtype=np.float32)
+        default_left = np.ones((len(trees), internal_count), dtype=bool)
+        leaf_value = np.zeros((len(trees), leaf_count), dtype=np.float32)
+
+        for tree_number, tree in enumerate(trees):
+            left = tree["left_children"]
+            right = tree["right_children"]
+            conditions = tree["split_conditions"]
+            stack = [(0, 0, 0)]
+            while stack:
+                node, slot, depth = stack.pop()
+                if left[node] == -1:
+                    # Fill every last-level slot below this leaf with its value.
+                    width = 1 << (max_depth - depth)
+                    first = (slot + 1) * width - 1 - internal_count
+                    leaf_value[tree_number, first : first + width] = conditions[node]
+                    continue
+                feature_index[tree_number, slot] = tree["split_indices"][node]
+                threshold[tree_number, slot] = conditions[node]
+                default_left[tree_number, slot] = bool(tree["default_left"][node])
+                stack.append((left[node], 2 * slot + 1, depth + 1))
+                stack.append((right[node], 2 * slot + 2, depth + 1))
+
+        return cls(
+            feature_index=feature_index.reshape(-1),
+            threshold=threshold.reshape(-1),
+            default_left=default_left.reshape(-1),
+            leaf_value=leaf_value,
+            max_depth=max_depth,
+            base_margin=base_margin,
+            objective=objective,
+            feature_names=learner.get("feature_names") or None,
+        )
+
+    @classmethod
+    def from_json_file(cls, path: Path) -> "CompiledTreeEnsemble":
+        with Path(path).open("r", encoding="utf-8") as file:
+            return cls.from_json_dict(json.load(file))
+
+    @classmethod
+    def from_booster(cls, booster: Any) -> "CompiledTreeEnsemble":
+        return cls.from_json_dict(json.loads(bytes(booster.save_raw("json"))))
+
+    def save(self, directory: Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(directory / f"{name}.npy", getattr(self, name))
+        meta = {
+            "max_depth": self.max_depth,
+            "base_margin": self.base_margin,
+            "objective": self.objective,
+            "feature_names": self.feature_names,
+        }
+        (directory / META_FILE_NAME).write_text(json.dumps(meta), encoding="utf-8")
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "CompiledTreeEnsemble":
+        """Load arrays written by ``save``; with ``mmap`` they are paged in from disk on use."""
+        directory = Path(directory)
+        meta = json.loads((directory / META_FILE_NAME).read_text(encoding="utf-8"))
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode="r" if mmap else None)
+            for name in ARRAY_NAMES
+        }
+        return cls(**arrays, **meta)
+
+    @staticmethod
+    def is_compiled_dir(path: Path) -> bool:
+        return Path(path).is_dir() and (Path(path) / META_FILE_NAME).exists()
+
+    def _as_matrix(self, rows: Any) -> np.ndarray:
+        columns = getattr(rows, "columns", None)
+        if columns is not None and self.feature_names and list(columns) != self.feature_names:
+            rows = rows[self.feature_names]
+        matrix = np.ascontiguousarray(rows, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        return matrix
+
+    def predict_margin(self, rows: Any) -> np.ndarray:
+        matrix = self._as_matrix(rows)
+        feature_count = matrix.shape[1]
+        internal_count = (1 << self.max_depth) - 1
+        tree_offsets = np.arange(self.num_trees, dtype=np.int32) * internal_count
+        leaf_offsets = np.arange(self.num_trees, dtype=np.int32) * (1 << self.max_depth)
+        flat_leaves = self.leaf_value.reshape(-1)
+
+        margins = np.empty(matrix.shape[0], dtype=np.float64)
+        for start in range(0, matrix.shape[0], ROW_CHUNK_SIZE):
+            chunk = matrix[start : start + ROW_CHUNK_SIZE]
+            flat_chunk = chunk.reshape(-1)
+            row_offsets = (np.arange(chunk.shape[0], dtype=np.int32) * feature_count)[:, None]
+            has_missing = bool(np.isnan(chunk).any())
+            slots = np.zeros((chunk.shape[0], self.num_trees), dtype=np.int32)
+            for _ in range(self.max_depth):
+                nodes = slots + tree_offsets
+                values = flat_chunk[row_offsets + self.feature_index[nodes]]
+                go_right = values >= self.threshold[nodes]
+                if has_missing:
+                    go_right |= np.isnan(values) & ~self.default_left[nodes]
+                slots = 2 * slots + 1 + go_right
+            leaves = slots - internal_count + leaf_offsets
+            leaf_sum = flat_leaves[leaves].sum(axis=1, dtype=np.float64)
+            margins[start : start + chunk.shape[0]] = leaf_sum + self.base_margin
+        return margins
+
+    def predict(self, rows: Any) -> np.ndarray:
+        return 1.0 / (1.0 + np.exp(-self.predict_margin(rows)))
+
+    def predict_proba(self, rows: Any) -> np.ndarray:
+        positive = self.predict(rows)
+        return np.column_stack([1.0 - positive, positive])
+
+
+def _tree_depth(tree: dict[str, Any]) -> int:
+    left = tree["left_children"]
+    right = tree["right_children"]
+    depth = 0
+    stack = [(0, 0)]
+    while stack:
+        node, level = stack.pop()
+        if left[node] == -1:
+            depth = max(depth, level)
+            continue
+        stack.append((left[node], level + 1))
+        stack.append((right[node], level + 1))
+    return depth
@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import resource
+import threading
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+SMAPS_ROLLUP_PATH = Path("/proc/self/smaps_rollup")
+SNAPSHOT_PREFIX = "worker-"
+
+
+def memory_usage() -> dict[str, float]:
+    """Resident memory of this process in MiB, split into shared and private pages.
+
+    PSS charges each shared page to every process mapping it in equal parts, so
+    summing it across workers gives their real combined footprint.
+    """
+    fields: dict[str, int] = {}
+    try:
+        with SMAPS_ROLLUP_PATH.open("r", encoding="utf-8") as file:
+            for line in file:
+                name, _, rest = line.partition(":")
+                parts = rest.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[name] = int(parts[0])
+    except OSError:
+        # Without smaps (macOS, old kernels) only peak RSS is available.
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {"rss_mb": round(peak_kb / 1024, 1)}
+
+    shared_kb = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+    private_kb = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {
+        "rss_mb": round(fields.get("Rss", 0) / 1024, 1),
+        "pss_mb": round(fields.get("Pss", 0) / 1024, 1),
+        "shared_mb": round(shared_kb / 1024, 1),
+        "private_mb": round(private_kb / 1024, 1),
+    }
+
+
+class WorkerCounters:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.scored_rows = 0
+
+    def add_scored(self, rows: int) -> None:
+        with self._lock:
+            self.scored_rows += rows
+
+
+class WorkerMetricsPublisher:
+    """Periodically writes this worker's snapshot to ``<directory>/worker-<pid>.json``.
+
+    Any worker can then answer for all of them by reading the directory, which
+    the launcher creates and shares with every process it forks.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        snapshot_fn: Callable[[], dict],
+        interval: float = 2.0,
+    ) -> None:
+        self.directory = directory
+        self.snapshot_fn = snapshot_fn
+        self.interval = interval
+        self.path = directory / f"{SNAPSHOT_PREFIX}{os.getpid()}.json"
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.publish()
+        self._thread = threading.Thread(target=self._run, name="worker-metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval + 1)
+            self._thread = None
+        self.path.unlink(missing_ok=True)
+
+    def publish(self) -> None:
+        temporary = self.path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(self.snapshot_fn()), encoding="utf-8")
+        os.replace(temporary, self.path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.publish()
+            except Exception:
+                logger.exception("Could not publish worker metrics to %s", self.path)
+
+
+def _is_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_worker_snapshots(directory: Path) -> list[dict]:
+    """Latest snapshot of every live worker; files left by dead workers are removed."""
+    snapshots = []
+    for path in sorted(directory.glob(f"{SNAPSHOT_PREFIX}*.json")):
+        try:
+            snapshot = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if not _is_alive(int(snapshot.get("pid", 0))):
+            path.unlink(missing_ok=True)
+            continue
+        snapshots.append(snapshot)
+    return snapshots